@@ -8,27 +8,76 @@
 """
 
 
+import time
+# Start of the application for the startup report (see 'Application.startup_mark').
+START_TIME = time.perf_counter()
+
 try:
-    from collections import OrderedDict
+    import argparse
+    from collections import OrderedDict, deque
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
     import configparser
-    import matplotlib.pyplot as plt
-    from matplotlib.backends.backend_tkagg import (
-        FigureCanvasTkAgg, NavigationToolbar2Tk)
-    from matplotlib.ticker import MaxNLocator
+    import contextlib
+    import functools
+    import hashlib
+    import importlib
+    import io
+    import json
+    import mmap
+    import multiprocessing
     import os
-    import pandas as pd
+    import queue
+    import signal
+    import struct
     import sys
+    import threading
+    import types
+    import traceback
     import tkinter as tk
     from tkinter import font
     from tkinter import messagebox as msg
     from tkinter import filedialog
     import tkinter.ttk as ttk
+    from urllib.parse import parse_qs, urlparse
     import webbrowser
 except ModuleNotFoundError as e:
         print('The necessary Python packages are not installed.\n' + str(e))
         print('Please check the required packages at https://github.com/fa201/PlotView.')
 
 
+class LazyModule:
+    """ Module imported the first time one of its attributes is used.
+
+        numpy, pandas and matplotlib take most of the start-up time: they are imported when needed.
+        After the import, the global name 'alias' is the module itself so the next uses cost nothing.
+    """
+    def __init__(self, name, alias):
+        self.name = name
+        self.alias = alias
+
+    def __getattr__(self, attribute):
+        module = importlib.import_module(self.name)
+        globals()[self.alias] = module
+        return getattr(module, attribute)
+
+
+np = LazyModule('numpy', 'np')
+mpl = LazyModule('matplotlib', 'mpl')
+pd = LazyModule('pandas', 'pd')
+mpl_figure = LazyModule('matplotlib.figure', 'mpl_figure')
+mpl_ticker = LazyModule('matplotlib.ticker', 'mpl_ticker')
+mpl_transforms = LazyModule('matplotlib.transforms', 'mpl_transforms')
+mpl_path = LazyModule('matplotlib.path', 'mpl_path')
+mpl_colors = LazyModule('matplotlib.colors', 'mpl_colors')
+mpl_image = LazyModule('matplotlib.image', 'mpl_image')
+mpl_lines = LazyModule('matplotlib.lines', 'mpl_lines')
+mpl_collections = LazyModule('matplotlib.collections', 'mpl_collections')
+backend_agg = LazyModule('matplotlib.backends.backend_agg', 'backend_agg')
+backend_tkagg = LazyModule('matplotlib.backends.backend_tkagg', 'backend_tkagg')
+# End of the imports for the startup report.
+IMPORT_TIME = time.perf_counter()
+
+
 # Constants for curve styling properties.
 # Set of color for a white background. Change the set for a black background.
 my_colors = {'white_bg': ['white', 'black', 'grey', 'red', 'darksalmon', 
@@ -43,139 +92,2818 @@ my_colors = {'white_bg': ['white', 'black', 'grey', 'red', 'darksalmon',
 			             ]
 			}
 my_linestyles = ['solid', 'dashed', 'dotted']
+# Legend positions given by the 'legend position' of sessions.
+legend_locations = {'0': 'upper left',
+                    '1': 'upper right',
+                    '2': 'lower left',
+                    '3': 'lower right',
+                    '4': 'best'
+                   }
+# Exceptions raised when a curve file has not the right format.
+curve_file_errors = (TypeError, ValueError, IndexError, AttributeError, KeyError, OSError, ImportError)
+# Header of PlotView binary curve files.
+PVB_MAGIC = b'PVB1'
+PVB_HEADER = '<4sB3xI'
+# File types accepted for curves.
+curve_filetypes = [('Curve files', '*.csv *.npy *.pvb *.parquet'),
+                   ('CSV file', '*.csv'),
+                   ('NumPy file', '*.npy'),
+                   ('PlotView binary file', '*.pvb'),
+                   ('Parquet file', '*.parquet')
+                  ]
+
+
+def is_mapped(array):
+    """ Return True if the array is a view on a memory-mapped file."""
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+def copied_bytes(arrays, exclude):
+    """ Return the memory (bytes) of the arrays which do not share memory with 'exclude' or with each other."""
+    counted = [array for array in exclude if isinstance(array, np.ndarray)]
+    total = 0
+    for array in arrays:
+        if isinstance(array, np.ndarray) and not any(np.may_share_memory(array, other) for other in counted):
+            total += array.nbytes
+            counted.append(array)
+    return total
+
+
+def line_bytes(line, exclude):
+    """ Return the memory (bytes) of the arrays kept by a matplotlib line which are not views of 'exclude'.
+
+        matplotlib has no public API for this: the arrays are the private attributes of 'Line2D'
+        (data given to the line, float (N, 2) copy, filled X copy and path vertices).
+    """
+    path = getattr(line, '_path', None)
+    arrays = [getattr(line, name, None) for name in ('_xorig', '_yorig', '_xy', '_x_filled')]
+    arrays.append(getattr(path, 'vertices', None))
+    return copied_bytes(arrays, exclude)
+
+
+def process_memory():
+    """ Return the resident memory (bytes) of the process (RSS) or None if it is not available.
+
+        It is read from '/proc' on Linux and from the Windows API on Windows.
+    """
+    try:
+        with open('/proc/self/statm', 'r') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if os.name == 'nt':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+    return None
+
+
+def decimate_sorted(x, y, x_min, x_max, columns):
+    """ Reduce a curve with increasing X values to the points needed by each pixel column.
+
+        The view from 'x_min' to 'x_max' is divided in 'columns' pixel columns:
+        the first, last, min Y and max Y points of each column are kept. So the peaks are still visible.
+    """
+    edges = np.searchsorted(x, np.linspace(x_min, x_max, columns + 1)[1:-1])
+    edges = np.concatenate(([0], edges, [len(x)]))
+    keep = []
+    for first, last in zip(edges[:-1], edges[1:]):
+        if last > first:
+            column = y[first:last]
+            keep.extend((first, first + column.argmin(), first + column.argmax(), last - 1))
+    keep = np.unique(keep)
+    return x[keep], y[keep]
+
+
+def decimate_groups(x, y, groups):
+    """ Reduce a curve to the first, last, min and max points (in X and Y) of groups of consecutive points.
+
+        It is used when X values are not increasing: the extrema in X and Y of each group are kept
+        so that loops and peaks are still visible.
+        Missing values (NaN) are ignored by the extrema. The first NaN of each gap is kept so that
+        the line is still split there.
+    """
+    size = max(len(x) // groups, 1)
+    groups = len(x) // size
+    length = size * groups
+    starts = np.arange(0, length, size)
+    keep = [starts, starts + size - 1, np.arange(length, len(x))]
+    for values in (x, y):
+        block = values[:length].reshape(groups, size)
+        for function, nan_function in ((np.argmin, np.nanargmin), (np.argmax, np.nanargmax)):
+            index = function(block, axis=1)
+            # argmin and argmax give the index of the first NaN of a group with a missing value.
+            for group in np.flatnonzero(np.isnan(block[np.arange(groups), index])):
+                best = nan_argument(block[group], function, nan_function)
+                # A group with only NaN keeps its first point.
+                index[group] = 0 if best is None else best
+            keep.append(starts + index)
+    gaps = np.isnan(x) | np.isnan(y)
+    keep.append(np.flatnonzero(gaps[1:] & ~gaps[:-1]) + 1)
+    if len(gaps) and gaps[0]:
+        keep.append([0])
+    keep = np.unique(np.concatenate(keep))
+    return x[keep], y[keep]
+
+
+def simplify_line(x, y, transform, inverse):
+    """ Return the points (N x 2 array) of a line without the points removed by matplotlib when a line is drawn.
+
+        matplotlib does not simplify the paths of a LineCollection as it does for a Line2D: the points
+        closer than 'path.simplify_threshold' pixels to the line are removed here. 'transform' gives the
+        pixel coordinates of the points and 'inverse' is its inverse: the points returned are in the
+        coordinates of 'x' and 'y'.
+        Gaps (missing values) are kept as NaN.
+    """
+    points = np.column_stack((x, y))
+    if len(points) < 128 or not mpl.rcParams['path.simplify']:
+        return points
+    path = mpl_path.Path(transform.transform(points)).cleaned(remove_nans=True, simplify=True)
+    keep = path.codes != mpl_path.Path.STOP
+    vertices = path.vertices[keep]
+    codes = path.codes[keep]
+    # A move inside the path is a gap of the line.
+    moves = np.flatnonzero(codes[1:] == mpl_path.Path.MOVETO) + 1
+    vertices = np.insert(vertices, moves, np.nan, axis=0)
+    return inverse.transform(vertices)
+
+
+def nan_argument(values, function, nan_function):
+    """ Return the index given by 'function' (np.argmin or np.argmax) ignoring missing values (NaN).
+
+        'nan_function' (np.nanargmin or np.nanargmax) is used only if there is a NaN.
+        None is returned if there is no value.
+    """
+    if not len(values):
+        return None
+    index = function(values)
+    if np.isnan(values[index]):
+        try:
+            index = nan_function(values)
+        except ValueError:
+            return None
+    return int(index)
+
+
+def block_extrema(values, size):
+    """ Return the indices of the min and of the max of each block of 'size' consecutive values.
+
+        Missing values (NaN) are ignored. The index of a block with only NaN gives a NaN.
+    """
+    starts = np.arange(0, len(values), size)
+    if not len(starts):
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    indices = []
+    for reduce in (np.fmin, np.fmax):
+        extrema = reduce.reduceat(values, starts)
+        # First index of each block equal to its extremum.
+        full = len(values) // size
+        index = np.empty(len(starts), dtype=np.intp)
+        index[:full] = np.argmax(values[:full*size].reshape(full, size) == extrema[:full, None], axis=1)
+        if full < len(starts):
+            index[full] = np.argmax(values[full*size:] == extrema[full])
+        indices.append(starts + index)
+    return indices[0], indices[1]
+
+
+class RangeExtrema:
+    """ Index giving the min and the max of the values between 2 indices in constant time.
+
+        The values are divided in blocks of 'BLOCK_SIZE' values. The indices of the min and max
+        of each block are kept in a sparse table: level k gives the min and max of 2**k
+        consecutive blocks. A range is covered by 2 overlapping entries of the table and
+        the values of the incomplete blocks at both ends (less than 2 blocks) are read.
+        Missing values (NaN) are ignored. For equal values, the first index is kept.
+    """
+    BLOCK_SIZE = 1024
+
+    def __init__(self, values):
+        self.values = values
+        index_min, index_max = block_extrema(values, self.BLOCK_SIZE)
+        self.table_min = [index_min]
+        self.table_max = [index_max]
+        width = 1
+        while 2 * width <= len(index_min):
+            self.table_min.append(self.best(self.table_min[-1][:-width], self.table_min[-1][width:], np.less))
+            self.table_max.append(self.best(self.table_max[-1][:-width], self.table_max[-1][width:], np.greater))
+            width *= 2
+        self.nbytes = sum(level.nbytes for level in self.table_min + self.table_max)
+
+    def best(self, first, second, better):
+        """ Return the indices of the best values between 2 arrays of indices (first index for equal values)."""
+        first_values = self.values[first]
+        return np.where(better(self.values[second], first_values) | np.isnan(first_values), second, first)
+
+    def query(self, start, end):
+        """ Return the indices of the min and of the max of the values from 'start' to 'end' (excluded).
+
+            None is returned if there is no value.
+        """
+        if start >= end:
+            return None
+        size = self.BLOCK_SIZE
+        first_block = -(-start // size)
+        end_block = end // size
+        candidates = ([], [])
+        if first_block < end_block:
+            level = (end_block - first_block).bit_length() - 1
+            for table, indices in zip((self.table_min, self.table_max), candidates):
+                indices.extend((table[level][first_block], table[level][end_block - 2**level]))
+            parts = ((start, first_block * size), (end_block * size, end))
+        else:
+            parts = ((start, end),)
+        for part_start, part_end in parts:
+            for functions, indices in zip(((np.argmin, np.nanargmin), (np.argmax, np.nanargmax)), candidates):
+                index = nan_argument(self.values[part_start:part_end], *functions)
+                if index is not None:
+                    indices.append(part_start + index)
+        result = []
+        for functions, indices in zip(((np.argmin, np.nanargmin), (np.argmax, np.nanargmax)), candidates):
+            indices = np.sort(np.array(indices, dtype=np.intp))
+            index = nan_argument(self.values[indices], *functions)
+            if index is None:
+                return None
+            result.append(int(indices[index]))
+        return tuple(result)
+
+
+def find_extrema_indices(x, y, chunk_size=1048576):
+    """ Return the indices of X min, X max, Y min and Y max in a single pass over the data.
+
+        The data are read by chunks: the 4 extrema are computed on each chunk while it is in the
+        processor cache. Missing values (NaN) are ignored. For equal values, the first index is kept.
+        None is returned if there is no value.
+    """
+    best = [None, None, None, None]
+    for start in range(0, len(x), chunk_size):
+        x_chunk = x[start:start+chunk_size]
+        y_chunk = y[start:start+chunk_size]
+        candidates = ((x_chunk, x, np.argmin, np.nanargmin, np.less),
+                      (x_chunk, x, np.argmax, np.nanargmax, np.greater),
+                      (y_chunk, y, np.argmin, np.nanargmin, np.less),
+                      (y_chunk, y, np.argmax, np.nanargmax, np.greater)
+                     )
+        for k, (chunk, values, function, nan_function, better) in enumerate(candidates):
+            index = nan_argument(chunk, function, nan_function)
+            if index is not None and (best[k] is None or better(chunk[index], values[best[k]])):
+                best[k] = start + int(index)
+    if None in best:
+        return None
+    return tuple(best)
+
+
+def read_pvb_header(path):
+    """ Return the X title, Y title, float size and data offset of a PlotView binary file."""
+    with open(path, 'rb') as file:
+        header = file.read(struct.calcsize(PVB_HEADER))
+        # A truncated file is not a PlotView binary file.
+        if len(header) != struct.calcsize(PVB_HEADER):
+            raise ValueError('the file is not a PlotView binary file.')
+        magic, item_size, length = struct.unpack(PVB_HEADER, header)
+        if magic != PVB_MAGIC or item_size not in (4, 8):
+            raise ValueError('the file is not a PlotView binary file.')
+        titles = file.read(length)
+        if len(titles) != length:
+            raise ValueError('the file is not a PlotView binary file.')
+        titles = titles.decode('utf-8').split('\n')
+    if len(titles) != 2:
+        raise ValueError('the PlotView binary file should have 2 titles.')
+    offset = struct.calcsize(PVB_HEADER) + length
+    # Data start on a multiple of 8 bytes.
+    offset += -offset % 8
+    return titles[0], titles[1], item_size, offset
+
+
+def write_pvb(path, x, y, x_title='X', y_title='Y', dtype='float64'):
+    """ Write X and Y data as a PlotView binary file (see 'Curve.read_pvb')."""
+    dtype = np.dtype(dtype).newbyteorder('<')
+    titles = (x_title + '\n' + y_title).encode('utf-8')
+    header = struct.pack(PVB_HEADER, PVB_MAGIC, dtype.itemsize, len(titles)) + titles
+    header += b'\0' * (-len(header) % 8)
+    values = np.empty((len(x), 2), dtype=dtype)
+    values[:, 0] = x
+    values[:, 1] = y
+    with open(path, 'wb') as file:
+        file.write(header)
+        values.tofile(file)
+
+
+class SortedIndex:
+    """ Index of a curve whose X values are monotonic (increasing or decreasing).
+
+        Decreasing X values are used in reverse order through a view (no copy): the line is the same.
+        The points of a X range are found by binary search in O(log n).
+        The Y extrema of a X range are given by a 'RangeExtrema' index built at the first query.
+    """
+    def __init__(self, x, y):
+        self.reverse = len(x) > 1 and x[0] > x[-1]
+        self.x = x[::-1] if self.reverse else x
+        self.y = y[::-1] if self.reverse else y
+        self.y_range = None
+        self.nbytes = 0
+
+    def view(self, x_min, x_max, y_min, y_max):
+        """ Return the points between 'x_min' and 'x_max' plus one point on each side (array views).
+
+            The Y range is not used: the line is continuous in X.
+        """
+        start = max(np.searchsorted(self.x, x_min, 'left') - 1, 0)
+        end = min(np.searchsorted(self.x, x_max, 'right') + 1, len(self.x))
+        return self.x[start:end], self.y[start:end], True
+
+    def extrema(self, x_min, x_max):
+        """ Return the indices of X min, X max, Y min and Y max of the points between 'x_min' and 'x_max'.
+
+            The indices are the indices of the data in the file. None is returned if there is no point.
+        """
+        start = int(np.searchsorted(self.x, x_min, 'left'))
+        end = int(np.searchsorted(self.x, x_max, 'right'))
+        if start >= end:
+            return None
+        if self.y_range is None:
+            self.y_range = RangeExtrema(self.y)
+            self.nbytes = self.y_range.nbytes
+        y_indices = self.y_range.query(start, end)
+        if y_indices is None:
+            return None
+        indices = (start, end - 1) + y_indices
+        if self.reverse:
+            # Index in the file data. X min is the last point in the file.
+            indices = tuple(len(self.x) - 1 - i for i in indices)
+        return indices
+
+    def release(self):
+        """ Free the Y extrema index. It is built again at the next query."""
+        self.y_range = None
+        self.nbytes = 0
+
+
+class ChunkIndex:
+    """ Index of a curve whose X values are not monotonic, for example a loop.
+
+        The points are divided in chunks of 'CHUNK_SIZE' consecutive points.
+        The bounding box of each chunk is kept. A chunk also contains the first point of the next
+        chunk so that the segment between 2 chunks is not lost.
+        The chunks outside the plot view are not plotted.
+        For the extrema of a X range, the indices of the extrema of each chunk are computed at the
+        first query: only the chunks partly inside the X range are read.
+    """
+    CHUNK_SIZE = 4096
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.chunk_extrema = None
+        self.chunk_nan = None
+        starts = np.arange(0, len(x), self.CHUNK_SIZE)
+        # 'fmin' and 'fmax' ignore missing values (NaN).
+        self.x_min = np.fmin.reduceat(x, starts) if len(x) else np.empty(0)
+        self.x_max = np.fmax.reduceat(x, starts) if len(x) else np.empty(0)
+        self.y_min = np.fmin.reduceat(y, starts) if len(x) else np.empty(0)
+        self.y_max = np.fmax.reduceat(y, starts) if len(x) else np.empty(0)
+        following = starts[1:]
+        self.x_min[:-1] = np.fmin(self.x_min[:-1], x[following])
+        self.x_max[:-1] = np.fmax(self.x_max[:-1], x[following])
+        self.y_min[:-1] = np.fmin(self.y_min[:-1], y[following])
+        self.y_max[:-1] = np.fmax(self.y_max[:-1], y[following])
+        self.nbytes = self.x_min.nbytes * 4
+
+    def view(self, x_min, x_max, y_min, y_max):
+        """ Return the points of the chunks inside the view and True if the points are increasing in X.
+
+            Separated groups of chunks are joined by a missing value (NaN) so that no line is drawn
+            between them. All the points are returned without copy if all chunks are inside the view.
+        """
+        inside = np.flatnonzero((self.x_max >= x_min) & (self.x_min <= x_max) &
+                                (self.y_max >= y_min) & (self.y_min <= y_max))
+        if len(inside) == len(self.x_min):
+            return self.x, self.y, False
+        # Groups of consecutive chunks.
+        breaks = np.flatnonzero(np.diff(inside) > 1)
+        firsts = inside[np.concatenate(([0], breaks + 1))] if len(inside) else []
+        lasts = inside[np.concatenate((breaks, [len(inside) - 1]))] if len(inside) else []
+        x_parts = []
+        y_parts = []
+        for first, last in zip(firsts, lasts):
+            start = first * self.CHUNK_SIZE
+            end = min((last + 1) * self.CHUNK_SIZE + 1, len(self.x))
+            x_parts.extend((self.x[start:end], [np.nan]))
+            y_parts.extend((self.y[start:end], [np.nan]))
+        if not x_parts:
+            return self.x[:0], self.y[:0], False
+        return np.concatenate(x_parts[:-1]), np.concatenate(y_parts[:-1]), False
+
+    def extrema(self, x_min, x_max):
+        """ Return the indices of X min, X max, Y min and Y max of the points between 'x_min' and 'x_max'.
+
+            The points of a X range are not consecutive: the extrema of the chunks fully inside
+            the range are used, the points of the chunks partly inside the range are read.
+            None is returned if there is no point.
+        """
+        if self.chunk_extrema is None:
+            self.chunk_extrema = block_extrema(self.x, self.CHUNK_SIZE) + block_extrema(self.y, self.CHUNK_SIZE)
+            # Chunks with a missing X value are read: their points with a Y value may be outside the range.
+            self.chunk_nan = np.logical_or.reduceat(np.isnan(self.x), np.arange(0, len(self.x), self.CHUNK_SIZE))
+            self.nbytes += sum(indices.nbytes for indices in self.chunk_extrema) + self.chunk_nan.nbytes
+        low = self.x[self.chunk_extrema[0]]
+        high = self.x[self.chunk_extrema[1]]
+        inside = (low >= x_min) & (high <= x_max) & ~self.chunk_nan
+        candidates = [[indices[inside]] for indices in self.chunk_extrema]
+        functions = ((np.argmin, np.nanargmin), (np.argmax, np.nanargmax)) * 2
+        for chunk in np.flatnonzero((high >= x_min) & (low <= x_max) & ~inside):
+            start = chunk * self.CHUNK_SIZE
+            x = self.x[start:start+self.CHUNK_SIZE]
+            positions = start + np.flatnonzero((x >= x_min) & (x <= x_max))
+            for k, values in enumerate((self.x, self.x, self.y, self.y)):
+                index = nan_argument(values[positions], *functions[k])
+                if index is not None:
+                    candidates[k].append(positions[index:index+1])
+        result = []
+        for k, values in enumerate((self.x, self.x, self.y, self.y)):
+            indices = np.sort(np.concatenate(candidates[k]))
+            index = nan_argument(values[indices], *functions[k])
+            if index is None:
+                return None
+            result.append(int(indices[index]))
+        return tuple(result)
+
+    def extend(self, x, y):
+        """ Update the index for the points appended to the data (live tail mode).
+
+            'x' and 'y' are the complete data: their first points are the points of the index.
+            Only the last chunk of the index, which may get new points, and the new chunks are read.
+        """
+        first = max(len(self.x_min) - 1, 0)
+        start = first * self.CHUNK_SIZE
+        # The bounding boxes of a chunk index of the last points are the new bounding boxes.
+        tail = ChunkIndex(x[start:], y[start:])
+        for name in ('x_min', 'x_max', 'y_min', 'y_max'):
+            setattr(self, name, np.concatenate((getattr(self, name)[:first], getattr(tail, name))))
+        self.x = x
+        self.y = y
+        self.nbytes = self.x_min.nbytes * 4
+        if self.chunk_extrema is not None:
+            new = block_extrema(x[start:], self.CHUNK_SIZE) + block_extrema(y[start:], self.CHUNK_SIZE)
+            self.chunk_extrema = tuple(np.concatenate((indices[:first], start + new_indices))
+                                       for indices, new_indices in zip(self.chunk_extrema, new))
+            self.chunk_nan = np.concatenate((self.chunk_nan[:first], np.logical_or.reduceat(
+                np.isnan(x[start:]), np.arange(0, len(x) - start, self.CHUNK_SIZE))))
+            self.nbytes += sum(indices.nbytes for indices in self.chunk_extrema) + self.chunk_nan.nbytes
+
+    def release(self):
+        """ Free the extrema of the chunks. They are computed again at the next query."""
+        self.chunk_extrema = None
+        self.chunk_nan = None
+        self.nbytes = self.x_min.nbytes * 4
+
+
+def create_index(x, y):
+    """ Return the index of the curve: 'SortedIndex' if X values are monotonic, else 'ChunkIndex'."""
+    if len(x) < 2:
+        return SortedIndex(x, y)
+    # Only one test is done on the complete array: the first and last values give the direction.
+    if x[0] <= x[-1]:
+        monotonic = np.all(x[1:] >= x[:-1])
+    else:
+        monotonic = np.all(x[1:] <= x[:-1])
+    if monotonic:
+        return SortedIndex(x, y)
+    return ChunkIndex(x, y)
+
+
+def bin_points(x, y, bounds, shape, chunk_size=4194304):
+    """ Return the number of points in each bin of a regular grid of 'shape' (rows, columns) bins.
+
+        The grid covers 'bounds' (X min, X max, Y min, Y max). Points outside the bounds and missing
+        values (NaN) are not counted. Row 0 is the bottom of the grid (Y min).
+        The points are read by chunks so that the temporary arrays stay small.
+    """
+    rows, columns = shape
+    x_min, x_max, y_min, y_max = bounds
+    x_factor = columns / (x_max - x_min)
+    y_factor = rows / (y_max - y_min)
+    counts = np.zeros(rows * columns, dtype=np.int64)
+    for start in range(0, len(x), chunk_size):
+        # Bin coordinates in float64 even for float32 data.
+        i = np.subtract(x[start:start+chunk_size], x_min, dtype=np.float64) * x_factor
+        j = np.subtract(y[start:start+chunk_size], y_min, dtype=np.float64) * y_factor
+        # Comparisons are False for missing values.
+        inside = (i >= 0) & (i <= columns) & (j >= 0) & (j <= rows)
+        # Points on the max bounds are in the last bin.
+        i = np.minimum(i[inside].astype(np.intp), columns - 1)
+        j = np.minimum(j[inside].astype(np.intp), rows - 1)
+        counts += np.bincount(j * columns + i, minlength=rows * columns)
+    return counts.reshape(rows, columns)
+
+
+class DensityPyramid:
+    """ Multi-resolution 2D histogram of a curve for the density render mode.
+
+        The finest level counts the points in 'BINS' x 'BINS' bins covering the bounding box of the data.
+        Each other level adds the bins of the previous level 2 by 2 in X and Y, down to a single bin.
+        The points are read once (see 'bin_points'). A view is then given by the level whose bins
+        are about the size of the pixels: its cost depends on the number of pixels, not of points.
+        Points appended to a watched curve are added to the levels if they are inside the bounds (see 'add').
+        'version' is incremented at each change of the counts.
+    """
+    BINS = 1024
+
+    def __init__(self, x, y, bounds):
+        x_min, x_max, y_min, y_max = bounds
+        # A constant X or Y is given a bin of width 1 around its value.
+        if x_max <= x_min:
+            x_min, x_max = x_min - 0.5, x_max + 0.5
+        if y_max <= y_min:
+            y_min, y_max = y_min - 0.5, y_max + 0.5
+        self.bounds = (x_min, x_max, y_min, y_max)
+        level = bin_points(x, y, self.bounds, (self.BINS, self.BINS)).astype(np.uint32)
+        # 'levels[0]' is the finest level.
+        self.levels = [level]
+        while len(level) > 1:
+            size = len(level) // 2
+            level = level.reshape(size, 2, size, 2).sum(axis=(1, 3), dtype=np.uint32)
+            self.levels.append(level)
+        self.nbytes = sum(level.nbytes for level in self.levels)
+        self.version = 0
+
+    def add(self, x, y):
+        """ Count new points in the levels. Return False if a point is outside the bounds.
+
+            Only the new points are read: they are counted in the finest level, then the other levels
+            are added again from it. The pyramid must be built again if False is returned.
+        """
+        x_min, x_max, y_min, y_max = self.bounds
+        # Comparisons are False for missing values: they are not counted (see 'bin_points').
+        outside = ((x < x_min) | (x > x_max)) & ~np.isnan(y) | ((y < y_min) | (y > y_max)) & ~np.isnan(x)
+        if np.any(outside):
+            return False
+        self.levels[0] += bin_points(x, y, self.bounds, (self.BINS, self.BINS)).astype(np.uint32)
+        for number in range(1, len(self.levels)):
+            size = len(self.levels[number])
+            self.levels[number - 1].reshape(size, 2, size, 2).sum(axis=(1, 3), dtype=np.uint32, out=self.levels[number])
+        self.version += 1
+        return True
+
+    def bin_size(self, level=0):
+        """ Return the width and the height of the bins of a level."""
+        x_min, x_max, y_min, y_max = self.bounds
+        size = len(self.levels[level])
+        return (x_max - x_min) / size, (y_max - y_min) / size
+
+    def query(self, x_min, x_max, y_min, y_max, columns, rows):
+        """ Return the counts of the bins inside the view and their extent (left, right, bottom, top).
+
+            The view has 'columns' x 'rows' pixels. The level used is the coarsest one whose bins are not
+            larger than the pixels, else the finest one. The counts are a view of the level (no copy).
+            None is returned if the view does not contain any bin.
+        """
+        pixel_width = (x_max - x_min) / columns
+        pixel_height = (y_max - y_min) / rows
+        for number in range(len(self.levels) - 1, -1, -1):
+            width, height = self.bin_size(number)
+            if width <= pixel_width and height <= pixel_height:
+                break
+        level = self.levels[number]
+        left, bottom = self.bounds[0], self.bounds[2]
+        first_column = max(int(np.floor((x_min - left) / width)), 0)
+        last_column = min(int(np.ceil((x_max - left) / width)), len(level))
+        first_row = max(int(np.floor((y_min - bottom) / height)), 0)
+        last_row = min(int(np.ceil((y_max - bottom) / height)), len(level))
+        if first_column >= last_column or first_row >= last_row:
+            return None
+        return (level[first_row:last_row, first_column:last_column],
+                (left + first_column * width, left + last_column * width,
+                 bottom + first_row * height, bottom + last_row * height))
+
+
+class CurveCache:
+    """ Persistent cache of the parsed CSV files.
+
+        The columns parsed from a CSV file are saved as a binary '.npy' file in 'directory'.
+        The next read of the same file loads this binary file instead of parsing the text again.
+        The key of an entry is a hash of the absolute path, the size and the modification time
+        of the CSV file. The hash of the file content is added to the key if 'use_hash' is True.
+        The index of the entries is saved as a JSON file in 'directory'. It is ordered
+        from the least recently used entry to the most recently used entry.
+        Least recently used entries are deleted when the total size is bigger than 'max_size'.
+        Attributes:
+            - directory: string -> path of the folder containing the cache files
+            - max_size: integer -> maximum size (bytes) of all cache files
+            - use_hash: boolean -> add the hash of the file content to the key
+            - hits: integer -> number of reads served by the cache
+            - misses: integer -> number of reads which needed to parse the CSV file
+            - index: OrderedDict -> key: entry key, value: dictionary with the column titles,
+                                    the entry size (bytes) and the CSV file path
+            - dirty: boolean -> the index changed since it was written (order of use after cache hits)
+        Methods:
+            - get: return the cached columns of a CSV file or None
+            - put: save the columns of a CSV file
+            - flush: write the index if it changed
+    """
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, directory, max_size, use_hash=False):
+        self.directory = directory
+        self.max_size = max_size
+        self.use_hash = use_hash
+        self.hits = 0
+        self.misses = 0
+        # Curves may be read by several threads.
+        self.lock = threading.RLock()
+        self.index = self.read_index()
+        self.dirty = False
+
+    def read_index(self):
+        """ Read the index of the cache entries. An empty index is used if it cannot be read."""
+        try:
+            with open(os.path.join(self.directory, self.INDEX_FILE), 'r') as file:
+                return OrderedDict(json.load(file))
+        except (OSError, ValueError, TypeError):
+            return OrderedDict()
+
+    def write_index(self):
+        """ Write the index of the cache entries. The cache still works if it cannot be written."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp = os.path.join(self.directory, self.INDEX_FILE + '.tmp')
+            with open(temp, 'w') as file:
+                json.dump(list(self.index.items()), file)
+            os.replace(temp, os.path.join(self.directory, self.INDEX_FILE))
+            self.dirty = False
+        except OSError as e:
+            print('WARNING - The cache index cannot be written:', e)
+
+    def key(self, path):
+        """ Compute the key of the CSV file from its path, size, modification time and content."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        temp = hashlib.sha1()
+        temp.update((path + '|' + str(stat.st_size) + '|' + str(stat.st_mtime_ns)).encode('utf-8'))
+        if self.use_hash:
+            with open(path, 'rb') as file:
+                for block in iter(lambda: file.read(1024*1024), b''):
+                    temp.update(block)
+        return temp.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, key + '.npy')
+
+    def get(self, path):
+        """ Return (column titles, 2D array of values) for the CSV file or None if not cached."""
+        with self.lock:
+            try:
+                key = self.key(path)
+            except OSError:
+                self.misses += 1
+                return None
+            if key in self.index:
+                try:
+                    values = np.load(self.entry_path(key), mmap_mode='r')
+                    # The entry becomes the most recently used one. The index is written by 'put' or 'flush'.
+                    self.index.move_to_end(key)
+                    self.dirty = True
+                    self.hits += 1
+                    return self.index[key]['columns'], values
+                except (OSError, ValueError):
+                    # Corrupted or deleted entry: it is removed from the index.
+                    del self.index[key]
+                    self.dirty = True
+            self.misses += 1
+            return None
+
+    def put(self, path, df):
+        """ Save the columns of the dataframe of the CSV file then evict the least recently used entries.
+
+            The columns are written one by one in the memory-mapped cache file: the values are not copied
+            in memory. Return the values of the cache file memory-mapped, None if the entry is not kept.
+        """
+        with self.lock:
+            try:
+                key = self.key(path)
+                # Same key, same values: the existing file may be memory-mapped and cannot be replaced on Windows.
+                if key in self.index and os.path.exists(self.entry_path(key)):
+                    self.index.move_to_end(key)
+                    self.dirty = True
+                    return np.load(self.entry_path(key), mmap_mode='r')
+                os.makedirs(self.directory, exist_ok=True)
+                temp = self.entry_path(key) + '.tmp'
+                # Column-major order: each column of a cached file is contiguous for the curves sharing it.
+                values = np.lib.format.open_memmap(temp, mode='w+', dtype=np.float64, shape=df.shape,
+                                                   fortran_order=True)
+                for column in range(df.shape[1]):
+                    values[:, column] = df.iloc[:, column].to_numpy()
+                values.flush()
+                # The file is closed before it is renamed (Windows).
+                del values
+                os.replace(temp, self.entry_path(key))
+            # A file without rows cannot be memory-mapped (ValueError).
+            except (OSError, ValueError) as e:
+                print('WARNING - The curve cannot be saved in the cache:', e)
+                return None
+            self.index[key] = {'columns': [str(title) for title in df.columns],
+                               'size': os.path.getsize(self.entry_path(key)),
+                               'path': os.path.abspath(path)
+                              }
+            self.evict()
+            self.write_index()
+            # An entry bigger than the cache is deleted by 'evict'.
+            if key not in self.index:
+                return None
+            return np.load(self.entry_path(key), mmap_mode='r')
+
+    def evict(self):
+        """ Delete the least recently used entries until the cache size is below 'max_size'.
+
+            An entry is removed from the index only once its file is deleted. A file still memory-mapped
+            by a curve cannot be deleted on Windows: it is kept in the index and deleted at a next call.
+        """
+        total = sum(entry['size'] for entry in self.index.values())
+        for key in list(self.index):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(self.entry_path(key))
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            total -= self.index.pop(key)['size']
+
+    def flush(self):
+        """ Write the index if it changed since it was written (see 'get')."""
+        with self.lock:
+            if self.dirty:
+                self.write_index()
+
+    def size(self):
+        """ Return the total size (bytes) of the cache entries."""
+        return sum(entry['size'] for entry in self.index.values())
+
+
+class LoadCancelled(Exception):
+    """ Raised on the worker thread when the user cancels the loading of curve files."""
+
+
+class LoadJob:
+    """ Reading of a set of curve files by the 'CurveLoader'.
+
+        The worker threads update the progress of each file. The Tk main loop reads it
+        to update the progress bar. 'on_done' is called in the Tk main loop when all files are read.
+        Attributes:
+            - paths: list -> paths of the curve files
+            - on_done: function -> called with the job as argument when all files are read
+            - results: dictionary -> key: path, value: dataframe or exception raised while reading
+            - bytes_total: integer -> total size of the files
+            - bytes_read: dictionary -> key: path, value: number of bytes read
+            - rows: dictionary -> key: path, value: number of rows read
+            - cancel_event: threading.Event -> set when the user cancels the loading
+    """
+    def __init__(self, paths, on_done):
+        # The same file is read once even if several curves use it.
+        self.paths = list(OrderedDict.fromkeys(paths))
+        self.on_done = on_done
+        self.results = {}
+        self.bytes_total = 0
+        for path in self.paths:
+            try:
+                self.bytes_total += os.path.getsize(path)
+            except OSError:
+                pass
+        self.bytes_read = {}
+        self.rows = {}
+        self.cancel_event = threading.Event()
+
+    def progress(self, path):
+        """ Return the progress function given to 'Curve.load_file' for the file 'path'."""
+        def update(bytes_read, rows):
+            self.bytes_read[path] = bytes_read
+            self.rows[path] = rows
+            if self.cancel_event.is_set():
+                raise LoadCancelled()
+        return update
+
+    def done(self):
+        return len(self.results) == len(self.paths)
+
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+
+class CurveLoader:
+    """ Read curve files on worker threads so that the GUI is not frozen.
+
+        'submit' creates a 'LoadJob'. Each file is read by a worker thread with 'Curve.load_file'.
+        The result of each file is put in the 'results' queue. The queue is emptied
+        in the Tk main loop by 'poll' since tkinter should only be used by the main thread.
+    """
+    def __init__(self, max_workers=1):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.results = queue.Queue()
+        self.jobs = []
+
+    def submit(self, paths, on_done):
+        """ Start reading the files and return the 'LoadJob'."""
+        job = LoadJob(paths, on_done)
+        self.jobs.append(job)
+        for path in job.paths:
+            self.executor.submit(self.read, job, path)
+        # A job without files is done now.
+        if not job.paths:
+            self.results.put((job, None, None))
+        return job
+
+    def read(self, job, path):
+        """ Read one file on a worker thread. Exceptions are sent to the main loop as results."""
+        try:
+            if job.cancelled():
+                raise LoadCancelled()
+            result = Curve.load_file(path, job.progress(path))
+        except Exception as e:
+            result = e
+        self.results.put((job, path, result))
+
+    def poll(self):
+        """ Process the results in the main loop. Call 'on_done' of the finished jobs."""
+        while True:
+            try:
+                job, path, result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if path is not None:
+                job.results[path] = result
+            if job.done() and job in self.jobs:
+                self.jobs.remove(job)
+                job.on_done(job)
+
+    def cancel(self):
+        """ Cancel all running jobs."""
+        for job in self.jobs:
+            job.cancel_event.set()
+
+    def busy(self):
+        return len(self.jobs) > 0
+
+    def progress(self):
+        """ Return (bytes read, total bytes, rows read) for all running jobs."""
+        bytes_read = sum(sum(job.bytes_read.values()) for job in self.jobs)
+        bytes_total = sum(job.bytes_total for job in self.jobs)
+        rows = sum(sum(job.rows.values()) for job in self.jobs)
+        return bytes_read, bytes_total, rows
+
+
+class CsvTail:
+    """ Incremental reading of a CSV file which is growing (live tail mode).
+
+        The first call of 'read' reads the complete file. The next calls read only the bytes
+        appended since the previous call. An incomplete last line is kept in 'partial' until
+        it is completed. The data are stored in buffers whose capacity is doubled when they
+        are full: 'x' and 'y' are views of the buffers (no copy of the previous data).
+        If the file is rewritten (smaller, replaced or changed at the beginning), it is read again completely.
+        Attributes:
+            - path: string -> path to CSV file
+            - dtype: NumPy type of the data
+            - column: integer -> index of the Y column
+            - columns: list -> column headers
+            - offset: integer -> number of bytes read in the file
+            - partial: bytes -> incomplete last line
+            - stat: os.stat_result -> file state at the last read
+            - head: bytes -> first bytes of the file to detect a rewritten file
+            - length: integer -> number of points
+            - x_buffer, y_buffer: arrays -> data followed by free capacity
+    """
+    HEAD_SIZE = 256
+
+    def __init__(self, path, dtype=None, column=1):
+        self.path = path
+        self.dtype = np.float64 if dtype is None else dtype
+        self.column = column
+        self.columns = None
+        self.offset = 0
+        self.partial = b''
+        self.stat = None
+        self.head = b''
+        self.length = 0
+        self.x_buffer = np.empty(0, dtype=dtype)
+        self.y_buffer = np.empty(0, dtype=dtype)
+
+    @property
+    def x(self):
+        return self.x_buffer[:self.length]
+
+    @property
+    def y(self):
+        return self.y_buffer[:self.length]
+
+    def rewritten(self, stat):
+        """ Return True if the file is not the one read before with rows appended."""
+        if self.stat is None or stat.st_ino != self.stat.st_ino or stat.st_size < self.offset:
+            return True
+        # Same size but modified: the file is rewritten in place.
+        if stat.st_size == self.offset and stat.st_mtime_ns != self.stat.st_mtime_ns:
+            return True
+        with open(self.path, 'rb') as file:
+            return file.read(len(self.head)) != self.head
+
+    def read(self):
+        """ Read the new rows of the file.
+
+            Return 'unchanged', 'appended' or 'reloaded' (file read completely).
+            Exceptions of file reading and CSV parsing are not handled.
+        """
+        stat = os.stat(self.path)
+        if self.stat is not None and stat.st_size == self.stat.st_size and stat.st_mtime_ns == self.stat.st_mtime_ns:
+            return 'unchanged'
+        reload = self.rewritten(stat)
+        offset = 0 if reload else self.offset
+        with open(self.path, 'rb') as file:
+            file.seek(offset)
+            new_bytes = file.read(stat.st_size - offset)
+        text = (b'' if reload else self.partial) + new_bytes
+        # Only complete lines are parsed.
+        end = text.rfind(b'\n') + 1
+        if reload and not end:
+            # The file is truncated or its header is not complete yet (file being rewritten):
+            # the state is kept and the file is read again at the next call.
+            return 'unchanged'
+        if reload:
+            self.length = 0
+        self.offset = offset + len(new_bytes)
+        self.stat = stat
+        self.partial = text[end:]
+        if reload:
+            self.head = text[:self.HEAD_SIZE]
+            df = pd.read_csv(io.BytesIO(text[:end]), delimiter=',', dtype=float)
+            self.columns = list(df.columns)
+        elif end:
+            df = pd.read_csv(io.BytesIO(text[:end]), delimiter=',', dtype=float, header=None, names=self.columns)
+        else:
+            return 'unchanged'
+        self.append(df.iloc[:, 0].to_numpy(), df.iloc[:, self.column].to_numpy())
+        return 'reloaded' if reload else 'appended'
+
+    def append(self, x, y):
+        """ Add points at the end of the buffers. The capacity is doubled when the buffers are full."""
+        length = self.length + len(x)
+        if length > len(self.x_buffer):
+            capacity = max(2 * len(self.x_buffer), length, 1024)
+            for name in ('x_buffer', 'y_buffer'):
+                buffer = np.empty(capacity, dtype=self.dtype)
+                buffer[:self.length] = getattr(self, name)[:self.length]
+                setattr(self, name, buffer)
+        self.x_buffer[self.length:length] = x
+        self.y_buffer[self.length:length] = y
+        self.length = length
+
+
+class Profiler:
+    """ Record the time of the GUI operations in the profiling mode.
+
+        The profiling mode is set by the environment variable 'PV_PROFILE' or by the Help menu.
+        'PV_PROFILE=cprofile' also saves a cProfile file of each operation in 'directory'
+        (folder given by 'PV_PROFILE_DIR'). Only the last 'MAX_DUMPS' files are kept.
+        Operations are the functions decorated by 'profiled'. An operation called by another
+        operation is recorded as a phase of the first one. The other phases are given by 'phase'.
+        The time from 'draw_idle' to the actual draw of the canvas is given by 'draw_requested' and 'drawn'.
+        Attributes:
+            - enabled: boolean -> record the operations
+            - use_cprofile: boolean -> save a cProfile file of the operations of the main thread
+            - directory: string -> folder of the cProfile files
+            - records: deque -> last 'MAX_RECORDS' operations. Each one is a dictionary with the name,
+                                the start time, the wall time (s), the phases (key: name, value: [time (s), count])
+                                and the path of the cProfile file.
+            - draw_record: dictionary -> operation waiting for the draw of the canvas
+        Methods:
+            - call: run a function as an operation
+            - phase: context manager adding the time of a phase to the current operation
+            - draw_requested: save the time of 'draw_idle' for the current operation
+            - drawn: add the time from 'draw_idle' to the draw
+            - slowest: return the slowest recent operations
+    """
+    MAX_RECORDS = 200
+    MAX_DUMPS = 20
+
+    def __init__(self, enabled=False, use_cprofile=False, directory=None):
+        self.enabled = enabled
+        self.use_cprofile = use_cprofile
+        self.directory = directory or os.path.join(os.path.expanduser('~'), '.plotview_profiles')
+        self.records = deque(maxlen=self.MAX_RECORDS)
+        self.lock = threading.Lock()
+        # Operation running in each thread: files are also read by worker threads.
+        self.local = threading.local()
+        self.draw_record = None
+        self.draw_start = 0.0
+
+    def call(self, name, function, args, kwargs):
+        """ Run 'function' and record its time. Nothing is recorded if the profiling mode is off."""
+        if not self.enabled:
+            return function(*args, **kwargs)
+        if getattr(self.local, 'record', None) is not None:
+            with self.phase(name):
+                return function(*args, **kwargs)
+        record = {'name': name, 'start': time.time(), 'seconds': 0.0, 'phases': {}, 'profile': None}
+        self.local.record = record
+        # cProfile follows one thread: files read by worker threads are timed only.
+        profile = None
+        if self.use_cprofile and threading.current_thread() is threading.main_thread():
+            import cProfile
+            profile = cProfile.Profile()
+            profile.enable()
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            self.local.record = None
+            if profile is not None:
+                profile.disable()
+                record['profile'] = self.dump(profile, record)
+            with self.lock:
+                self.records.append(record)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """ Add the time of the 'with' block to the phase 'name' of the current operation."""
+        record = getattr(self.local, 'record', None) if self.enabled else None
+        if record is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            phase = record['phases'].setdefault(name, [0.0, 0])
+            phase[0] += time.perf_counter() - start
+            phase[1] += 1
+
+    def draw_requested(self):
+        """ Save the time of 'draw_idle': the canvas is drawn later by the Tk main loop."""
+        record = getattr(self.local, 'record', None) if self.enabled else None
+        if record is not None:
+            self.draw_record = record
+            self.draw_start = time.perf_counter()
+
+    def drawn(self, event=None):
+        """ Add the time from 'draw_idle' to the end of the draw to the operation which requested it."""
+        if self.draw_record is not None:
+            self.draw_record['phases']['draw_idle to draw'] = [time.perf_counter() - self.draw_start, 1]
+            self.draw_record = None
+
+    def dump(self, profile, record):
+        """ Save the cProfile statistics of an operation and delete the oldest files. Return the file path."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, time.strftime('%Y%m%d-%H%M%S', time.localtime(record['start'])) +
+                                '-' + str(int(record['start'] * 1000) % 1000).zfill(3) + '-' + record['name'] + '.prof')
+            profile.dump_stats(path)
+            files = sorted((os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                            if name.endswith('.prof')), key=os.path.getmtime)
+            for old in files[:-self.MAX_DUMPS]:
+                os.remove(old)
+            return path
+        except OSError as e:
+            print('WARNING - The profile file cannot be written:', e)
+            return None
+
+    def slowest(self, count=20):
+        """ Return the 'count' slowest operations of the last 'MAX_RECORDS' operations."""
+        with self.lock:
+            records = list(self.records)
+        return sorted(records, key=lambda record: record['seconds'], reverse=True)[:count]
+
+
+profiler = Profiler(enabled=bool(os.environ.get('PV_PROFILE')),
+                    use_cprofile=os.environ.get('PV_PROFILE', '').lower() == 'cprofile',
+                    directory=os.environ.get('PV_PROFILE_DIR'))
+
+
+def profiled(name):
+    """ Decorator recording the calls of the function as the operation 'name' in the profiling mode (see 'Profiler')."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            return profiler.call(name, function, args, kwargs)
+        return wrapper
+    return decorator
+
+
+class StallWatchdog:
+    """ Detect the stalls of the Tk main loop: the window is frozen while a callback runs.
+
+        A heartbeat is scheduled every 'HEARTBEAT_MS' by 'after' in the main loop. Its delay is the
+        latency of the main loop. A monitor thread checks the time of the last heartbeat: when it is
+        late by more than 'threshold', the Python stack of the main thread is saved at that moment.
+        The stall is printed with this stack when the main loop runs again.
+        The stack is sampled when the monitor thread gets the GIL: a long C function holding the GIL
+        gives the stack after this function.
+        Attributes:
+            - root: Tk -> main window running the heartbeat
+            - threshold: float -> latency (s) above which the main loop is stalled
+            - on_stall: function -> called in the main loop with the watchdog after each stall
+            - count: integer -> number of stalls
+            - max_latency: float -> longest latency (s) of the main loop
+            - stalls: deque -> last stalls: dictionaries with the start time, the duration (s) and the stack
+        Methods:
+            - start: start the heartbeat and the monitor thread
+            - stop: stop the heartbeat and the monitor thread
+    """
+    HEARTBEAT_MS = 50
+    MAX_STALLS = 50
+
+    def __init__(self, root, threshold, on_stall=None):
+        self.root = root
+        self.threshold = threshold
+        self.on_stall = on_stall
+        self.count = 0
+        self.max_latency = 0.0
+        self.stalls = deque(maxlen=self.MAX_STALLS)
+        # Time of the last heartbeat and stack sampled by the monitor thread for the current stall.
+        self.beat = time.perf_counter()
+        self.sample = None
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.main_ident = None
+
+    def start(self):
+        """ Start the heartbeat and the monitor thread. It is called by the thread running the main loop."""
+        self.main_ident = threading.get_ident()
+        self.beat = time.perf_counter()
+        self.root.after(self.HEARTBEAT_MS, self.heartbeat)
+        threading.Thread(target=self.monitor, daemon=True).start()
+
+    def stop(self):
+        """ Stop the heartbeat and the monitor thread."""
+        self.stopped.set()
+
+    def heartbeat(self):
+        """ Measure the latency of the main loop and record a stall if it is above 'threshold'."""
+        now = time.perf_counter()
+        with self.lock:
+            latency = now - self.beat - self.HEARTBEAT_MS / 1000
+            self.beat = now
+            sample, self.sample = self.sample, None
+        self.max_latency = max(self.max_latency, latency)
+        if latency > self.threshold:
+            self.count += 1
+            # A stall shorter than the period of the monitor thread may have no stack.
+            stack = sample['stack'] if sample else 'Stack not sampled: the stall is shorter than the monitor period.\n'
+            start = sample['start'] if sample else time.time() - latency
+            self.stalls.append({'start': start, 'duration': latency, 'stack': stack})
+            print('STALL - The main loop was blocked for ' + str(round(latency * 1000)) + ' ms. ' +
+                  'Stack of the main thread after ' + str(round(self.threshold * 1000)) + ' ms:\n' + stack)
+            if self.on_stall:
+                self.on_stall(self)
+        if not self.stopped.is_set():
+            self.root.after(self.HEARTBEAT_MS, self.heartbeat)
+
+    def monitor(self):
+        """ Save the stack of the main thread when the heartbeat is late by more than 'threshold'.
+
+            It runs on a background thread: it does not use tkinter.
+        """
+        while not self.stopped.wait(self.threshold / 4):
+            with self.lock:
+                late = time.perf_counter() - self.beat - self.HEARTBEAT_MS / 1000
+                if late <= self.threshold or self.sample is not None:
+                    continue
+                frame = sys._current_frames().get(self.main_ident)
+                stack = ''.join(traceback.format_stack(frame)) if frame is not None else ''
+                self.sample = {'start': time.time() - late, 'stack': stack}
+
+
+class Curve:
+    """ Contains all the data relative to a curve.
+        Class attribute 'count' is used the curve ID 'id' and gives the number of curves created.
+        'id' is the key of Cruve instances dictionary.
+        This key will never change whereas the user-defined 'name' can change.
+
+        The default plotting parameters are those below (user can change them).
+        Attributes:
+            - name: string -> user-defined name. Can be changed in the PV session
+            - path: string -> path to CSV file
+            - column: integer -> index of the Y column in the CSV file (X is the first column)
+            - x_in: array -> X data as read in the CSV file. Curves of the same file share this array.
+            - y_in: array -> Y data as read in the CSV file
+            - data_type: dictionary -> contains X header and Y header
+            - visibility: boolean -> flag to show the curve in the plot or not
+            - color: string -> color of the curve line
+            - width: float -> width of the curve line
+            - style: string -> style of the curve line
+            - x_offset: float -> X data offset after X data scale
+            - y_offset: float -> Y data offset after Y data scale
+            - x_scale: float -> X data scaling
+            - y_scale: float -> Y data scaling
+            - data_out: tuple -> cache of 'get_data_out': (offset and scale values, X array, Y array)
+            - line: Line2D -> matplotlib line of the curve. It is kept between plot updates.
+            - dirty: set -> updates needed by the line: 'data', 'style', 'visibility', 'transform'
+            - x_index: SortedIndex or ChunkIndex -> finds the points inside the plot view
+            - lod_key: tuple -> view of the line data (see 'update_view'), None for all data
+            - extrema_index: tuple -> cached indices of X min, X max, Y min and Y max in the file data
+            - tail: CsvTail -> reads the rows appended to the CSV file, None if the file is not watched
+            - render: string -> 'line' to plot the points as a line, 'density' to show them as an image
+            - density: DensityPyramid -> counts of points for the density render mode, built when needed
+            - image: AxesImage -> matplotlib image of the density render mode
+            - density_key: tuple -> view of the density image (see 'update_density')
+            - batched: boolean -> the curve is drawn by the LineCollection of its style (see 'CurveBatches')
+            TODO: add fig, ax, canvas, work_dir etc.
+        Methods:
+            - method to read the CSV file
+            - set_data: method to set the data when the curve is loaded lazily
+            - get_transform: method to get the offset and scale values as a matplotlib transform
+            - get_data_out: method to get the data with offset and scale values (extrema, export)
+            - memory_usage: method to get the memory used by the data of the curve
+            - release: method to free the memory which is computed again when needed
+            - get_extrema: method to get the extrema values with offset and scale values
+            - update_line: method to create the curve line or update only what changed
+            - update_view: method to give the line only the points the plot view can show
+            - update_density: method to show the points of the plot view as an image (density render mode)
+            - watch_file: method to read the rows appended to the CSV file (live tail mode)
+            - session_curves: static method to get the curves of the current session
+        Instances use '__slots__' since large sessions may contain many curves.
+    """
+    __slots__ = ('name', 'path', 'column', 'x_in', 'y_in', 'data_type', 'loading', 'visibility',
+                 'color', 'width', 'style', 'x_offset', 'y_offset', 'x_scale', 'y_scale', 'data_out',
+                 'ext_x_min', 'ext_x_min_y', 'ext_x_max', 'ext_x_max_y',
+                 'ext_y_min', 'ext_y_min_x', 'ext_y_max', 'ext_y_max_x', 'line', 'dirty',
+                 'x_index', 'lod_key', 'extrema_index', 'tail', 'render', 'density', 'image', 'density_key',
+                 'batched'
+                )
+    # Attributes of the curve and the update they need on the curve line (see 'update_line').
+    DIRTY_FLAGS = {'x_in': 'data', 'y_in': 'data', 'render': 'data',
+                   'name': 'style', 'color': 'style', 'width': 'style', 'style': 'style',
+                   'visibility': 'visibility',
+                   'x_scale': 'transform', 'y_scale': 'transform', 'x_offset': 'transform', 'y_offset': 'transform'
+                  }
+    count = 0
+    # Dictionary of curve instances.
+    dic = OrderedDict()
+    # Cache of parsed CSV files. It is set by the application.
+    cache = None
+    # Number of rows read at once when the progress of CSV reading is reported.
+    CSV_CHUNK_ROWS = 200000
+    # Store the data as float32 instead of float64 to halve the memory. Set by the application.
+    float32 = False
+    # Level of detail: curves with more points per pixel column than this value are reduced.
+    LOD_POINTS_PER_COLUMN = 4
+    # Density render mode: when the view is zoomed beyond the finest level of the density pyramid,
+    # the points of the view are counted directly if there are at most this number of points.
+    DENSITY_VIEW_POINTS = 4000000
+
+    def __init__(self, path, data_in=None, lazy=False, column=1, color=None, counted=True):
+        """ Create a Curve instance based on CSV file path.
+
+            'column' is the index of the Y column for files with several Y columns.
+            'color' is the line color. By default, it is the line color of a white background.
+            'data_in' is given when the file was already read by a 'CurveLoader'.
+            With 'lazy', the file is not read: 'set_data' is called later when the data are needed.
+            Otherwise the file is read now.
+            With 'counted' False, the curve is not counted in 'Curve.count': it is not a curve of the GUI session.
+            TODO: add all attributes in parameter to create a Curve when reading session file
+        """
+        # 'dirty' is needed first: it is updated each time an attribute is set.
+        self.dirty = set()
+        self.line = None
+        self.lod_key = None
+        self.x_index = None
+        self.extrema_index = None
+        self.tail = None
+        self.render = 'line'
+        self.density = None
+        self.image = None
+        self.density_key = None
+        self.batched = False
+        self.name = 'Name'
+        self.path = path
+        self.column = column
+        self.x_in = None
+        self.y_in = None
+        self.data_out = None
+        self.data_type = None
+        # True while the file is read by a 'CurveLoader'.
+        self.loading = False
+        if not lazy:
+            self.set_data(self.read_file(self.path) if data_in is None else data_in)
+        self.visibility = True
+        self.color = my_colors['white_bg'][1] if color is None else color
+        self.width = 1.0
+        self.style = my_linestyles[0]
+        self.x_offset = 0.0
+        self.y_offset = 0.0
+        self.x_scale = 1.0
+        self.y_scale = 1.0
+        self.ext_x_min = 0.0
+        self.ext_x_min_y = 0.0
+        self.ext_x_max = 0.0
+        self.ext_x_max_y = 0.0
+        self.ext_y_min = 0.0
+        self.ext_y_min_x = 0.0
+        self.ext_y_max = 0.0
+        self.ext_y_max_x = 0.0
+        if counted:
+            Curve.count += 1
+
+    def __setattr__(self, name, value):
+        """ Set the attribute and record the update needed by the curve line if the value changed."""
+        flag = Curve.DIRTY_FLAGS.get(name)
+        if flag is not None:
+            old = getattr(self, name, None)
+            # Arrays are compared by identity.
+            if isinstance(old, np.ndarray) or isinstance(value, np.ndarray):
+                changed = old is not value
+            else:
+                changed = old != value
+            if changed:
+                self.dirty.add(flag)
+        object.__setattr__(self, name, value)
+
+    def update_line(self, ax):
+        """ Create the curve line in 'ax' or update the properties given by 'dirty'.
+
+            The line is created the first time the curve is visible. After that only the
+            properties which changed are updated: the other curves and properties are untouched.
+            Return True if the limits of the plot may change.
+            A batched curve has no line: its updates are done by 'CurveBatches.update'.
+        """
+        if self.batched:
+            return False
+        if self.line is None:
+            if not self.visibility:
+                return False
+            # Scale and offset are applied by the line transform: the data are not copied.
+            x, y = self.line_data()
+            self.line, = ax.plot(x,
+                                 y,
+                                 transform=self.get_transform() + ax.transData,
+                                 label=self.name,
+                                 color=self.color,
+                                 lw=self.width,
+                                 ls=self.style,
+                                )
+            self.lod_key = None
+            self.dirty.clear()
+            return True
+        limits = False
+        if 'data' in self.dirty:
+            self.line.set_data(*self.line_data())
+            self.lod_key = None
+            limits = True
+        if 'transform' in self.dirty:
+            self.line.set_transform(self.get_transform() + ax.transData)
+            limits = True
+        if 'style' in self.dirty:
+            self.line.set_label(self.name)
+            self.line.set_color(self.color)
+            self.line.set_linewidth(self.width)
+            self.line.set_linestyle(self.style)
+        if 'visibility' in self.dirty:
+            self.line.set_visible(bool(self.visibility))
+            limits = True
+        self.dirty.clear()
+        return limits
+
+    def update_view(self, x_min, x_max, y_min, y_max, columns):
+        """ Give the line only the points needed by the plot view.
+
+            'x_min', 'x_max', 'y_min' and 'y_max' are the limits of the plot.
+            The points outside the view are removed with 'x_index' (viewport culling).
+            'columns' is the width (pixels) of the plot. If there are more than 'LOD_POINTS_PER_COLUMN'
+            points per pixel column in the view, the points are reduced (level of detail).
+            'columns' = 0 gives all the points of the view.
+            Return True if the line data changed.
+        """
+        if self.line is None or not self.visibility or not self.loaded() or self.render == 'density':
+            return False
+        x_min, x_max, y_min, y_max = self.file_limits(x_min, x_max, y_min, y_max)
+        # The Y range is not used by the index of monotonic curves.
+        if isinstance(self.x_index, SortedIndex):
+            key = (x_min, x_max, columns)
+        else:
+            key = (x_min, x_max, y_min, y_max, columns)
+        if key == self.lod_key:
+            return False
+        self.lod_key = key
+        self.line.set_data(*self.view_data(x_min, x_max, y_min, y_max, columns))
+        return True
+
+    def view_data(self, x_min, x_max, y_min, y_max, columns):
+        """ Return the X and Y arrays of the points needed by a view (see 'update_view').
+
+            The limits of the view are in the coordinates of the data in the file (see 'file_limits').
+        """
+        x, y, increasing = self.x_index.view(x_min, x_max, y_min, y_max)
+        if columns > 0 and len(x) > Curve.LOD_POINTS_PER_COLUMN * columns:
+            if increasing:
+                x, y = decimate_sorted(x, y, x_min, x_max, columns)
+            else:
+                x, y = decimate_groups(x, y, 2 * columns)
+        return x, y
+
+    def reset_view(self):
+        """ Give all the points to the line. Return True if the line data changed."""
+        if self.lod_key is None:
+            return False
+        self.line.set_data(self.x_in, self.y_in)
+        self.lod_key = None
+        return True
+
+    def file_limits(self, x_min, x_max, y_min, y_max):
+        """ Return the plot limits in the coordinates of the data in the file (offset and scale removed)."""
+        x_min, x_max = sorted(((x_min - self.x_offset) / self.x_scale, (x_max - self.x_offset) / self.x_scale))
+        y_min, y_max = sorted(((y_min - self.y_offset) / self.y_scale, (y_max - self.y_offset) / self.y_scale))
+        return x_min, x_max, y_min, y_max
+
+    def line_data(self):
+        """ Return the X and Y arrays of the line.
+
+            In density mode, the points are shown by an image (see 'update_density'). The line only has
+            2 corners of the data separated by a missing value: nothing is drawn but the auto scale
+            and the legend are the same as for the complete line.
+        """
+        if self.render != 'density':
+            return self.x_in, self.y_in
+        density = self.get_density()
+        if density is None:
+            return self.x_in[:0], self.y_in[:0]
+        x_min, x_max, y_min, y_max = self.density_bounds
+        return np.array([x_min, np.nan, x_max]), np.array([y_min, np.nan, y_max])
+
+    @property
+    def density_bounds(self):
+        """ X min, X max, Y min and Y max of the data in the file."""
+        x_min, x_max, y_min, y_max = self.extrema_index
+        return (float(self.x_in[x_min]), float(self.x_in[x_max]), float(self.y_in[y_min]), float(self.y_in[y_max]))
+
+    def get_density(self):
+        """ Return the density pyramid of the data (see 'DensityPyramid'), None if the curve has no value.
+
+            It is built at the first call and kept until the data change.
+        """
+        if self.density is None:
+            if self.extrema_index is None:
+                self.extrema_index = find_extrema_indices(self.x_in, self.y_in)
+            if self.extrema_index is None:
+                return None
+            with profiler.phase('density pyramid'):
+                self.density = DensityPyramid(self.x_in, self.y_in, self.density_bounds)
+        return self.density
+
+    def update_density(self, ax):
+        """ Show the points of the plot view as an image of the number of points per pixel (density mode).
+
+            The counts are given by the level of the density pyramid with about one bin per pixel.
+            If the view is zoomed beyond the finest level, the points of the view are counted directly
+            when there are at most 'DENSITY_VIEW_POINTS' of them. The counts are shown on a log scale
+            with a colormap of the curve color: pixels without point are transparent.
+            The image is created once and its data and position are updated when the view changes.
+            The image is removed in line mode or if the curve is hidden. Return True if the image changed.
+        """
+        if (self.render != 'density' or self.line is None or not self.visibility or not self.loaded()
+                or self.get_density() is None):
+            if self.image is None:
+                return False
+            self.remove_image()
+            return True
+        x_min, x_max, y_min, y_max = self.file_limits(*ax.get_xlim(), *ax.get_ylim())
+        box = ax.get_window_extent()
+        columns = max(int(box.width), 1)
+        rows = max(int(box.height), 1)
+        key = (x_min, x_max, y_min, y_max, columns, rows, id(self.density), self.density.version, self.color,
+               float(self.x_scale), float(self.x_offset), float(self.y_scale), float(self.y_offset))
+        if key == self.density_key:
+            return False
+        result = self.density.query(x_min, x_max, y_min, y_max, columns, rows)
+        width, height = self.density.bin_size()
+        if result is not None and (width > 2 * (x_max - x_min) / columns or height > 2 * (y_max - y_min) / rows):
+            # Zoom beyond the finest level: the points of the view are counted if there are not too many.
+            x, y, increasing = self.x_index.view(x_min, x_max, y_min, y_max)
+            if len(x) <= Curve.DENSITY_VIEW_POINTS:
+                result = (bin_points(x, y, (x_min, x_max, y_min, y_max), (rows, columns)),
+                          (x_min, x_max, y_min, y_max))
+        self.density_key = key
+        if result is None:
+            if self.image is not None:
+                self.image.set_visible(False)
+            return True
+        counts, (left, right, bottom, top) = result
+        values = counts.astype(np.float32)
+        np.log1p(values, out=values)
+        if self.image is None:
+            # The image is added without 'imshow' which would change the aspect ratio and the limits of the plot.
+            # Its extent is the unit square: the position is given by the transform below since
+            # 'set_extent' would also change the data limits and the auto scale of the plot.
+            self.image = mpl_image.AxesImage(ax, interpolation='antialiased', origin='lower', extent=(0, 1, 0, 1))
+            ax.add_image(self.image)
+        red, green, blue, alpha = mpl_colors.to_rgba(self.color)
+        cmap = mpl_colors.LinearSegmentedColormap.from_list('density', [(red, green, blue, 0.3), (red, green, blue, 1.0)])
+        self.image.set_cmap(cmap.with_extremes(under=(0.0, 0.0, 0.0, 0.0)))
+        # Pixels without point are below 'vmin': log1p(1) is about 0.69.
+        self.image.set_norm(mpl_colors.Normalize(vmin=0.5, vmax=max(float(values.max()), 1.0)))
+        self.image.set_data(values)
+        # Offset and scale values are applied by the curve transform: a negative scale flips the image.
+        self.image.set_transform(mpl_transforms.Affine2D().scale(right - left, top - bottom).translate(left, bottom) +
+                                 self.get_transform() + ax.transData)
+        self.image.set_zorder(self.line.get_zorder())
+        self.image.set_visible(True)
+        return True
+
+    def remove_image(self):
+        """ Remove the density image from the plot."""
+        if self.image is not None:
+            self.image.remove()
+            self.image = None
+        self.density_key = None
+
+    def remove_line(self):
+        """ Remove the curve line and the density image from the plot."""
+        if self.line is not None:
+            self.line.remove()
+            self.line = None
+        self.lod_key = None
+        self.remove_image()
+
+    def read_file(self, path):
+        """ Read the curve file and show an error message if the file cannot be read.
+
+            See 'load_file' for the file formats.
+        """
+        try:
+            return Curve.load_file(path)
+        except curve_file_errors as e:
+            print('ERROR - The curve file cannot be read:', e)
+            msg.showerror('Error', 'The format of CSV file is not correct.\nPlease refer to files in the "test" folder.')
+            Application.choose_file(app)
+        # TODO: handle following exceptions: no column, strings, missing values, etc.
+
+    @staticmethod
+    @profiled('parse')
+    def load_file(path, progress=None):
+        """ Read the curve file and return its dataframe. Exceptions are not handled.
+
+            The file format is given by the file extension:
+                - '.npy': NumPy array of (X,Y) pairs, see 'read_npy'
+                - '.pvb': PlotView binary file, see 'read_pvb'
+                - '.parquet': Parquet file, see 'read_parquet'
+                - other extensions: CSV file, see 'read_csv'
+            Binary files are memory-mapped: 'x_in' and 'y_in' use the OS page cache instead of a copy in memory.
+            'progress' is called with the number of bytes and rows read (see 'LoadJob.progress').
+            This method does not use tkinter so it can run on a worker thread.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.npy':
+            df = Curve.read_npy(path)
+        elif extension == '.pvb':
+            df = Curve.read_pvb(path)
+        elif extension == '.parquet':
+            df = Curve.read_parquet(path)
+        else:
+            df = Curve.read_csv(path, progress)
+        if progress:
+            progress(os.path.getsize(path), len(df))
+        print(df)
+        return df
+
+    @staticmethod
+    def read_csv(path, progress=None):
+        """ Read the curve CSV file.
+
+            It is necessary to convert data to float in 'read_csv' in order to plot.
+            Requirements on the file format:
+                - delete unused data and headers: header should be on the first line
+                - rename column headers if necessary
+                - X data in the first column, Y data in the other columns (one curve per Y column)
+                - make sure that comma is the delimiter
+                - decimal character is the point '.'
+            The parsed columns are read from 'Curve.cache' if the CSV file did not change since the last read.
+            With 'progress', the file is read by chunks of 'CSV_CHUNK_ROWS' rows to report the progress.
+        """
+        cached = Curve.cache.get(path) if Curve.cache else None
+        if cached is None:
+            if progress is None:
+                df = pd.read_csv(path, delimiter=',', dtype=float)
+            else:
+                chunks = []
+                rows = 0
+                with open(path, 'rb') as file:
+                    for chunk in pd.read_csv(file, delimiter=',', dtype=float, chunksize=Curve.CSV_CHUNK_ROWS):
+                        chunks.append(chunk)
+                        rows += len(chunk)
+                        progress(file.tell(), rows)
+                df = pd.concat(chunks, ignore_index=True)
+            print('CSV file read:', path)
+            values = Curve.cache.put(path, df) if Curve.cache else None
+            if values is not None:
+                # The parsed columns are replaced by the memory-mapped cache file: they are freed.
+                df = pd.DataFrame(values, columns=df.columns, copy=False)
+        else:
+            # 'copy=False' keeps the memory-mapped cache file as data.
+            df = pd.DataFrame(cached[1], columns=cached[0], copy=False)
+            print('CSV file read from cache:', path)
+        return df
+
+    @staticmethod
+    def read_npy(path):
+        """ Read a NumPy '.npy' file of (X,Y) pairs.
+
+            The array has 2 columns of floats: X data then Y data. The column titles are 'X' and 'Y'.
+            A structured array with 2 float fields is also accepted: the field names are the titles.
+        """
+        values = np.load(path, mmap_mode='r')
+        if values.dtype.names:
+            if len(values.dtype.names) != 2:
+                raise ValueError('the structured array should have 2 fields.')
+            df = pd.DataFrame({name: values[name] for name in values.dtype.names}, copy=False)
+        elif values.ndim == 2 and values.shape[1] == 2:
+            df = pd.DataFrame(values, columns=['X', 'Y'], copy=False)
+        else:
+            raise ValueError('the array should have 2 columns.')
+        print('NumPy file mapped:', path)
+        return df
+
+    @staticmethod
+    def read_pvb(path):
+        """ Read a PlotView binary file.
+
+            Layout of the file (little-endian):
+                - 4 bytes: 'PVB1'
+                - 1 byte: size of a float, 4 (float32) or 8 (float64)
+                - 3 bytes: reserved
+                - 4 bytes: unsigned integer, length of the titles in bytes
+                - titles: X title and Y title in UTF-8 separated by a new line
+                - padding to the next multiple of 8 bytes
+                - data: interleaved X and Y values (X0, Y0, X1, Y1, ...)
+            See 'write_pvb' to create such a file.
+        """
+        x_title, y_title, item_size, offset = read_pvb_header(path)
+        dtype = np.dtype('<f' + str(item_size))
+        size = os.path.getsize(path) - offset
+        if size % (2 * item_size):
+            raise ValueError('the data size is not a multiple of the (X,Y) pair size.')
+        values = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(size // (2 * item_size), 2))
+        df = pd.DataFrame(values, columns=[x_title, y_title], copy=False)
+        print('PlotView binary file mapped:', path)
+        return df
+
+    @staticmethod
+    def read_parquet(path):
+        """ Read a Parquet file with 2 columns. The 'pyarrow' package is needed."""
+        df = pd.read_parquet(path, memory_map=True)
+        if len(df.columns) != 2:
+            raise ValueError('the Parquet file should have 2 columns.')
+        df = df.astype(float, copy=False)
+        print('Parquet file read:', path)
+        return df
+
+    def set_data(self, df):
+        """ Set the data read in the curve file.
+
+            The first column and the column 'column' of the dataframe are kept as 2 NumPy arrays. An array
+            is copied only if its type has to be converted (see 'Curve.float32'): memory-mapped data are not copied.
+            The X array is shared with the other curves of the same file (see 'shared_x').
+            The dataframe is not kept.
+            The X and Y titles given by a session file are kept.
+        """
+        dtype = np.float32 if Curve.float32 else np.float64
+        self.y_in = np.asarray(df.iloc[:, self.column].to_numpy(), dtype=dtype)
+        self.x_in = Curve.shared_x(self.path, np.asarray(df.iloc[:, 0].to_numpy(), dtype=dtype))
+        self.data_out = None
+        # Monotonic X values allow to find the points of the plot view by binary search.
+        self.x_index = create_index(self.x_in, self.y_in)
+        # Extrema and density pyramid are computed again only when data change.
+        self.extrema_index = None
+        self.density = None
+        if self.data_type is None:
+            self.data_type = {'x_type': df.columns[0], 'y_type': df.columns[self.column]}
+
+    @staticmethod
+    def from_session(entry, counted=True):
+        """ Create a curve without data from the values of a curve in a session file (see 'read_session').
+
+            'counted' is given to the curve creation: the curves made without GUI are not counted.
+        """
+        curve = Curve(entry['csv file path'], lazy=True, column=entry['y column'], counted=counted)
+        curve.name = entry['name']
+        curve.data_type = {'x_type': entry['x data'], 'y_type': entry['y data']}
+        curve.visibility = entry['visibility']
+        curve.color = entry['line color']
+        curve.width = entry['line width']
+        curve.style = entry['line style']
+        curve.x_offset = entry['offset in x']
+        curve.y_offset = entry['offset in y']
+        curve.x_scale = entry['scale in x']
+        curve.y_scale = entry['scale in y']
+        curve.render = entry['render mode']
+        return curve
+
+    @staticmethod
+    def session_curves():
+        """ Return the curves of the current session in the order of their ID (1 to 'Curve.count')."""
+        return [Curve.dic[str(i)] for i in range(1, Curve.count+1)]
+
+    @staticmethod
+    def shared_x(path, x):
+        """ Return the X array of a loaded curve of the same file if it has the same values as 'x', else 'x'.
+
+            All the curves of a file with several Y columns use the same X array: it is kept once in memory.
+            Watched curves are not used since their arrays grow (see 'watch_file').
+        """
+        for curve in Curve.dic.values():
+            # Missing X values (empty cells) are equal.
+            if (curve.path == path and curve.loaded() and curve.tail is None and curve.x_in.dtype == x.dtype
+                    and len(curve.x_in) == len(x)
+                    and (curve.x_in is x or np.array_equal(curve.x_in, x, equal_nan=True))):
+                return curve.x_in
+        return x
+
+    def watch(self, state):
+        """ Start or stop the live tail mode: the rows appended to the CSV file are read by 'watch_file'."""
+        self.tail = CsvTail(self.path, np.float32 if Curve.float32 else np.float64, self.column) if state else None
+
+    def watch_file(self):
+        """ Read the rows appended to the CSV file since the last call (live tail mode).
+
+            The first call reads the complete file since the position of the data read before is not known.
+            The new points are added to the arrays of 'tail': the previous points are not copied.
+            The index and the extrema are updated from the new points only when possible.
+            If the file is rewritten, it is read completely. Return True if the data changed.
+        """
+        status = self.tail.read()
+        if status == 'unchanged':
+            return False
+        old_length = len(self.x_in) if status == 'appended' and self.loaded() else 0
+        self.x_in = self.tail.x
+        self.y_in = self.tail.y
+        self.data_out = None
+        # The new points are added to the density pyramid if they are inside its bounds.
+        if not (old_length and self.density is not None and
+                self.density.add(self.x_in[old_length:], self.y_in[old_length:])):
+            self.density = None
+        if self.data_type is None:
+            self.data_type = {'x_type': self.tail.columns[0], 'y_type': self.tail.columns[self.column]}
+        # Increasing X values stay sorted if the new points follow the last one: no test on all points.
+        if (old_length and isinstance(self.x_index, SortedIndex) and not self.x_index.reverse and
+                np.all(self.x_in[old_length:] >= self.x_in[old_length-1:-1])):
+            self.x_index = SortedIndex(self.x_in, self.y_in)
+        elif old_length and isinstance(self.x_index, ChunkIndex):
+            # Only the last chunk and the new chunks are read.
+            self.x_index.extend(self.x_in, self.y_in)
+        else:
+            self.x_index = create_index(self.x_in, self.y_in)
+        # Extrema of the new points are compared to the previous extrema.
+        if old_length and self.extrema_index is not None:
+            new = find_extrema_indices(self.x_in[old_length:], self.y_in[old_length:])
+            if new is not None:
+                extrema_index = list(self.extrema_index)
+                for k, (values, better) in enumerate(((self.x_in, np.less), (self.x_in, np.greater),
+                                                      (self.y_in, np.less), (self.y_in, np.greater))):
+                    if better(values[old_length + new[k]], values[extrema_index[k]]):
+                        extrema_index[k] = old_length + new[k]
+                self.extrema_index = tuple(extrema_index)
+        else:
+            self.extrema_index = None
+        return True
+
+    def loaded(self):
+        """ Return True if the data of the curve file are read."""
+        return self.x_in is not None
+
+    def get_transform(self):
+        """ Return the scale and offset values as an affine transform for the curve line.
+
+            The plot applies it to the data when drawing: changing scale or offset does not
+            compute new arrays.
+        """
+        return mpl_transforms.Affine2D().scale(self.x_scale, self.y_scale).translate(self.x_offset, self.y_offset)
+
+    def get_data_out(self):
+        """ Return the X and Y arrays with offset and scale values.
+
+            The plot does not need it (see 'get_transform'). It is computed only when the values
+            are needed and it is cached until the offset or scale values change.
+            No array is created if the scale is 1 and the offset is 0.
+        """
+        key = (float(self.x_scale), float(self.x_offset), float(self.y_scale), float(self.y_offset))
+        if self.data_out is None or self.data_out[0] != key:
+            x_out = self.x_in
+            if self.x_scale != 1 or self.x_offset != 0:
+                x_out = self.x_in * self.x_scale + self.x_offset
+            y_out = self.y_in
+            if self.y_scale != 1 or self.y_offset != 0:
+                y_out = self.y_in * self.y_scale + self.y_offset
+            self.data_out = (key, x_out, y_out)
+        return self.data_out[1], self.data_out[2]
+
+    def memory_usage(self):
+        """ Return the memory (bytes) used by the curve data.
+
+            'data' is the memory allocated for the arrays. 'mapped' is the size of the arrays
+            which are memory-mapped files: they are in the OS page cache.
+            'shared' is the size of the X array counted by the first curve of the same file.
+            'data out' is the scaled copy (see 'get_data_out'). 'index' is the index of the points
+            (see 'SortedIndex' and 'ChunkIndex') and the density pyramid (see 'DensityPyramid'). 'tail' is the unused capacity of the buffers of a
+            watched curve (see 'CsvTail'). 'line' is the memory of the arrays copied by the matplotlib line.
+        """
+        usage = {'data': 0, 'mapped': 0, 'shared': 0, 'data out': 0, 'index': 0, 'tail': 0, 'line': 0, 'dtype': None}
+        if self.loaded():
+            usage['dtype'] = str(self.x_in.dtype)
+            owner = next((curve for curve in Curve.dic.values() if curve.x_in is self.x_in), self)
+            for array in (self.x_in, self.y_in):
+                if array is self.x_in and owner is not self:
+                    usage['shared'] += array.nbytes
+                elif is_mapped(array):
+                    usage['mapped'] += array.nbytes
+                else:
+                    usage['data'] += array.nbytes
+        # Arrays of 'data_out' which are not the input arrays.
+        if self.data_out is not None:
+            for array in self.data_out[1:]:
+                if array is not self.x_in and array is not self.y_in:
+                    usage['data out'] += array.nbytes
+        if self.x_index is not None:
+            usage['index'] = self.x_index.nbytes
+        if self.density is not None:
+            usage['index'] += self.density.nbytes
+        if self.tail is not None and self.loaded():
+            usage['tail'] = self.tail.x_buffer.nbytes + self.tail.y_buffer.nbytes - self.x_in.nbytes - self.y_in.nbytes
+        if self.line is not None:
+            usage['line'] = line_bytes(self.line, (self.x_in, self.y_in))
+        return usage
+
+    def release(self):
+        """ Free the memory which is computed again when needed: scaled copy, indices, density pyramid and line.
+
+            The data read in the file are kept. It is used for hidden curves: the line is created
+            again when the curve is shown (see 'update_line').
+        """
+        self.data_out = None
+        if self.x_index is not None:
+            self.x_index.release()
+        self.density = None
+        self.remove_line()
+
+    @profiled('get_extrema')
+    def get_extrema(self, x_window=None):
+        """ Return the extrema with offset and scale values as a dictionary.
+
+            Keys: 'x_min', 'x_min_y', 'x_max', 'x_max_y', 'y_min', 'y_min_x', 'y_max', 'y_max_x'.
+            The indices of the extrema in the file data are computed once (see 'find_extrema_indices')
+            and cached until the data change. Offset and scale values are applied to these points only:
+            the data are not read again. A negative scale swaps the min and the max.
+            'x_window' (X min, X max) gives the extrema of the points inside this X range only.
+            They are given by the index of the curve (see 'SortedIndex.extrema') without reading all the data.
+            None is returned if the curve has no value.
+        """
+        if x_window is None:
+            if self.extrema_index is None:
+                self.extrema_index = find_extrema_indices(self.x_in, self.y_in)
+            indices = self.extrema_index
+        else:
+            # X range in the coordinates of the data in the file.
+            indices = self.x_index.extrema(*sorted((value - self.x_offset) / self.x_scale for value in x_window))
+        if indices is None:
+            return None
+        x_min, x_max, y_min, y_max = indices
+        if self.x_scale < 0:
+            x_min, x_max = x_max, x_min
+        if self.y_scale < 0:
+            y_min, y_max = y_max, y_min
+
+        def point(i):
+            return (float(self.x_in[i]) * self.x_scale + self.x_offset,
+                    float(self.y_in[i]) * self.y_scale + self.y_offset)
+        extrema = {}
+        extrema['x_min'], extrema['x_min_y'] = point(x_min)
+        extrema['x_max'], extrema['x_max_y'] = point(x_max)
+        extrema['y_min_x'], extrema['y_min'] = point(y_min)
+        extrema['y_max_x'], extrema['y_max'] = point(y_max)
+        return extrema
+
+    def find_extrema(self, x_window=None, verbose=True):
+        """ all values are round to 10 -> use a variable and update first label in extrema plot (number of digits)
+
+            since pd.round() gives error on Windows, rounding is done on the float.
+            The extrema values displayed on GUI are rounded but printed values are not.
+            Values are given by 'get_extrema' which does not read the data again.
+            'x_window' (X min, X max) limits the extrema to a X range.
+            With 'verbose' False, nothing is printed: the values are updated live with the plot view.
+        """
+        extrema = self.get_extrema(x_window)
+        if extrema is None:
+            for variable in (app.extrema_x_min, app.extrema_x_max, app.extrema_y_min, app.extrema_y_max):
+                variable.set('No value')
+            if verbose:
+                print('ERROR - Curve', self.name, 'has no value in this X range.')
+            return
+        if verbose:
+            print('Extrema values for curve', self.name, 'without rounding:')
+
+        # X min and Y for X min
+        self.ext_x_min = round(extrema['x_min'], app.ROUND)
+        self.ext_x_min_y = round(extrema['x_min_y'], app.ROUND)
+        if verbose:
+            print('X min:', extrema['x_min'], ' @ Y:', extrema['x_min_y'])
+        app.extrema_x_min.set('X min ' + str(self.ext_x_min) + ' @ Y ' + str(self.ext_x_min_y))
+
+        # X max and Y for X max
+        self.ext_x_max = round(extrema['x_max'], app.ROUND)
+        self.ext_x_max_y = round(extrema['x_max_y'], app.ROUND)
+        if verbose:
+            print('X max:', extrema['x_max'], ' @ Y:', extrema['x_max_y'])
+        app.extrema_x_max.set('X max ' + str(self.ext_x_max) + ' @ Y ' + str(self.ext_x_max_y))
+
+        # Y min and X for Y min
+        self.ext_y_min = round(extrema['y_min'], app.ROUND)
+        self.ext_y_min_x = round(extrema['y_min_x'], app.ROUND)
+        if verbose:
+            print('Y min:', extrema['y_min'], '@ X:', extrema['y_min_x'])
+        app.extrema_y_min.set('Y min ' + str(self.ext_y_min) + ' @ X ' + str(self.ext_y_min_x))
+
+        # Y max and X for Y max
+        self.ext_y_max = round(extrema['y_max'], app.ROUND)
+        self.ext_y_max_x = round(extrema['y_max_x'], app.ROUND)
+        if verbose:
+            print('Y max:', extrema['y_max'], '@ X:', extrema['y_max_x'])
+        app.extrema_y_max.set('Y max ' + str(self.ext_y_max) + ' @ X ' + str(self.ext_y_max_x))
+
+
+def read_session(session_file):
+    """ Read a PlotView session file and return the plot settings and the list of curves.
+
+        The settings are the values of the 'plot' and 'annotation' sections (see 'Application.plot_settings')
+        and the working directory. Each curve is a dictionary of the values of its section.
+        Keys are the names used in the session file. Exceptions are not handled.
+        A scale of 0 is rejected as by the curve tab: the scale 1 is used instead.
+    """
+    config = configparser.ConfigParser()
+    with open(session_file, 'r') as file:
+        config.read_file(file)
+    settings = {}
+    for section in ('plot', 'annotation'):
+        settings.update(config[section])
+    for section, key in (('plot', 'auto scale'), ('plot', 'display grid'),
+                         ('annotation', 'text state'), ('annotation', 'arrow state')):
+        settings[key] = config.getboolean(section, key)
+    for key in ('legend position', 'background color'):
+        settings[key] = config.getint('plot', key)
+    settings['working directory'] = config.get('session', 'working directory')
+    curves = []
+    for i in range(1, config.getint('session', 'curve count')+1):
+        section = str(i)
+        curves.append({'name': config.get(section, 'name'),
+                       'csv file path': config.get(section, 'csv file path'),
+                       'y column': config.getint(section, 'y column', fallback=1),
+                       'x data': config.get(section, 'x data'),
+                       'y data': config.get(section, 'y data'),
+                       'visibility': config.getboolean(section, 'visibility'),
+                       'line color': config.get(section, 'line color'),
+                       'line width': config.getfloat(section, 'line width'),
+                       'line style': config.get(section, 'line style'),
+                       'offset in x': config.getfloat(section, 'offset in x'),
+                       'offset in y': config.getfloat(section, 'offset in y'),
+                       'scale in x': config.getfloat(section, 'scale in x'),
+                       'scale in y': config.getfloat(section, 'scale in y'),
+                       'render mode': config.get(section, 'render mode', fallback='line')
+                      })
+        for key in ('scale in x', 'scale in y'):
+            if curves[-1][key] == 0:
+                print('WARNING - The ' + key + ' of curve ' + section + ' cannot be 0: 1 is used.')
+                curves[-1][key] = 1.0
+    return settings, curves
+
+
+def write_session(session_file, settings, curves):
+    """ Write a PlotView session file from the plot settings and the list of curves.
+
+        'settings' has the keys of 'read_session' (plot and annotation values and the working directory).
+        'curves' is a list of Curve instances. The file is read by 'read_session'. Exceptions are not handled.
+    """
+    config = configparser.ConfigParser()
+    # Boolean values are saved as integers as the values of the check buttons.
+    values = {key: int(value) if isinstance(value, bool) else value for key, value in settings.items()}
+    # Plot data
+    config['plot'] = {key: values[key] for key in ('main title', 'x title', 'y title', 'auto scale',
+                                                    'x min user range', 'x max user range',
+                                                    'y min user range', 'y max user range',
+                                                    'x number of ticks', 'y number of ticks',
+                                                    'legend position', 'display grid', 'background color')}
+    # Annotation and arrow data
+    config['annotation'] = {key: values[key] for key in ('text', 'text x pos.', 'text y pos.', 'text color',
+                                                          'text size', 'text state', 'arrow head x pos.',
+                                                          'arrow head y pos.', 'arrow head length',
+                                                          'arrow head width', 'arrow color',
+                                                          'arrow line width', 'arrow state')}
+    # Session info
+    config['session'] = {'working directory': values['working directory'],
+                         'curve count': len(curves),
+                        }
+    # Curve data
+    for i, curve in enumerate(curves, 1):
+        config[str(i)] = {'name': curve.name,
+                          'CSV file path': curve.path,
+                          'Y column': curve.column,
+                          'X data': curve.data_type['x_type'],
+                          'Y data': curve.data_type['y_type'],
+                          'visibility': int(curve.visibility),
+                          'line color': curve.color,
+                          'line width': curve.width,
+                          'line style': curve.style,
+                          'offset in X': curve.x_offset,
+                          'offset in Y': curve.y_offset,
+                          'scale in X': curve.x_scale,
+                          'scale in Y': curve.y_scale,
+                          'render mode': curve.render
+                         }
+    # Write the file and erase existing file.
+    with open(session_file, 'w') as file:
+        config.write(file)
+
+
+def figure_colors(settings):
+    """ Return the colors for the 'background color' of the settings (see 'my_colors')."""
+    return my_colors['black_bg' if settings['background color'] == 1 else 'white_bg']
+
+
+def set_user_ranges(ax, settings):
+    """ Set the user-defined plot ranges. ValueError is raised if a value is not a number."""
+    ax.axis([float(settings['x min user range']),
+             float(settings['x max user range']),
+             float(settings['y min user range']),
+             float(settings['y max user range'])]
+           )
+
+
+def draw_annotation(ax, settings):
+    """ Draw the annotation and its arrow if required and return the annotation or None.
+
+        ValueError is raised if a position, a size or a width is not a number.
+    """
+    # Draw the annotation and the arrow
+    if settings['text state'] and settings['arrow state']:
+        return ax.annotate(settings['text'],
+                xy=(float(settings['arrow head x pos.']), float(settings['arrow head y pos.'])),
+                xytext=(float(settings['text x pos.']), float(settings['text y pos.'])),
+                color=settings['text color'],
+                fontsize=float(settings['text size']),
+                arrowprops=dict(color=settings['arrow color'],
+                                width=float(settings['arrow line width']),
+                                headwidth=float(settings['arrow head width']),
+                                headlength=float(settings['arrow head length'])
+                               )
+                )
+    # Draw the annotation only. The arrowprops is removed to avoid drawing it
+    if settings['text state']:
+        return ax.annotate(settings['text'],
+                xy=(float(settings['arrow head x pos.']), float(settings['arrow head y pos.'])),
+                xytext=(float(settings['text x pos.']), float(settings['text y pos.'])),
+                color=settings['text color'],
+                fontsize=float(settings['text size']),
+                )
+    # Draw no annotation and no arrow
+    return None
+
+
+def set_ticks(ax, settings):
+    """ Set the number of bins (axis ticks). ValueError is raised if a value is not an integer."""
+    # Abs() is used to handle negative integers.
+    ax.xaxis.set_major_locator(mpl_ticker.MaxNLocator(abs(int(settings['x number of ticks']))+1))
+    ax.yaxis.set_major_locator(mpl_ticker.MaxNLocator(abs(int(settings['y number of ticks']))+1))
+
+
+def style_plot(fig, ax, settings, handles, layout=None):
+    """ Set the colors, the legend of the lines 'handles', the titles and the grid of the plot.
+
+        With 'layout' (LayoutCache), a 'best' legend is placed by 'LayoutCache.place_legend'.
+    """
+    colors = figure_colors(settings)
+    # Background colors
+    fig.set_facecolor(colors[0])
+    ax.set_facecolor(colors[0])
+    # Axis and label colors
+    ax.tick_params(axis='both', color=colors[1], labelcolor=colors[1])
+    # Spine color
+    for spine in ('top', 'bottom', 'left', 'right'):
+        ax.spines[spine].set_color(colors[1])
+    # Hidden lines are kept in the plot so the legend handles are given explicitly.
+    if handles and layout is not None:
+        layout.legend(ax, handles, legend_locations[str(settings['legend position'])])
+    elif handles:
+        ax.legend(handles=handles, loc=legend_locations[str(settings['legend position'])])
+    elif ax.get_legend() is not None:
+        ax.get_legend().remove()
+    ax.set_title(settings['main title'], color=colors[1], fontweight='bold')
+    ax.set_xlabel(settings['x title'], color=colors[1])
+    ax.set_ylabel(settings['y title'], color=colors[1])
+    ax.grid(settings['display grid'])
+
+
+def update_artists(ax, curves, batches):
+    """ Update the lines of the loaded 'curves' and the line collections of 'batches' (see 'CurveBatches').
+
+        Only the lines of curves whose attributes changed are updated (see 'Curve.update_line').
+        Return True if the limits of the plot may change and the legend entries of the visible curves.
+        It is used by 'Application.plot_curves', 'render_figure' and the benchmark.
+    """
+    # Curves sharing a style may be drawn by a single line collection.
+    limits = batches.update(ax, curves)
+    handles = []
+    for curve in curves:
+        if not curve.loaded():
+            continue
+        if curve.update_line(ax):
+            limits = True
+        if curve.visibility and not curve.batched:
+            handles.append(curve.line)
+    handles.extend(batches.handles())
+    return limits, handles
+
+
+def autoscale_curves(ax, curves, batches):
+    """ Set the plot limits from all the points of the visible 'curves' and of the batched curves (auto scale)."""
+    # Lines with only the points of the previous view get all their points back.
+    for curve in curves:
+        if curve.line is not None:
+            curve.reset_view()
+    ax.set_autoscale_on(True)
+    ax.relim(visible_only=True)
+    batches.extend_limits(ax)
+    ax.autoscale_view()
+
+
+def update_views(ax, curves, batches, columns):
+    """ Give the 'curves' and the line collections of 'batches' the points of the plot view.
+
+        'columns' is the width (pixels) of the plot for the level of detail, 0 for all the points of the view
+        (see 'Curve.update_view'). Curves in density mode get the image of the view (see 'Curve.update_density').
+        Return True if an artist changed. It is used by 'Application.update_lod' and the benchmark.
+    """
+    x_min, x_max = ax.get_xlim()
+    y_min, y_max = ax.get_ylim()
+    changed = False
+    for curve in curves:
+        if curve.update_view(x_min, x_max, y_min, y_max, columns):
+            changed = True
+    if batches.update_view(ax, columns):
+        changed = True
+    with profiler.phase('density'):
+        for curve in curves:
+            if curve.update_density(ax):
+                changed = True
+    return changed
+
+
+def tick_labels(axis):
+    """ Return the texts of the major tick labels of a matplotlib axis and its offset text, without drawing."""
+    formatter = axis.get_major_formatter()
+    labels = tuple(formatter.format_ticks(axis.get_major_locator()()))
+    return labels + (formatter.get_offset() if hasattr(formatter, 'get_offset') else '',)
+
+
+class LayoutCache:
+    """ Cache of the plot layout: 'tight_layout' and the location of a 'best' legend.
+
+        'tight_layout' is done again only if the titles, the tick labels or the figure size changed.
+        matplotlib places a 'best' legend at each draw by testing all the points of the lines.
+        Here the location is computed from a decimated copy of the line data (at most 'PROXY_POINTS'
+        points per line, see 'decimate_groups') and kept while the lines and the view do not change.
+        The legend is then drawn at this fixed location.
+        Attributes:
+            - layout_key: tuple -> titles, tick labels and figure size of the last 'tight_layout'
+            - legend_key: tuple -> lines and view of the last 'best' location
+            - legend_loc: string -> last 'best' location
+            - handles: list -> lines of a 'best' legend, None for a fixed location
+            - times: dictionary -> time (s) of the last computation of 'tight_layout' and 'legend'
+            - counts: dictionary -> [number of computations, number of reuses] of 'tight_layout' and 'legend'
+        Methods:
+            - tight_layout: do 'tight_layout' if the layout key changed
+            - legend: create the legend
+            - place_legend: move a 'best' legend to the location with the fewest points
+            - report: return the timings as text
+    """
+    PROXY_POINTS = 2000
+    # Locations tested for a 'best' legend in the order of matplotlib, with their anchor in the axes.
+    LOCATIONS = (('upper right', 1.0, 1.0), ('upper left', 0.0, 1.0), ('lower left', 0.0, 0.0),
+                 ('lower right', 1.0, 0.0), ('right', 1.0, 0.5), ('center left', 0.0, 0.5),
+                 ('center right', 1.0, 0.5), ('lower center', 0.5, 0.0), ('upper center', 0.5, 1.0),
+                 ('center', 0.5, 0.5))
+
+    def __init__(self):
+        self.layout_key = None
+        self.legend_key = None
+        self.legend_loc = 'upper right'
+        self.handles = None
+        self.times = {'tight_layout': 0.0, 'legend': 0.0}
+        self.counts = {'tight_layout': [0, 0], 'legend': [0, 0]}
 
+    def tight_layout(self, fig, ax):
+        """ Do 'tight_layout' if the titles, the tick labels or the figure size changed. Return True if it is done."""
+        key = (tuple(fig.get_size_inches()), fig.dpi, ax.get_title(), ax.get_xlabel(), ax.get_ylabel(),
+               tick_labels(ax.xaxis), tick_labels(ax.yaxis))
+        if key == self.layout_key:
+            self.counts['tight_layout'][1] += 1
+            return False
+        start = time.perf_counter()
+        fig.tight_layout()
+        self.times['tight_layout'] = time.perf_counter() - start
+        self.counts['tight_layout'][0] += 1
+        self.layout_key = key
+        return True
 
-class Curve:
-    """ Contains all the data relative to a curve.
-        Class attribute 'count' is used the curve ID 'id' and gives the number of curves created.
-        'id' is the key of Cruve instances dictionary.
-        This key will never change whereas the user-defined 'name' can change.
+    def legend(self, ax, handles, loc):
+        """ Create the legend of the lines 'handles'. A 'best' legend uses the last 'best' location.
 
-        The default plotting parameters are those below (user can change them).
+            'place_legend' gives the 'best' location once the view and the layout are set.
+            The legend is created at the cached location: it is computed again only if its key changed.
+        """
+        if loc != 'best':
+            self.handles = None
+            return ax.legend(handles=handles, loc=loc)
+        self.handles = handles
+        return ax.legend(handles=handles, loc=self.legend_loc)
+
+    def place_legend(self, ax):
+        """ Move a 'best' legend to the location with the fewest points of the lines under it.
+
+            The points of the line collections of batched curves are also counted (see 'CurveBatches').
+            The location is kept while the lines, their data, their transform and the view do not change.
+            Return True if the legend is moved.
+        """
+        legend = ax.get_legend()
+        if self.handles is None or legend is None:
+            return False
+        lines = [line for line in self.handles if line.get_visible()]
+        # Curves drawn by line collections (see 'CurveBatches').
+        collections = [collection for collection in ax.collections
+                       if collection.get_visible() and isinstance(collection, mpl_collections.LineCollection)]
+        key = (tuple(ax.bbox.bounds),
+               tuple((id(line), line.get_label(), id(line.get_xdata(orig=True)), len(line.get_xdata(orig=True)),
+                      tuple(line.get_transform().transform([(0.0, 0.0), (1.0, 1.0)]).ravel())) for line in lines),
+               tuple((id(collection), id(collection.get_paths()),
+                      tuple(collection.get_transform().transform([(0.0, 0.0), (1.0, 1.0)]).ravel()))
+                     for collection in collections))
+        if key == self.legend_key:
+            self.counts['legend'][1] += 1
+            return False
+        start = time.perf_counter()
+        # Points of the lines in display coordinates.
+        paths = []
+        for line in lines:
+            x = np.asarray(line.get_xdata(orig=True), dtype=float)
+            y = np.asarray(line.get_ydata(orig=True), dtype=float)
+            if len(x) > self.PROXY_POINTS:
+                x, y = decimate_groups(x, y, self.PROXY_POINTS // 6)
+            paths.append(mpl_path.Path(line.get_transform().transform(np.column_stack((x, y)))))
+        # Points of the collections: only the points are counted since the segments of their curves are not joined.
+        points = []
+        for collection in collections:
+            vertices = [path.vertices for path in collection.get_paths()]
+            if vertices:
+                vertices = np.concatenate(vertices)
+                step = max(len(vertices) // (10 * self.PROXY_POINTS), 1)
+                points.append(collection.get_transform().transform(vertices[::step]))
+        renderer = ax.figure.canvas.get_renderer()
+        box = legend.get_window_extent(renderer)
+        pad = legend.borderaxespad * renderer.points_to_pixels(legend.get_texts()[0].get_fontsize())
+        x0, y0, width, height = ax.bbox.bounds
+        candidates = []
+        for order, (loc, u, v) in enumerate(self.LOCATIONS):
+            left = x0 + pad + u * (width - box.width - 2 * pad)
+            bottom = y0 + pad + v * (height - box.height - 2 * pad)
+            bbox = mpl_transforms.Bbox.from_bounds(left, bottom, box.width, box.height)
+            badness = sum(bbox.count_contains(path.vertices) + path.intersects_bbox(bbox, filled=False)
+                          for path in paths)
+            badness += sum(bbox.count_contains(vertices) for vertices in points)
+            candidates.append((badness, order, loc))
+            if badness == 0:
+                break
+        loc = min(candidates)[2]
+        moved = loc != self.legend_loc
+        if moved:
+            ax.legend(handles=self.handles, loc=loc)
+        self.legend_loc = loc
+        self.legend_key = key
+        self.times['legend'] = time.perf_counter() - start
+        self.counts['legend'][0] += 1
+        return moved
+
+    def report(self):
+        """ Return the timings of 'tight_layout' and of the 'best' legend as lines of text."""
+        lines = []
+        for name, text in (('tight_layout', 'tight_layout'), ('legend', 'Best legend location')):
+            lines.append(text + ': last ' + str(round(self.times[name] * 1000, 1)) + ' ms, ' +
+                         str(self.counts[name][0]) + ' computed, ' + str(self.counts[name][1]) + ' reused')
+        return lines
+
+
+class CurveBatches:
+    """ Curves drawn as a single LineCollection per line style (batched mode).
+
+        With hundreds of curves, one Line2D and one legend entry per curve make the plot slow.
+        In batched mode, the visible curves plotted as a line are grouped by color, width and style:
+        each group is drawn by one LineCollection and the curves have no Line2D (see 'Curve.batched').
+        The legend has one entry per group or the first 'LEGEND_TOP' curves only.
         Attributes:
-            - name: string -> user-defined name. Can be changed in the PV session
-            - path: string -> path to CSV file
-            - data_in: dataframe -> contains (X,Y) points as read in the CSV file
-            - data_type: dictionary -> contains X header and Y header
-            - data_out: dataframe -> data_in with offset and scale values to be plotted
-            - visibility: boolean -> flag to show the curve in the plot or not
-            - color: string -> color of the curve line
-            - width: float -> width of the curve line
-            - style: string -> style of the curve line
-            - x_offset: float -> X data offset after X data scale
-            - y_offset: float -> Y data offset after Y data scale
-            - x_scale: float -> X data scaling
-            - y_scale: float -> Y data scaling
-            TODO: add fig, ax, canvas, work_dir etc.
+            - mode: string -> 'never', 'auto' (batch from 'MIN_CURVES' curves) or 'always'
+            - legend: string -> 'group' for one legend entry per group, 'top' for the first curves
+            - curves: list -> batched curves in the order of the curve IDs
+            - groups: OrderedDict -> key: (color, width, style), value: list of the curves of the group
+            - collections: dictionary -> key: (color, width, style), value: LineCollection of the group
+            - view_key: tuple -> view of the segments of the collections, None to build them again
         Methods:
-            - method to read the CSV file
+            - update: group the curves and create, update or remove the collections
+            - update_view: give the collections the points of the curves in the plot view
+            - extend_limits: add the bounds of the batched curves to the data limits of the plot
+            - handles: return the legend entries of the batched curves
     """
-    count = 0
-    # Dictionary of curve instances.
-    dic = OrderedDict()
+    MIN_CURVES = 100
+    LEGEND_TOP = 10
 
-    def __init__(self, path):
-        """ Create a Curve instance based on CSV file path.
+    def __init__(self, mode='auto', legend='group'):
+        self.mode = mode
+        self.legend = legend
+        self.curves = []
+        self.groups = OrderedDict()
+        self.collections = {}
+        self.view_key = None
 
-            TODO: add all attributes in parameter to create a Curve when reading session file
+    def update(self, ax, curves):
+        """ Group the curves to batch and create, update or remove the collections in 'ax'.
+
+            The curves to batch are the visible curves plotted as a line (not in density mode).
+            The updates of their data and transform are done by the collections: a curve leaving
+            the batch gets a new line from 'Curve.update_line'. Return True if the limits of the plot may change.
         """
-        self.name = 'Name'
-        self.path = path
-        self.data_in = self.read_file(self.path)
-        self.data_type = self.get_data_types()
-        self.data_out = self.create_data_out(self.data_in)
-        self.visibility = True
-        self.color = my_colors[app.plot_fig_color][1]
-        self.width = 1.0
-        self.style = my_linestyles[0]
-        self.x_offset = 0.0
-        self.y_offset = 0.0
-        self.x_scale = 1.0
-        self.y_scale = 1.0
-        self.ext_x_min = 0.0
-        self.ext_x_min_y = 0.0
-        self.ext_x_max = 0.0
-        self.ext_x_max_y = 0.0
-        self.ext_y_min = 0.0
-        self.ext_y_min_x = 0.0
-        self.ext_y_max = 0.0
-        self.ext_y_max_x = 0.0
-        Curve.count += 1
+        selected = [curve for curve in curves if curve.loaded() and curve.visibility and curve.render == 'line']
+        if self.mode == 'never' or (self.mode == 'auto' and len(selected) < self.MIN_CURVES):
+            selected = []
+        groups = OrderedDict()
+        for curve in selected:
+            groups.setdefault((curve.color, float(curve.width), curve.style), []).append(curve)
+        changed = groups != self.groups
+        batched = set(map(id, selected))
+        for curve in curves:
+            curve.batched = id(curve) in batched
+            if curve.batched:
+                if curve.dirty & {'data', 'transform'}:
+                    changed = True
+                curve.dirty.clear()
+                curve.remove_line()
+        for key in list(self.collections):
+            if key not in groups:
+                self.collections.pop(key).remove()
+        for color, width, style in groups:
+            if (color, width, style) not in self.collections:
+                collection = mpl_collections.LineCollection([], colors=color, linewidths=width, linestyles=style,
+                                                            zorder=mpl_lines.Line2D.zorder)
+                ax.add_collection(collection, autolim=False)
+                self.collections[(color, width, style)] = collection
+        self.curves = selected
+        self.groups = groups
+        if changed:
+            # The segments are built again for the new view: old segments are not used by the auto scale.
+            for collection in self.collections.values():
+                collection.set_segments([])
+            self.view_key = None
+        return changed
 
-    def read_file(self, path):
-        """ Read the curve CSV file.
+    def update_view(self, ax, columns):
+        """ Give each collection the points of its curves inside the plot view (see 'Curve.view_data').
 
-            It is necessary to convert data to float in 'read_csv' in order to plot.
-            Requirements on the file format:
-                - delete unused data and headers: header should be on the first line
-                - rename column headers if necessary
-                - only 2 columns of data (there is no error for 1 column of data but no curve is visible)
-                - make sure that comma is the delimiter
-                - decimal character is the point '.'
+            'columns' is the width (pixels) of the plot for the level of detail, 0 for all the points of the view.
+            Offset and scale values are applied to the points of the view only. The points are simplified
+            for the size of the plot as matplotlib does for lines (see 'simplify_line').
+            Return True if the segments changed.
         """
-        try:
-            df = pd.read_csv(self.path, delimiter=',', dtype=float)
-            print('CSV file read:', self.path)
-            print(df)
-            return df
-        except (TypeError, ValueError, IndexError, AttributeError) as e:
-            msg.showerror('Error', 'The format of CSV file is not correct.\nPlease refer to files in the "test" folder.')
-            Application.choose_file(app)
-        # TODO: handle following exceptions: no column, more than 2 columns, strings, missing values, etc.
+        if not self.groups:
+            return False
+        x_min, x_max = ax.get_xlim()
+        y_min, y_max = ax.get_ylim()
+        key = (x_min, x_max, y_min, y_max, columns, tuple(ax.bbox.bounds))
+        if key == self.view_key:
+            return False
+        self.view_key = key
+        # Transforms are frozen once: they are used for all the curves.
+        transform = ax.transData.frozen()
+        inverse = transform.inverted()
+        for style, members in self.groups.items():
+            segments = []
+            for curve in members:
+                x, y = curve.view_data(*curve.file_limits(x_min, x_max, y_min, y_max), columns)
+                if curve.x_scale != 1 or curve.x_offset != 0:
+                    x = x * curve.x_scale + curve.x_offset
+                if curve.y_scale != 1 or curve.y_offset != 0:
+                    y = y * curve.y_scale + curve.y_offset
+                segments.append(simplify_line(x, y, transform, inverse))
+            self.collections[style].set_segments(segments)
+        return True
 
-    def get_data_types(self):
-        temp = {}
-        temp['x_type'] = self.data_in.columns[0]
-        temp['y_type'] = self.data_in.columns[1]
-        return temp
+    def extend_limits(self, ax):
+        """ Add the bounds of all the points of the batched curves to the data limits of 'ax'.
 
-    def create_data_out(self, df):
-        temp = df.copy()
-        return temp
+            The bounds are given by the extrema cached by the curves (see 'Curve.get_extrema').
+        """
+        corners = []
+        for curve in self.curves:
+            extrema = curve.get_extrema()
+            if extrema is not None:
+                corners.extend(((extrema['x_min'], extrema['y_min']), (extrema['x_max'], extrema['y_max'])))
+        if corners:
+            ax.update_datalim(corners)
 
-    def find_extrema(self):
-        """ all values are round to 10 -> use a variable and update first label in extrema plot (number of digits)
+    def handles(self):
+        """ Return the legend entries of the batched curves.
 
-            since pd.round() gives error on Windows, rounding is done on the float.
-            The extrema values displayed on GUI are rounded but printed values are not.
+            With 'group', each group has one entry named after its first curve and its number of curves.
+            With 'top', the first 'LEGEND_TOP' curves have an entry and the other ones are counted in a last entry.
+            The entries are lines which are not in the plot.
         """
-        print('Extrema values for curve', self.name, 'without rounding:')
-        
-        # X min
-        temp_ext_x_min = self.data_out.iloc[:, 0].min()
-        self.ext_x_min = round(temp_ext_x_min, app.ROUND)
-        # Find Y for X min
-        temp_ext_x_min_y = self.data_out.iloc[self.data_out.iloc[:, 0].idxmin(), 1]
-        self.ext_x_min_y = round(temp_ext_x_min_y, app.ROUND)
-        print('X min:', temp_ext_x_min, ' @ Y:', temp_ext_x_min_y)
-        app.extrema_x_min.set('X min ' + str(self.ext_x_min) + ' @ Y ' + str(self.ext_x_min_y))
-        
-        # X max
-        temp_ext_x_max = self.data_out.iloc[:, 0].max()
-        self.ext_x_max = round(temp_ext_x_max, app.ROUND)
-        # Find Y for X max
-        temp_ext_x_max_y = self.data_out.iloc[self.data_out.iloc[:, 0].idxmax(), 1]
-        self.ext_x_max_y = round(temp_ext_x_max_y, app.ROUND)
-        print('X max:', temp_ext_x_max, ' @ Y:', temp_ext_x_max_y)
-        app.extrema_x_max.set('X max ' + str(self.ext_x_max) + ' @ Y ' + str(self.ext_x_max_y))
+        handles = []
+        if self.legend == 'top':
+            for curve in self.curves[:self.LEGEND_TOP]:
+                handles.append(mpl_lines.Line2D([], [], color=curve.color, lw=curve.width, ls=curve.style,
+                                                label=curve.name))
+            if len(self.curves) > self.LEGEND_TOP:
+                handles.append(mpl_lines.Line2D([], [], ls='None',
+                                                label='+ ' + str(len(self.curves) - self.LEGEND_TOP) + ' curves'))
+        else:
+            for (color, width, style), members in self.groups.items():
+                label = members[0].name
+                if len(members) > 1:
+                    label += ' (+ ' + str(len(members) - 1) + ' curves)'
+                handles.append(mpl_lines.Line2D([], [], color=color, lw=width, ls=style, label=label))
+        return handles
 
-        # Y min
-        temp_ext_y_min = self.data_out.iloc[:, 1].min()
-        self.ext_y_min = round(temp_ext_y_min, app.ROUND)
-        # Find X for Y min
-        temp_ext_y_min_x = self.data_out.iloc[self.data_out.iloc[:, 1].idxmin(), 0]
-        self.ext_y_min_x = round(temp_ext_y_min_x, app.ROUND)
-        print('Y min:', temp_ext_y_min, '@ X:', temp_ext_y_min_x)
-        app.extrema_y_min.set('Y min ' + str(self.ext_y_min) + ' @ X ' + str(self.ext_y_min_x))
 
-        # Y max
-        temp_ext_y_max = self.data_out.iloc[:, 1].max()
-        self.ext_y_max = round(temp_ext_y_max, app.ROUND)
-        # Find X for Y max
-        temp_ext_y_max_x = self.data_out.iloc[self.data_out.iloc[:, 1].idxmax(), 0]
-        self.ext_y_max_x = round(temp_ext_y_max_x, app.ROUND)
-        print('Y max:', temp_ext_y_max, '@ X:', temp_ext_y_max_x)
-        app.extrema_y_max.set('Y max ' + str(self.ext_y_max) + ' @ X ' + str(self.ext_y_max_x))
+def session_curve_path(session_file, path):
+    """ Return the path of a curve file of a session file.
+
+        Relative paths are relative to the current folder as for the GUI, else to the session folder.
+    """
+    if not os.path.isabs(path) and not os.path.exists(path):
+        return os.path.join(os.path.dirname(session_file), path)
+    return path
+
+
+def render_figure(session_file, size=(8, 6), limits=None, load=None, batch='auto'):
+    """ Return the figure of a session file made without GUI on a matplotlib Agg canvas (no tkinter).
+
+        The session is read as 'Application.load_session' does and the plot is made as
+        'Application.plot_curves' does. 'size' is the figure size (in).
+        'limits' (X min, X max, Y min, Y max) replaces the plot ranges: a None value keeps the range of the session.
+        'load' reads a curve file and returns its dataframe (default: 'Curve.load_file').
+        'batch' is the mode of 'CurveBatches': sessions with a lot of curves are drawn by line collections.
+        Exceptions are not handled: a curve file which cannot be read is an error since the figure would not be complete.
+        The curves are not added to 'Curve.count' and 'Curve.dic': they are not curves of the GUI session.
+    """
+    load = Curve.load_file if load is None else load
+    settings, entries = read_session(session_file)
+    fig = mpl_figure.Figure(figsize=size)
+    backend_agg.FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    # A file with several Y columns is read once.
+    frames = {}
+    curves = []
+    for entry in entries:
+        if not entry['csv file path'] or not entry['visibility']:
+            continue
+        entry = dict(entry, **{'csv file path': session_curve_path(session_file, entry['csv file path'])})
+        curve = Curve.from_session(entry, counted=False)
+        if curve.path not in frames:
+            frames[curve.path] = load(curve.path)
+        curve.set_data(frames[curve.path])
+        curves.append(curve)
+    batches = CurveBatches(batch)
+    handles = update_artists(ax, curves, batches)[1]
+    if settings['auto scale']:
+        set_user_ranges(ax, settings)
+    else:
+        autoscale_curves(ax, curves, batches)
+    if limits is not None:
+        ax.set_xlim(limits[0], limits[1])
+        ax.set_ylim(limits[2], limits[3])
+    draw_annotation(ax, settings)
+    set_ticks(ax, settings)
+    layout = LayoutCache()
+    style_plot(fig, ax, settings, handles, layout)
+    layout.tight_layout(fig, ax)
+    # Density images and batched curves are computed for the final view and size of the plot.
+    for curve in curves:
+        curve.update_density(ax)
+    batches.update_view(ax, 0)
+    layout.place_legend(ax)
+    return fig
+
+
+def render_session(session_file, out_dir, file_format='png', dpi=100, size=(8, 6)):
+    """ Render a session file as an image file (see 'render_figure') and return (image path, time in s).
+
+        It runs in the worker processes of 'batch_render'.
+    """
+    start = time.perf_counter()
+    fig = render_figure(session_file, size)
+    image_file = os.path.join(out_dir, os.path.splitext(os.path.basename(session_file))[0] + '.' + file_format)
+    fig.savefig(image_file, dpi=dpi, facecolor=fig.get_facecolor())
+    return image_file, time.perf_counter() - start
+
+
+def batch_render(argv):
+    """ Render session files in parallel without GUI and return the exit status.
+
+        Usage: python plotview.py --render OUT_DIR SESSION [SESSION ...] [--format png] [--jobs N] [--dpi 100]
+        Each session is rendered by a worker process (see 'render_session').
+        The time of each session is printed. The exit status is 1 if a session failed.
+    """
+    parser = argparse.ArgumentParser(prog='plotview.py', description='Render PlotView session files without GUI.')
+    parser.add_argument('--render', metavar='OUT_DIR', required=True, help='folder of the image files')
+    parser.add_argument('sessions', nargs='+', metavar='SESSION', help='PlotView session file (.pv)')
+    parser.add_argument('--format', default='png', choices=('png', 'pdf', 'svg'), help='image format')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='number of worker processes')
+    parser.add_argument('--dpi', type=float, default=100, help='resolution of the images')
+    parser.add_argument('--size', type=float, nargs=2, default=(8, 6), metavar=('WIDTH', 'HEIGHT'),
+                        help='figure size (in)')
+    args = parser.parse_args(argv)
+    # The image file is named after the session file: 2 sessions cannot have the same name.
+    names = [os.path.splitext(os.path.basename(path))[0] for path in args.sessions]
+    if len(set(names)) != len(names):
+        parser.error('session files must have different names.')
+    os.makedirs(args.render, exist_ok=True)
+    start = time.perf_counter()
+    # Lazy modules are imported once before the worker processes are created (inherited on Linux).
+    for module in (np, pd, mpl_figure, backend_agg, mpl_ticker, mpl_transforms):
+        getattr(module, '__name__')
+    failures = 0
+    with ProcessPoolExecutor(max_workers=max(args.jobs, 1)) as executor:
+        futures = {executor.submit(render_session, path, args.render, args.format, args.dpi, tuple(args.size)): path
+                   for path in args.sessions}
+        for future in as_completed(futures):
+            try:
+                image_file, duration = future.result()
+                print('OK', futures[future], '->', image_file, '(' + str(round(duration, 2)) + ' s)')
+            # Any error of a session is reported: the other sessions are still rendered.
+            except Exception as e:
+                failures += 1
+                print('ERROR', futures[future], '-', type(e).__name__ + ':', e)
+    print(str(len(args.sessions) - failures) + ' of ' + str(len(args.sessions)) + ' sessions rendered in ' +
+          str(round(time.perf_counter() - start, 2)) + ' s.')
+    return 1 if failures else 0
+
+
+class MemoryCache:
+    """ Least recently used cache in memory, shared by several threads.
+
+        Least recently used entries are removed when the total size is bigger than 'max_size'.
+        Attributes:
+            - max_size: integer -> maximum size (bytes) of all entries
+            - size_of: function -> returns the size (bytes) of a value
+            - entries: OrderedDict -> key: entry key, value: (value, size)
+            - size: integer -> total size (bytes) of all entries
+            - hits: integer -> number of values found in the cache
+            - misses: integer -> number of values not found in the cache
+    """
+    def __init__(self, max_size, size_of):
+        self.max_size = max_size
+        self.size_of = size_of
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """ Return the value of 'key' or None."""
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            # The entry becomes the most recently used one.
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key][0]
+
+    def put(self, key, value):
+        """ Add the value then remove the least recently used entries. A value bigger than the cache is not kept."""
+        size = self.size_of(value)
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+            if size > self.max_size:
+                return
+            self.entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_size:
+                self.size -= self.entries.popitem(last=False)[1][1]
+
+
+# Parsed curve files of a worker process of the render server (see 'render_worker_setup').
+render_frames = None
+
+
+def render_worker_setup(frame_cache_size):
+    """ Create the cache of parsed curve files of a worker process of the render server."""
+    global render_frames
+    render_frames = MemoryCache(frame_cache_size, lambda df: int(df.memory_usage(deep=False).sum()))
+
+
+def render_load(path):
+    """ Read the curve file or return the dataframe parsed by a previous request of the worker process."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    df = render_frames.get(key)
+    if df is None:
+        df = Curve.load_file(path)
+        render_frames.put(key, df)
+    return df
+
+
+def render_png(session_file, limits, size, dpi):
+    """ Return the PNG image of the session file, the process ID and the use of its cache of curve files.
+
+        It runs in the worker processes of 'RenderService': matplotlib is not thread-safe.
+    """
+    fig = render_figure(session_file, size, limits, render_load)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, facecolor=fig.get_facecolor())
+    stats = (len(render_frames.entries), render_frames.size, render_frames.hits, render_frames.misses)
+    return buffer.getvalue(), os.getpid(), stats
+
+
+class RenderService:
+    """ Render session files as PNG images for the render server (see 'serve').
+
+        Images are kept in 'images' with a key made of the hash of the session file content,
+        the size and modification time of its curve files and the view parameters.
+        A session file or a curve file which changed gives a new key: no old image is returned.
+        Rendering is done by a pool of 'max_workers' processes since matplotlib is not thread-safe
+        (see 'render_png'). Each process keeps the curve files it parsed: 'frame_cache_size' is shared
+        by the processes. Identical requests received while the image is drawn wait for the same result.
+        Attributes:
+            - executor: ProcessPoolExecutor -> worker processes drawing the images
+            - images: MemoryCache -> PNG images of the previous requests
+            - pending: dictionary -> key: image key, value: Future of the image being drawn
+            - frames: dictionary -> key: process ID, value: use of the cache of curve files of the process
+    """
+    def __init__(self, max_workers, image_cache_size, frame_cache_size):
+        # Worker processes are started, not forked: the server threads are not copied.
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=render_worker_setup,
+                                            initargs=(frame_cache_size // max_workers,))
+        self.images = MemoryCache(image_cache_size, len)
+        self.pending = {}
+        self.frames = {}
+        self.lock = threading.RLock()
+
+    def key(self, session_file, limits, size, dpi):
+        """ Return the key of the image of a session file for the view parameters."""
+        temp = hashlib.sha1()
+        with open(session_file, 'rb') as file:
+            temp.update(file.read())
+        for entry in read_session(session_file)[1]:
+            if entry['csv file path'] and entry['visibility']:
+                path = session_curve_path(session_file, entry['csv file path'])
+                stat = os.stat(path)
+                temp.update((os.path.abspath(path) + '|' + str(stat.st_size) + '|' + str(stat.st_mtime_ns)).encode('utf-8'))
+        temp.update(repr((limits, size, dpi)).encode('utf-8'))
+        return temp.hexdigest()
+
+    def render(self, session_file, limits=None, size=(8, 6), dpi=100):
+        """ Return the PNG image of the session file and True if it was in the cache."""
+        key = self.key(session_file, limits, size, dpi)
+        with self.lock:
+            image = self.images.get(key)
+            if image is not None:
+                return image, True
+            future = self.pending.get(key)
+            if future is None:
+                future = self.executor.submit(render_png, session_file, limits, size, dpi)
+                self.pending[key] = future
+                future.add_done_callback(lambda done: self.finished(key, done))
+        return future.result()[0], False
+
+    def finished(self, key, future):
+        """ Keep the image drawn for 'key' and the use of the cache of curve files of its process."""
+        with self.lock:
+            self.pending.pop(key, None)
+            if future.cancelled() or future.exception() is not None:
+                return
+            image, pid, stats = future.result()
+            self.images.put(key, image)
+            self.frames[pid] = stats
+
+    def stats(self):
+        """ Return the use of the caches of images and of curve files (all worker processes)."""
+        with self.lock:
+            frames = [sum(values) for values in zip((0, 0, 0, 0), *self.frames.values())]
+        return {'images': len(self.images.entries), 'image bytes': self.images.size,
+                'image hits': self.images.hits, 'image misses': self.images.misses,
+                'curve files': frames[0], 'curve bytes': frames[1], 'curve hits': frames[2], 'curve misses': frames[3]}
+
+
+class RenderHandler:
+    """ HTTP requests of the render server.
+
+        GET /render?session=PATH[&xmin=&xmax=&ymin=&ymax=][&width=8&height=6][&dpi=100] returns a PNG image.
+        GET /stats returns the use of the caches as JSON.
+        The figure size (in) and the resolution must be in 'SIZE_RANGE' and 'DPI_RANGE', and the image
+        must have at most 'MAX_PIXELS' pixels: a figure of zero size cannot be drawn and huge images
+        would use all the memory.
+        'serve' combines this class with 'http.server.BaseHTTPRequestHandler': http.server is imported
+        only when the server is started (start-up time of the GUI).
+    """
+    SIZE_RANGE = (1.0, 50.0)
+    DPI_RANGE = (20.0, 600.0)
+    MAX_PIXELS = 40000000
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        service = self.server.service
+        if url.path == '/stats':
+            self.reply(200, 'application/json', json.dumps(service.stats()).encode('utf-8'))
+            return
+        if url.path != '/render':
+            self.reply(404, 'text/plain', b'Unknown path. Use /render or /stats.')
+            return
+
+        def value(name, default=None):
+            return float(query[name][0]) if name in query else default
+        try:
+            session_file = query['session'][0]
+            limits = tuple(value(name) for name in ('xmin', 'xmax', 'ymin', 'ymax'))
+            limits = None if limits == (None, None, None, None) else limits
+            size = (value('width', 8), value('height', 6))
+            dpi = value('dpi', 100)
+        except (KeyError, ValueError):
+            self.reply(400, 'text/plain', b'Parameters: session=PATH and numbers for xmin, xmax, ymin, ymax, width, height, dpi.')
+            return
+        # Comparisons are False for NaN: it is rejected too.
+        if (not all(self.SIZE_RANGE[0] <= length <= self.SIZE_RANGE[1] for length in size) or
+                not self.DPI_RANGE[0] <= dpi <= self.DPI_RANGE[1] or size[0] * size[1] * dpi**2 > self.MAX_PIXELS):
+            self.reply(400, 'text/plain', ('width and height must be between ' + str(self.SIZE_RANGE[0]) + ' and ' +
+                                           str(self.SIZE_RANGE[1]) + ' in, dpi between ' + str(self.DPI_RANGE[0]) +
+                                           ' and ' + str(self.DPI_RANGE[1]) + ', at most ' + str(self.MAX_PIXELS) +
+                                           ' pixels.').encode('utf-8'))
+            return
+        start = time.perf_counter()
+        try:
+            image, cached = service.render(session_file, limits, size, dpi)
+        # Any error of the session is returned: the server keeps running.
+        except Exception as e:
+            self.reply(500, 'text/plain', (type(e).__name__ + ': ' + str(e)).encode('utf-8'))
+            return
+        self.reply(200, 'image/png', image,
+                   {'X-PlotView-Cache': 'hit' if cached else 'miss',
+                    'X-PlotView-Time': str(round(time.perf_counter() - start, 4))})
+
+    def reply(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(argv):
+    """ Run the local render server until Ctrl+C and return the exit status.
+
+        Usage: python plotview.py --serve [--port 8765] [--jobs N] [--image-cache 64] [--curve-cache 512]
+        The server listens on localhost only: it reads any session file path given in the requests.
+    """
+    parser = argparse.ArgumentParser(prog='plotview.py', description='Local server rendering PlotView session files.')
+    parser.add_argument('--serve', action='store_true', required=True)
+    parser.add_argument('--port', type=int, default=8765, help='port on localhost')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='number of rendering processes')
+    parser.add_argument('--image-cache', type=float, default=64, help='size (MB) of the cache of images')
+    parser.add_argument('--curve-cache', type=float, default=512, help='size (MB) of the cache of parsed curve files')
+    args = parser.parse_args(argv)
+    import http.server
+    handler = type('RenderHandler', (RenderHandler, http.server.BaseHTTPRequestHandler), {})
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', args.port), handler)
+    server.service = RenderService(max(args.jobs, 1), int(args.image_cache * 1024**2), int(args.curve_cache * 1024**2))
+    print('PlotView render server: http://127.0.0.1:' + str(server.server_address[1]) + '/render?session=PATH')
+    # A terminated server also stops its worker processes (see 'finally').
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.executor.shutdown()
+    return 0
 
 
 class Application(tk.Tk):
@@ -184,8 +2912,8 @@ class Application(tk.Tk):
         """ Initialize the main window.
 
             The window is launched with a size of 1280 x 720 but it can be resized.
-            The matplotlib are is defined 16 x 12 in which is bigger than the available space.
-            Yet it is not a problem because it is handled by tk window manager.
+            The matplotlib figure follows the size of the plot area (see 'canvas_configured'):
+            only the visible pixels are drawn.
 
             Constants:
             - PV_VERSION: string -> plot view version as shown by git tag.
@@ -193,10 +2921,25 @@ class Application(tk.Tk):
             - WIN_SIZE_POS: string -> window size (width x height) and position relative
                                       to top left corner.
             - FONT_SIZE: integer -> size of font to be used for all widget texts.
-            - PLOT_WIDTH: float -> width (in) of matplotlib figure.
-            - PLOT_HEIGHT: float -> height (in) of matplotlib figure.
+            - PLOT_WIDTH: float -> initial width (in) of matplotlib figure. Then it follows the plot area.
+            - PLOT_HEIGHT: float -> initial height (in) of matplotlib figure. Then it follows the plot area.
+            - PLOT_DPI: float -> resolution of the plot on screen: a higher value gives bigger texts
+                                 and lines for HiDPI screens. 'auto' uses the resolution of the screen.
+            - EXPORT_DPI: float -> resolution of the images saved by the tool bar. 'figure' uses PLOT_DPI.
+            - RESIZE_DELAY_MS: integer -> the figure is resized once the plot area did not change for this delay (ms).
             - MAX_STR_CREATE_CURVE: int -> number of caracters to be displayed to show the
                                            working directory.
+            - CACHE_DIR: string -> folder of the cache for parsed CSV files.
+            - CACHE_MAX_SIZE: integer -> maximum size (bytes) of the cache for parsed CSV files.
+            - CACHE_HASH: boolean -> add the hash of the CSV file content to the cache key.
+            - LOADER_POLL_MS: integer -> period (ms) to check the curve files read by worker threads.
+            - LOADER_WORKERS: integer -> number of worker threads reading curve files at the same time.
+            - WATCH_POLL_MS: integer -> period (ms) to check the CSV files of watched curves (live tail mode).
+            - PREWARM_MODULES: tuple -> modules imported in the background after start-up.
+            - REDRAW_DELAY_MS: integer -> plot update requests made during this delay (ms) give one update.
+                                          With 0, the requests made until the main loop is idle are joined.
+            - STALL_THRESHOLD_MS: integer -> latency (ms) of the main loop reported as a stall
+                                             (environment variable 'PV_STALL_MS', 0 to disable).
 
             Variables:
             - work_dir: string -> directory path showing working directory.
@@ -214,8 +2957,11 @@ class Application(tk.Tk):
         self.WIN_SIZE_POS = '1280x780'
         self.FONT_SIZE = 9
         # Matplotlib parameters.
-        self.PLOT_WIDTH = 16
-        self.PLOT_HEIGHT = 12
+        self.PLOT_WIDTH = 6
+        self.PLOT_HEIGHT = 4
+        self.PLOT_DPI = 100
+        self.EXPORT_DPI = 'figure'
+        self.RESIZE_DELAY_MS = 100
         # Parameters for widgets on RH tool panel.
         # Padding for all containers to uniformize the look
         self.CONTAINER_PADX = 10
@@ -244,6 +2990,31 @@ class Application(tk.Tk):
         # Number of decimals for rounding operation
         self.ROUND = 5
 
+        # Cache of parsed CSV files shared by all curves.
+        self.CACHE_DIR = os.path.join(os.path.expanduser('~'), '.plotview_cache')
+        self.CACHE_MAX_SIZE = 1024 * 1024 * 1024
+        self.CACHE_HASH = False
+        Curve.cache = CurveCache(self.CACHE_DIR, self.CACHE_MAX_SIZE, self.CACHE_HASH)
+
+        # Curve files are read on a worker thread. Results are polled every LOADER_POLL_MS.
+        self.LOADER_POLL_MS = 100
+        self.LOADER_WORKERS = min(4, os.cpu_count() or 1)
+        self.loader = CurveLoader(self.LOADER_WORKERS)
+        # Watched curves read the rows appended to their CSV file every WATCH_POLL_MS.
+        self.WATCH_POLL_MS = 1000
+        self.watch_pending = False
+        # Plot updates are requested by 'request_redraw' and done once by 'redraw'.
+        self.REDRAW_DELAY_MS = 0
+        self.redraw_pending = False
+        # Window of the memory report (see 'memory_report').
+        self.memory_window = None
+        # Stalls of the main loop are printed with the stack of the main thread (see 'StallWatchdog').
+        try:
+            self.STALL_THRESHOLD_MS = int(os.environ.get('PV_STALL_MS', 100))
+        except ValueError:
+            self.STALL_THRESHOLD_MS = 100
+        self.watchdog = None
+
         # TTK styling. Does not work for TEntry, TCombobox
         s = ttk.Style()
         # Options: default, clam, alt, classic
@@ -253,19 +3024,94 @@ class Application(tk.Tk):
         s.configure('w4.TButton', width=6)
         s.configure('w4.TButton', width=9)
 
+        # Start-up time of each phase (see 'startup_mark').
+        self.startup_times = [('imports', (IMPORT_TIME - START_TIME) * 1000)]
+        # Modules imported in the background once the window is shown (see 'prewarm').
+        self.PREWARM_MODULES = ('pandas',)
+
         # METHODS
         # Allows root window to be closed by the closing icon.
         self.protocol('WM_DELETE_WINDOW', self.app_quit)
         # Setup the loayout of the main window.
         self.window_setup()
+        self.startup_mark('window')
         # Create the tool 'Curve' tab on the RH side
         self.curve_tab()
-        # Create the tool 'Plot' tab on the RH side
-        self.plot_tab()
-        # Create the tool 'Annotation' tab on the RH side
-        self.annotation_tab()
-        # Create the tool 'Extrema' tab on the RH side
-        self.extrema_tab()
+        self.startup_mark('curve tab')
+        # The tools 'Plot', 'Annotation' and 'Extrema' tabs are built the first time they are
+        # selected or needed (see 'build_tab'). An empty frame keeps their place in the notebook.
+        self.tab_builders = {'Plot area': self.plot_tab,
+                             'Annotation': self.annotation_tab,
+                             'Extrema': self.extrema_tab
+                            }
+        self.tab_frames = {}
+        # Time (ms) to build each tab, shown by the start-up report.
+        self.tab_times = {}
+        for text in self.tab_builders:
+            self.tab_frames[text] = ttk.Frame(self.tool_notebook)
+            self.tool_notebook.add(self.tab_frames[text], text=text)
+        self.tool_notebook.bind('<<NotebookTabChanged>>', self.tab_changed)
+        # matplotlib is imported and the plot area is created once the window is shown.
+        self.after_idle(self.figure_setup)
+
+    def startup_mark(self, phase):
+        """ Save the time (ms) since the start of the application for the start-up report."""
+        self.startup_times.append((phase, (time.perf_counter() - START_TIME) * 1000))
+
+    def startup_report(self):
+        """ Show the time of each start-up phase and the time to build each tab (see 'build_tab')."""
+        lines = []
+        previous = 0
+        for phase, total in self.startup_times:
+            lines.append(phase + ': ' + str(round(total - previous)) + ' ms (total ' + str(round(total)) + ' ms)')
+            previous = total
+        # Tabs are built when they are first needed: their time is not part of the start-up phases.
+        for text, duration in self.tab_times.items():
+            lines.append('Tab ' + text + ' built in ' + str(round(duration)) + ' ms')
+        print('Start-up report:\n' + '\n'.join(lines))
+        msg.showinfo('Start-up report', '\n'.join(lines))
+
+    def prewarm(self):
+        """ Import the modules used to read curve files so that the first curve is read faster.
+
+            It runs on a background thread: the GUI is not frozen.
+        """
+        for name in self.PREWARM_MODULES:
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                print('The necessary Python packages are not installed.\n' + str(e))
+                print('Please check the required packages at https://github.com/fa201/PlotView.')
+        self.startup_times.append(('background imports', (time.perf_counter() - START_TIME) * 1000))
+
+    def build_tab(self, text):
+        """ Build the tab 'text' in place of its empty frame if it is not built yet.
+
+            Each tab method adds its tab at the end of the notebook: it is moved to the place of the empty frame.
+        """
+        frame = self.tab_frames.pop(text, None)
+        if frame is None:
+            return
+        start = time.perf_counter()
+        selected = self.tool_notebook.select() == str(frame)
+        self.tab_builders[text]()
+        tab = self.tool_notebook.tabs()[-1]
+        self.tool_notebook.insert(self.tool_notebook.index(frame), tab)
+        # The tab is selected before removing the empty frame: another tab would be selected (and built).
+        if selected:
+            self.tool_notebook.select(tab)
+        self.tool_notebook.forget(frame)
+        frame.destroy()
+        self.tab_times[text] = (time.perf_counter() - start) * 1000
+
+    def ensure_tabs(self):
+        """ Build all the tabs not built yet. It is called before using the widgets of the tabs."""
+        for text in list(self.tab_frames):
+            self.build_tab(text)
+
+    def tab_changed(self, event):
+        """ Build the selected tab the first time it is selected."""
+        self.build_tab(self.tool_notebook.tab('current', 'text'))
 
     def create_underscores(self):
         """ Creates a string with underscores to fill the 'work_dir' and 'work file' labels when empty.
@@ -308,6 +3154,7 @@ class Application(tk.Tk):
         menu_help = tk.Menu(menu_main, tearoff='False')
         # Add menu_file in menu_main
         menu_main.add_cascade(label='File', menu=menu_file)
+        menu_main.add_cascade(label='Preferences', menu=menu_pref)
         menu_main.add_cascade(label='Help', menu=menu_help)
         # Link of main menu to root window
         self.config(menu=menu_main)
@@ -316,9 +3163,52 @@ class Application(tk.Tk):
         menu_file.add_command(label='Save session', command=self.save_session)
         menu_file.add_separator()
         menu_file.add_command(label='Quit', command=self.app_quit)
+        # Preferences Menu
+        self.float32_state = tk.BooleanVar(self, value=Curve.float32)
+        menu_pref.add_checkbutton(label='Store new curves in float32', variable=self.float32_state,
+                                  command=self.update_float32)
+        self.lod_state = tk.BooleanVar(self, value=True)
+        menu_pref.add_checkbutton(label='Level of detail for large curves', variable=self.lod_state,
+                                  command=self.update_lod)
+        # Batched mode: curves sharing a style are drawn by a single line collection (see 'CurveBatches').
+        menu_batch = tk.Menu(menu_pref, tearoff='False')
+        menu_batch_legend = tk.Menu(menu_pref, tearoff='False')
+        menu_pref.add_cascade(label='Batch curves sharing a style', menu=menu_batch)
+        menu_pref.add_cascade(label='Legend of batched curves', menu=menu_batch_legend)
+        self.batch_state = tk.StringVar(self, value='auto')
+        for value, label in (('never', 'Never'), ('auto', 'From ' + str(CurveBatches.MIN_CURVES) + ' curves'),
+                             ('always', 'Always')):
+            menu_batch.add_radiobutton(label=label, value=value, variable=self.batch_state,
+                                       command=self.update_batching)
+        self.batch_legend_state = tk.StringVar(self, value='group')
+        for value, label in (('group', 'One entry per style'),
+                             ('top', 'First ' + str(CurveBatches.LEGEND_TOP) + ' curves')):
+            menu_batch_legend.add_radiobutton(label=label, value=value, variable=self.batch_legend_state,
+                                              command=self.update_batching)
+        # Resolution of the plot on screen and of the saved images.
+        menu_dpi = tk.Menu(menu_pref, tearoff='False')
+        menu_export_dpi = tk.Menu(menu_pref, tearoff='False')
+        menu_pref.add_cascade(label='Screen resolution (DPI)', menu=menu_dpi)
+        menu_pref.add_cascade(label='Export resolution (DPI)', menu=menu_export_dpi)
+        self.dpi_state = tk.StringVar(self, value=str(self.PLOT_DPI))
+        for value in ('auto', '72', '100', '120', '150', '200'):
+            menu_dpi.add_radiobutton(label=value.capitalize(), value=value, variable=self.dpi_state,
+                                     command=self.update_dpi)
+        self.export_dpi_state = tk.StringVar(self, value=str(self.EXPORT_DPI))
+        for value in ('figure', '100', '150', '300', '600'):
+            menu_export_dpi.add_radiobutton(label='Same as screen' if value == 'figure' else value, value=value,
+                                            variable=self.export_dpi_state, command=self.update_dpi)
         # Help Menu
         menu_help.add_command(label='Help files', command=self.help_message)
         menu_help.add_command(label='Licence', command=self.licence_message)
+        menu_help.add_command(label='Memory report', command=self.memory_report)
+        menu_help.add_command(label='Start-up report', command=self.startup_report)
+        self.profile_state = tk.BooleanVar(self, value=profiler.enabled)
+        menu_help.add_checkbutton(label='Profiling mode', variable=self.profile_state, command=self.update_profiling)
+        self.cprofile_state = tk.BooleanVar(self, value=profiler.use_cprofile)
+        menu_help.add_checkbutton(label='Save cProfile files', variable=self.cprofile_state,
+                                  command=self.update_profiling)
+        menu_help.add_command(label='Profiling report', command=self.profiling_report)
         menu_help.add_separator()
         menu_help.add_command(label='About', command=self.about_redirect)
 
@@ -335,6 +3225,30 @@ class Application(tk.Tk):
                                relief=tk.SUNKEN,
                                anchor=tk.W,
                                )
+        # The cache statistics are shown on the right of the status bar.
+        self.cache_status = ttk.Label(self.status_frame,
+                                      text='',
+                                      relief=tk.SUNKEN,
+                                      anchor=tk.E,
+                                     )
+        self.cache_status.pack(side=tk.RIGHT)
+        self.update_cache_status()
+        # The number of stalls of the main loop is shown on the right of the status bar.
+        self.stall_status = ttk.Label(self.status_frame,
+                                      text=' Stalls: 0 ',
+                                      relief=tk.SUNKEN,
+                                      anchor=tk.E,
+                                     )
+        if self.STALL_THRESHOLD_MS > 0:
+            self.stall_status.pack(side=tk.RIGHT)
+        # The progress of curve loading is shown only while files are read.
+        self.load_frame = ttk.Frame(self.status_frame)
+        self.load_bar = ttk.Progressbar(self.load_frame, length=150, mode='determinate', maximum=1.0)
+        self.load_bar.pack(side=tk.LEFT)
+        self.load_label = ttk.Label(self.load_frame, text='')
+        self.load_label.pack(side=tk.LEFT)
+        ttk.Button(self.load_frame, text='Cancel', command=self.cancel_loading, style='w6.TButton'
+                  ).pack(side=tk.LEFT)
         # The label shoul expand on the total window width.
         self.status.pack(fill=tk.BOTH, expand=False)
 
@@ -347,29 +3261,262 @@ class Application(tk.Tk):
         self.tool_notebook = ttk.Notebook(self.tool_frame)
         self.tool_notebook.pack(expand=True, fill=tk.BOTH)
 
-        # CREATE PLOT AREA ON THE LEFT
-        # Tip: https://stackoverflow.com/questions/29432683/resizing-a-matplotlib-plot-in-a-tkinter-toplevel
-        self.fig = plt.Figure(figsize=(self.PLOT_WIDTH, self.PLOT_HEIGHT))
-        self.ax = self.fig.add_subplot(111)
+        # The plot area on the left is created by 'figure_setup' once the window is shown.
+        self.mat_frame = ttk.Frame(self)
+        self.mat_frame.pack(expand=True, fill=tk.BOTH, side=tk.LEFT)
         # Color setting according to plot backgroung color
         # plot_fig_color is initialized here but the value will be updatedbased on radiobutton state
         self.plot_fig_color = 'white_bg'
-        self.mat_frame = ttk.Frame(self)
-        self.mat_frame.pack(expand=True, fill=tk.BOTH, side=tk.LEFT)
+
+    def figure_setup(self):
+        """ Create the matplotlib figure, its canvas and its navigation tool bar in the plot area.
+
+            It is called once the window is shown since importing matplotlib takes most of the start-up time.
+            Then the modules of 'PREWARM_MODULES' are imported in the background.
+            The application is closed with an error message if matplotlib cannot be imported.
+        """
+        self.startup_mark('window shown')
+        try:
+            # The first use of a lazy module imports it (see 'LazyModule').
+            mpl_figure.Figure, backend_tkagg.FigureCanvasTkAgg
+        except ImportError as e:
+            print('The necessary Python packages are not installed.\n' + str(e))
+            print('Please check the required packages at https://github.com/fa201/PlotView.')
+            msg.showerror('Error', 'The necessary Python packages are not installed.\n' + str(e) +
+                          '\nPlease check the required packages at https://github.com/fa201/PlotView.')
+            self.app_quit()
+            return
+        # CREATE PLOT AREA ON THE LEFT
+        # Tip: https://stackoverflow.com/questions/29432683/resizing-a-matplotlib-plot-in-a-tkinter-toplevel
+        # The figure is small at first: it takes the size of the plot area (see 'canvas_configured').
+        # Logical resolution of the plot: the pixel ratio of HiDPI screens is applied by 'resize_figure'.
+        self.plot_dpi = self.screen_dpi()
+        self.fig = mpl_figure.Figure(figsize=(self.PLOT_WIDTH, self.PLOT_HEIGHT), dpi=self.plot_dpi)
+        self.ax = self.fig.add_subplot(111)
+        # Annotation drawn by 'plot_curves'. It is replaced at each plot update.
+        self.annotation_artist = None
+        # 'tight_layout' and the 'best' legend location are kept while the plot does not change.
+        self.layout = LayoutCache()
+        # Curves sharing a style may be drawn by a single line collection.
+        self.batches = CurveBatches(self.batch_state.get(), self.batch_legend_state.get())
+        # Large curves are reduced again when zoom, pan or window size change the view.
+        self.lod_pending = False
+        self.ax.callbacks.connect('xlim_changed', self.view_changed)
+        self.ax.callbacks.connect('ylim_changed', self.view_changed)
         # Creates a drawing area to put the Figure
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.mat_frame)
-        self.canvas.draw()
+        self.canvas = backend_tkagg.FigureCanvasTkAgg(self.fig, master=self.mat_frame)
+        self.canvas.mpl_connect('resize_event', self.view_changed)
+        # The profiling mode gives the time from 'draw_idle' to the actual draw.
+        self.canvas.mpl_connect('draw_event', profiler.drawn)
         # Creates the Matplotlib navigation tool bar for figures.
-        self.toolbar = NavigationToolbar2Tk(self.canvas, self.mat_frame)
+        self.toolbar = backend_tkagg.NavigationToolbar2Tk(self.canvas, self.mat_frame)
         #self.toolbar.draw() shows a bug with matplotlib 3.5
         self.toolbar.update()
-        self.canvas.get_tk_widget().pack()
+        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        # The figure is resized once the size of the plot area stops changing (window resized by the user).
+        self.resize_pending = None
+        self.canvas_size = None
+        self.canvas.get_tk_widget().bind('<Configure>', self.canvas_configured)
+        mpl.rcParams['savefig.dpi'] = self.export_dpi()
+        self.startup_mark('figure')
+        threading.Thread(target=self.prewarm, daemon=True).start()
+        # The watchdog starts after the start-up: the main loop runs from now on.
+        if self.STALL_THRESHOLD_MS > 0:
+            self.watchdog = StallWatchdog(self, self.STALL_THRESHOLD_MS / 1000, self.update_stall_status)
+            self.watchdog.start()
 
     def app_quit(self):
         """ Quit the application and free the stack."""
+        # Worker threads stop at the next chunk of data.
+        self.loader.cancel()
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        # The order of use of the cache entries is saved once.
+        Curve.cache.flush()
         self.destroy()
         sys.exit(0)
 
+    def canvas_configured(self, event):
+        """ Resize the figure to the plot area once its size did not change for 'RESIZE_DELAY_MS'.
+
+            It replaces the resize of the matplotlib canvas which draws the figure at each step of a window resize.
+        """
+        self.canvas_size = (event.width, event.height)
+        if self.resize_pending is not None:
+            self.after_cancel(self.resize_pending)
+        self.resize_pending = self.after(self.RESIZE_DELAY_MS, self.resize_figure)
+
+    def resize_figure(self):
+        """ Give the figure the size (pixels) of the plot area at the current resolution and draw it."""
+        self.resize_pending = None
+        if self.canvas_size is None:
+            return
+        width, height = self.canvas_size
+        # matplotlib sets the resolution from the one of the figure creation when the pixel ratio of the
+        # screen changes: the resolution of the Preferences menu is applied again.
+        dpi = self.plot_dpi * self.canvas.device_pixel_ratio
+        if self.fig.dpi != dpi:
+            self.fig.set_dpi(dpi)
+        # The matplotlib canvas resizes the figure (size in inches = pixels / dpi) and draws it.
+        self.canvas.resize(types.SimpleNamespace(width=width, height=height))
+        # Margins are computed again for the new size (see 'LayoutCache').
+        self.layout.tight_layout(self.fig, self.ax)
+
+    def screen_dpi(self):
+        """ Return the logical resolution of the plot on screen from the Preferences menu.
+
+            matplotlib multiplies it by the pixel ratio of HiDPI screens (Tk scaling): 'auto' gives
+            the default resolution of matplotlib which is scaled in the same way.
+        """
+        if self.dpi_state.get() == 'auto':
+            return float(mpl.rcParams['figure.dpi'])
+        return float(self.dpi_state.get())
+
+    def export_dpi(self):
+        """ Return the resolution of the images saved by the tool bar from the Preferences menu.
+
+            'figure' gives the screen resolution: matplotlib would use the resolution of the figure creation.
+        """
+        value = self.export_dpi_state.get()
+        return self.screen_dpi() if value == 'figure' else float(value)
+
+    def update_dpi(self):
+        """ Apply the screen and export resolutions. The figure keeps the size of the plot area."""
+        mpl.rcParams['savefig.dpi'] = self.export_dpi()
+        self.plot_dpi = self.screen_dpi()
+        # The pixel ratio of HiDPI screens is applied by 'resize_figure'.
+        self.canvas_size = (self.canvas.get_tk_widget().winfo_width(), self.canvas.get_tk_widget().winfo_height())
+        self.resize_figure()
+        self.set_status('Resolution: ' + str(round(self.plot_dpi)) + ' DPI on screen, ' +
+                        ('same as screen' if self.export_dpi_state.get() == 'figure'
+                         else str(round(self.export_dpi())) + ' DPI') + ' for saved images.')
+
+    def update_batching(self):
+        """ Set the batched mode and the legend of batched curves from the Preferences menu and update the plot."""
+        self.batches.mode = self.batch_state.get()
+        self.batches.legend = self.batch_legend_state.get()
+        self.request_redraw()
+
+    def update_float32(self):
+        """ Store the data of the next curves read as float32 (half memory) or float64."""
+        Curve.float32 = self.float32_state.get()
+        if Curve.float32:
+            self.set_status('Data of the next curves read will be stored as float32.')
+        else:
+            self.set_status('Data of the next curves read will be stored as float64.')
+
+    def memory_report(self):
+        """ Show the memory used by each curve, by the process and by the cache in a new window.
+
+            The window is updated by its 'Refresh' button. 'Release hidden curves' frees the memory
+            of hidden curves which is computed again when needed (see 'Curve.release').
+        """
+        if self.memory_window is not None and self.memory_window.winfo_exists():
+            self.memory_window.lift()
+            self.update_memory_report()
+            return
+        self.memory_window = tk.Toplevel(self)
+        self.memory_window.title('Memory report')
+        columns = ('state', 'data', 'mapped', 'shared', 'data out', 'index', 'tail', 'line', 'total')
+        self.memory_table = ttk.Treeview(self.memory_window, columns=columns, height=16)
+        self.memory_table.heading('#0', text='Curve')
+        self.memory_table.column('#0', width=200)
+        for column in columns:
+            self.memory_table.heading(column, text=column.capitalize() + (' (MB)' if column != 'state' else ''))
+            self.memory_table.column(column, width=80, anchor=tk.E)
+        self.memory_table.pack(fill=tk.BOTH, expand=True)
+        self.memory_total = ttk.Label(self.memory_window)
+        self.memory_total.pack(fill=tk.X, padx=self.WIDGET_PADX, pady=self.WIDGET_PADY)
+        buttons = ttk.Frame(self.memory_window)
+        buttons.pack(fill=tk.X)
+        ttk.Button(buttons, text='Refresh', command=self.update_memory_report).pack(side=tk.LEFT, padx=self.WIDGET_PADX)
+        ttk.Button(buttons, text='Release hidden curves', command=self.release_hidden).pack(side=tk.LEFT,
+                                                                                            padx=self.WIDGET_PADX)
+        self.update_memory_report()
+
+    def update_memory_report(self):
+        """ Update the table of the memory report and return the memory (bytes) used by all curves."""
+        def mb(size):
+            return round(size / 1024**2, 2)
+        lines = []
+        total = 0
+        self.memory_table.delete(*self.memory_table.get_children())
+        for key, curve in Curve.dic.items():
+            usage = curve.memory_usage()
+            # Memory-mapped and shared arrays are not counted: they are in the OS page cache or in another curve.
+            curve_total = sum(usage[name] for name in ('data', 'data out', 'index', 'tail', 'line'))
+            total += curve_total
+            if not curve.loaded():
+                state = 'not loaded'
+            else:
+                state = ('visible ' if curve.visibility else 'hidden ') + usage['dtype']
+            self.memory_table.insert('', tk.END, text=key + ' - ' + curve.name,
+                                     values=(state, mb(usage['data']), mb(usage['mapped']), mb(usage['shared']),
+                                             mb(usage['data out']), mb(usage['index']), mb(usage['tail']),
+                                             mb(usage['line']), mb(curve_total)))
+            lines.append(key + ' - ' + curve.name + ' (' + state + '): ' + str(mb(curve_total)) + ' MB')
+        rss = process_memory()
+        text = ('Curves: ' + str(mb(total)) + ' MB | Process (RSS): ' +
+                (str(mb(rss)) + ' MB' if rss is not None else 'not available') +
+                ' | Cache on disk: ' + str(mb(Curve.cache.size())) + ' MB (' + str(len(Curve.cache.index)) + ' files)')
+        self.memory_total.config(text=text)
+        lines.append(text)
+        print('Memory report:\n' + '\n'.join(lines))
+        return total
+
+    def release_hidden(self):
+        """ Free the memory of the hidden curves which is computed again when needed (see 'Curve.release')."""
+        before = self.update_memory_report()
+        for curve in Curve.session_curves():
+            if not curve.visibility:
+                curve.release()
+        freed = before - self.update_memory_report()
+        self.set_status('Memory released by hidden curves: ' + str(round(freed / 1024**2, 2)) + ' MB.')
+
+    def update_profiling(self):
+        """ Set the profiling mode from the Help menu (see 'Profiler')."""
+        profiler.enabled = self.profile_state.get()
+        profiler.use_cprofile = self.cprofile_state.get()
+        if profiler.enabled and profiler.use_cprofile:
+            self.set_status('Profiling mode is on. cProfile files are saved in: ' + profiler.directory)
+        elif profiler.enabled:
+            self.set_status('Profiling mode is on.')
+        else:
+            self.set_status('Profiling mode is off.')
+
+    def profiling_report(self):
+        """ Show the slowest recent operations with the time of their phases in a new window."""
+        records = profiler.slowest()
+        # The layout timings are kept even if the profiling mode is off.
+        layout = self.layout.report() if hasattr(self, 'layout') else []
+        if not records:
+            msg.showinfo('Profiling report', 'No operation is recorded.\nSet the profiling mode in the Help menu.\n\n' +
+                         '\n'.join(layout))
+            return
+        window = tk.Toplevel(self)
+        window.title('Profiling report - slowest recent operations')
+        table = ttk.Treeview(window, columns=('time', 'count', 'start'), height=20)
+        table.heading('#0', text='Operation / phase')
+        table.heading('time', text='Time (ms)')
+        table.heading('count', text='Calls')
+        table.heading('start', text='Start / cProfile file')
+        table.column('#0', width=220)
+        table.column('time', width=90, anchor=tk.E)
+        table.column('count', width=60, anchor=tk.E)
+        table.column('start', width=380)
+        lines = []
+        for record in records:
+            start = time.strftime('%H:%M:%S', time.localtime(record['start']))
+            parent = table.insert('', tk.END, text=record['name'], open=False,
+                                  values=(round(record['seconds'] * 1000, 1), 1, record['profile'] or start))
+            lines.append(record['name'] + ': ' + str(round(record['seconds'] * 1000, 1)) + ' ms at ' + start)
+            for name, (seconds, count) in sorted(record['phases'].items(), key=lambda item: -item[1][0]):
+                table.insert(parent, tk.END, text=name, values=(round(seconds * 1000, 1), count, ''))
+                lines.append('    ' + name + ': ' + str(round(seconds * 1000, 1)) + ' ms (' + str(count) + ' calls)')
+        table.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(window, text='\n'.join(layout)).pack(fill=tk.X, padx=self.WIDGET_PADX, pady=self.WIDGET_PADY)
+        print('Profiling report:\n' + '\n'.join(lines + layout))
+
     def help_message(self):
         """ Give directions to help files."""
         m1 = 'Help is available in the "test" folder with the "index.html" file. '
@@ -396,6 +3543,59 @@ class Application(tk.Tk):
         """
         self.status.config(text=' '+string)
 
+    def load_files(self, paths, on_done):
+        """ Read the curve files on a worker thread and show the progress in the status bar.
+
+            'on_done' is called with the 'LoadJob' in the main loop when all files are read.
+        """
+        job = self.loader.submit(paths, on_done)
+        if not self.load_frame.winfo_ismapped():
+            self.load_frame.pack(side=tk.RIGHT, before=self.status)
+            self.after(self.LOADER_POLL_MS, self.poll_loader)
+        return job
+
+    def poll_loader(self):
+        """ Update the loading progress and process the files read by the worker threads."""
+        self.loader.poll()
+        if self.loader.busy():
+            bytes_read, bytes_total, rows = self.loader.progress()
+            self.load_bar['value'] = bytes_read / bytes_total if bytes_total else 0
+            self.load_label.config(text=' ' + str(round(bytes_read / 1024**2, 1)) + ' / ' +
+                                        str(round(bytes_total / 1024**2, 1)) + ' MB - ' +
+                                        str(rows) + ' rows ')
+            self.after(self.LOADER_POLL_MS, self.poll_loader)
+        else:
+            self.load_frame.pack_forget()
+
+    def cancel_loading(self):
+        """ Cancel the reading of curve files. The files already read are ignored."""
+        self.loader.cancel()
+        self.set_status('WARNING - Loading of curve files is cancelled.')
+
+    def load_errors(self, job):
+        """ Return True if a file of the job was not read: an error message is shown if it is not cancelled."""
+        if job.cancelled():
+            self.set_status('WARNING - Loading of curve files is cancelled.')
+            return True
+        errors = [path for path in job.paths if isinstance(job.results[path], Exception)]
+        for path in errors:
+            print('ERROR - The curve file cannot be read:', path, job.results[path])
+        if errors:
+            msg.showerror('Error', 'The format of CSV file is not correct.\nPlease refer to files in the "test" folder.' +
+                          '\n\n' + '\n'.join(errors))
+        return len(errors) > 0
+
+    def update_stall_status(self, watchdog):
+        """ Show the number of stalls of the main loop and the longest one in the status bar."""
+        self.stall_status.config(text=' Stalls: ' + str(watchdog.count) + ' (max ' +
+                                      str(round(watchdog.max_latency * 1000)) + ' ms) ')
+
+    def update_cache_status(self):
+        """ Show the number of hits and misses of the CSV cache in the status bar."""
+        self.cache_status.config(text=' Cache: ' + str(Curve.cache.hits) + ' hits / ' +
+                                      str(Curve.cache.misses) + ' misses ')
+
+    @profiled('save_session')
     def save_session(self):
         """ Save session as a config file
 
@@ -412,68 +3612,22 @@ class Application(tk.Tk):
         elif isinstance(session_file, tuple):
             self.set_status('No session file selected.')    
         else:
-            config = configparser.ConfigParser()
-            # Plot data
-            config['plot'] = {'main title': self.main_title.get(),
-                              'x title': self.x_title.get(),
-                              'y title': self.y_title.get(),
-                              'auto scale': self.autoscale.get(),
-                              'x min user range': self.x_min_range.get(),
-                              'x max user range': self.x_max_range.get(),
-                              'y min user range': self.y_min_range.get(),
-                              'y max user range': self.y_max_range.get(),
-                              'x number of ticks': self.x_bin.get(),
-                              'y number of ticks': self.y_bin.get(),
-                              'legend position': self.legend.get(),
-                              'display grid': self.grid_state.get(),
-                              'background color': self.fig_color_flag.get()
-                              }
-            # Annotation and arrow data
-            config['annotation'] = {'text': self.annotation.get(),
-                                    'text X pos.': self.annotation_x.get(),
-                                    'text Y pos.': self.annotation_y.get(),
-                                    'text color': self.annot_color_combo.get(),
-                                    'text size': self.annot_size.get(),
-                                    'text state': self.annot_state.get(),
-                                    'arrow head X pos.': self.arrow_head_x.get(),
-                                    'arrow head Y pos.': self.arrow_head_y.get(),
-                                    'arrow head length': self.arrow_head_length.get(),
-                                    'arrow head width': self.arrow_head_width.get(),
-                                    'arrow color': self.arrow_color_combo.get(),
-                                    'arrow line width': self.arrow_width.get(),
-                                    'arrow state': self.arrow_state.get(),
-                                   }
-            # Session info
-            config['session'] = {'working directory': self.work_dir,
-                                 'curve count': Curve.count,
-                                }
-            # Curve data
-            for i in range(1, Curve.count+1):
-                config[i] = {'name': Curve.dic[str(i)].name,
-                             'CSV file path': Curve.dic[str(i)].path,
-                             'X data': Curve.dic[str(i)].data_type['x_type'],
-                             'Y data': Curve.dic[str(i)].data_type['y_type'],
-                             'visibility': Curve.dic[str(i)].visibility,
-                             'line color': Curve.dic[str(i)].color,
-                             'line width': Curve.dic[str(i)].width,
-                             'line style': Curve.dic[str(i)].style,
-                             'offset in X': Curve.dic[str(i)].x_offset,
-                             'offset in Y': Curve.dic[str(i)].y_offset,
-                             'scale in X': Curve.dic[str(i)].x_scale,
-                             'scale in Y': Curve.dic[str(i)].y_scale
-                            }
-            # Write the file and erase existing file.
-            with open(session_file, 'w') as file:
-                config.write(file)
+            self.ensure_tabs()
+            # The widget values have the keys of the session file (see 'write_session').
+            settings = self.plot_settings()
+            settings['working directory'] = self.work_dir
+            write_session(session_file, settings, [Curve.dic[str(i)] for i in range(1, Curve.count+1)])
             self.set_status('Session file is saved at: ' + session_file)
 
+    @profiled('load_session')
     def load_session(self):
         """ Load session file 
 
             Curve data are read.
             Plot data are read.
+            The 'CSV file path' of a curve may also be a binary file (see 'Curve.load_file').
+            Curve files are read later: see 'load_curves'.
         """
-        config = configparser.ConfigParser()
         # TODO: Show a warning or ask a permission since the work will be lost ?
         # Read the sessionfile
         session_file = filedialog.askopenfilename(
@@ -483,37 +3637,39 @@ class Application(tk.Tk):
             self.set_status('No session file selected.')    
         # Make sure the path to session file exists.
         elif os.path.exists(session_file):
-            config.read(session_file)
+            # The session file is read as by the batch rendering (see 'render_session').
+            settings, entries = read_session(session_file)
+            self.ensure_tabs()
             # Process Plot section
-            self.main_title.set(config.get('plot', 'main title'))
-            self.x_title.set(config.get('plot', 'x title'))
-            self.y_title.set(config.get('plot', 'y title'))
-            self.autoscale.set(config.getboolean('plot', 'auto scale'))
-            self.x_min_range.set(config.get('plot', 'x min user range'))
-            self.x_max_range.set(config.get('plot', 'x max user range'))
-            self.y_min_range.set(config.get('plot', 'y min user range'))
-            self.y_max_range.set(config.get('plot', 'y max user range'))
-            self.x_bin.set(config.get('plot', 'x number of ticks'))
-            self.y_bin.set(config.get('plot', 'y number of ticks'))
-            self.legend.set(config.getint('plot', 'legend position'))
-            self.grid_state.set(config.getboolean('plot', 'display grid'))
-            self.fig_color_flag.set(config.get('plot', 'background color'))
+            self.main_title.set(settings['main title'])
+            self.x_title.set(settings['x title'])
+            self.y_title.set(settings['y title'])
+            self.autoscale.set(settings['auto scale'])
+            self.x_min_range.set(settings['x min user range'])
+            self.x_max_range.set(settings['x max user range'])
+            self.y_min_range.set(settings['y min user range'])
+            self.y_max_range.set(settings['y max user range'])
+            self.x_bin.set(settings['x number of ticks'])
+            self.y_bin.set(settings['y number of ticks'])
+            self.legend.set(settings['legend position'])
+            self.grid_state.set(settings['display grid'])
+            self.fig_color_flag.set(settings['background color'])
             # Process Annotation section
-            self.annotation.set(config.get('annotation', 'text'))
-            self.annotation_x.set(config.getfloat('annotation', 'text X pos.'))
-            self.annotation_y.set(config.getfloat('annotation', 'text Y pos.'))
-            self.annot_color_combo.set(config.get('annotation', 'text color'))
-            self.annot_size.set(config.get('annotation', 'text size'))
-            self.annot_state.set(config.getboolean('annotation', 'text state'))
-            self.arrow_head_x.set(config.getfloat('annotation', 'arrow head X pos.'))
-            self.arrow_head_y.set(config.getfloat('annotation', 'arrow head Y pos.'))
-            self.arrow_head_length.set(config.get('annotation', 'arrow head length'))
-            self.arrow_head_width.set(config.get('annotation', 'arrow head width'))
-            self.arrow_color_combo.set(config.get('annotation', 'arrow color'))
-            self.arrow_width.set(config.get('annotation', 'arrow line width'))
-            self.arrow_state.set(config.getboolean('annotation', 'arrow state'))
+            self.annotation.set(settings['text'])
+            self.annotation_x.set(settings['text x pos.'])
+            self.annotation_y.set(settings['text y pos.'])
+            self.annot_color_combo.set(settings['text color'])
+            self.annot_size.set(settings['text size'])
+            self.annot_state.set(settings['text state'])
+            self.arrow_head_x.set(settings['arrow head x pos.'])
+            self.arrow_head_y.set(settings['arrow head y pos.'])
+            self.arrow_head_length.set(settings['arrow head length'])
+            self.arrow_head_width.set(settings['arrow head width'])
+            self.arrow_color_combo.set(settings['arrow color'])
+            self.arrow_width.set(settings['arrow line width'])
+            self.arrow_state.set(settings['arrow state'])
             # Process session data
-            self.work_dir = config.get('session', 'working directory')
+            self.work_dir = settings['working directory']
             # Display the working directory
             if len(self.work_dir) > (self.MAX_STR_CREATE_CURVE-3):
                 temp = '...' + self.work_dir[-self.MAX_STR_CREATE_CURVE+3:]
@@ -522,24 +3678,22 @@ class Application(tk.Tk):
             elif 0 < len(self.work_dir) < (self.MAX_STR_CREATE_CURVE-3):
                 self.work_dir_txt.set(self.work_dir)
                 self.set_status('Working directory is set at:'+self.work_dir)
-            Curve.count = config.getint('session', 'curve count')
+            # The previous curves are no longer watched and their lines are removed from the plot.
+            for curve in Curve.dic.values():
+                curve.watch(False)
+                curve.remove_line()
+            self.watch_state.set(0)
+            # Curves of the previous session with a number bigger than the new ones would be kept otherwise.
+            Curve.dic.clear()
+            Curve.count = 0
             # Process Curve data
-            for i in range(1, Curve.count+1):
-                if config.get(str(i), 'csv file path'):
-                    Curve.dic[str(i)] = Curve(config.get(str(i), 'csv file path'))
-                    # Since Curve.count is incremented after curve creation, it needs to be decremented.
-                    Curve.count -= 1
-                    Curve.dic[str(i)].name = config.get(str(i), 'name')
-                    Curve.dic[str(i)].data_type['x_type'] = config.get(str(i), 'x data')
-                    Curve.dic[str(i)].data_type['y_type'] = config.get(str(i), 'y data')
-                    Curve.dic[str(i)].visibility = config.get(str(i), 'visibility')
-                    Curve.dic[str(i)].color = config.get(str(i), 'line color')
-                    Curve.dic[str(i)].width = config.get(str(i), 'line width')
-                    Curve.dic[str(i)].style = config.get(str(i), 'line style')
-                    Curve.dic[str(i)].x_offset = config.getfloat(str(i), 'offset in X')
-                    Curve.dic[str(i)].y_offset = config.getfloat(str(i), 'offset in Y')
-                    Curve.dic[str(i)].x_scale = config.getfloat(str(i), 'scale in X')
-                    Curve.dic[str(i)].y_scale = config.getfloat(str(i), 'scale in Y')
+            # Curves are created without data: the visible curves are read by 'plot_curves'
+            # on the worker threads. Hidden curves are read the first time they are needed.
+            for i, entry in enumerate(entries, start=1):
+                if entry['csv file path']:
+                    # Curve.count is incremented by the curve creation.
+                    curve = Curve.from_session(entry)
+                    Curve.dic[str(Curve.count)] = curve
                 else:
                     msg.showerror('Error', 'No CSV file were selected for curve'+str(i))
             # Update curve ID list to be able to continue working on curves.
@@ -549,11 +3703,48 @@ class Application(tk.Tk):
             # Update background color for plot
             self.update_plot_bg_color()
             self.set_status('Data in session file "PV_session.ini" are read.')
-            self.plot_curves()
+            self.request_redraw()
         else:
             # Case if CANCEL is clicked after selecting a session file.
             self.set_status('No session file selected.')       
 
+    def load_curves(self, curves, on_done=None):
+        """ Read the files of curves created without data (see 'Curve.set_data').
+
+            Files are read in parallel by the worker threads of 'loader'.
+            'on_done' is called when all files are read. By default, the plot is updated.
+            A curve whose file cannot be read is hidden.
+        """
+        curves = [curve for curve in curves if not curve.loaded() and not curve.loading]
+        if not curves:
+            return
+        for curve in curves:
+            curve.loading = True
+        self.set_status('Reading ' + str(len(curves)) + ' curve files.')
+
+        def curves_loaded(job):
+            for curve in curves:
+                curve.loading = False
+                result = job.results[curve.path]
+                if job.cancelled():
+                    curve.visibility = False
+                elif isinstance(result, Exception):
+                    curve.visibility = False
+                else:
+                    try:
+                        curve.set_data(result)
+                    except curve_file_errors as e:
+                        # The Y column of a session may not be in the file anymore.
+                        print('ERROR - The data of curve', curve.name, 'cannot be read:', e)
+                        curve.visibility = False
+            self.load_errors(job)
+            self.update_cache_status()
+            if on_done is None:
+                self.request_redraw()
+            else:
+                on_done()
+        self.load_files([curve.path for curve in curves], curves_loaded)
+
     def curve_tab(self):
         """ First tab managing curve creation.
 
@@ -602,7 +3793,7 @@ class Application(tk.Tk):
         self.curve_prop_frame = ttk.LabelFrame(self.curve_tab, text='Curve properties')
         self.curve_prop_frame.grid(row=2, column=0)
         # Allow the column to expand for children
-        for i in range(0, 5):
+        for i in range(0, 6):
             self.curve_prop_frame.columnconfigure(index=i, weight=1)
     
         # Active curve selection
@@ -625,6 +3816,18 @@ class Application(tk.Tk):
         ttk.Checkbutton(self.curve_prop_frame, text='Show curve',
                        variable=self.show_state
                       ).grid(row=0, column=2, columnspan=2)
+        # Watch the CSV file: rows appended by a running test are added to the curve.
+        self.watch_state = tk.IntVar()
+        self.watch_state.set(0)
+        ttk.Checkbutton(self.curve_prop_frame, text='Watch file',
+                       variable=self.watch_state, command=self.update_watch
+                      ).grid(row=0, column=4)
+        # Density render mode: the points are shown as an image of the number of points per pixel.
+        self.density_state = tk.IntVar()
+        self.density_state.set(0)
+        ttk.Checkbutton(self.curve_prop_frame, text='Density',
+                       variable=self.density_state
+                      ).grid(row=0, column=5)
         # Curve Name
         self.active_curve_name = tk.StringVar()
         self.active_curve_name.set(' ')
@@ -733,6 +3936,10 @@ class Application(tk.Tk):
         union_list = (set(self.create_curve_frame.winfo_children()) |
                       set(self.curve_prop_frame.winfo_children())
                      )
+        # The Return key in an entry of the curve properties updates the curve.
+        for widget in self.curve_prop_frame.winfo_children():
+            if isinstance(widget, ttk.Entry) and not isinstance(widget, ttk.Combobox):
+                widget.bind('<Return>', lambda event: self.update_curve())
         for widget in union_list:
             widget.grid_configure(sticky=tk.E+tk.W+tk.N+tk.S, 
                                   padx=self.WIDGET_PADX, 
@@ -764,14 +3971,14 @@ class Application(tk.Tk):
             self.set_status('WARNING - No working directory selected.')
 
     def choose_file(self):
-        """ Get the path to the CSV file to open.
+        """ Get the path to the CSV file (or binary curve file) to open.
 
             Process the string of working directory to have no more than 'MAX_STR_CREATE_CURVE'
             characters. This gives no change in layout when selecting long or short path.
             The length of string displayed should be the same as for 'choose_dir'.
         """
         self.work_file = filedialog.askopenfilename(
-            initialdir=self.work_dir, filetypes=[('CSV file', '*.csv')], title='Open CSV file')
+            initialdir=self.work_dir, filetypes=curve_filetypes, title='Open curve file')
         if len(self.work_file) > (self.MAX_STR_CREATE_CURVE-3):
             temp = '...' + self.work_file[-self.MAX_STR_CREATE_CURVE+3:]
             self.work_file_txt.set(temp)
@@ -784,6 +3991,7 @@ class Application(tk.Tk):
             self.work_file_txt.set(self.create_underscores())
             self.set_status('WARNING - A CSV file has to be selected.')
 
+    @profiled('curve_create')
     def curve_create(self):
         """ Create the Curve instance from the CSV file given by 'work_file'
 
@@ -793,20 +4001,48 @@ class Application(tk.Tk):
         """
         if self.work_file:
             if len(self.curve_label.get()) != 0:
-                # Since instance is not yet created self.id does not exist. So 'count' is used.
-                Curve.dic[str(Curve.count)] = (Curve(self.work_file))
-                # FIXME: si le CSV est mauvais il faut sortir de cette fonction.
-                # Show the name of the created curve in 'curve_label'
-                Curve.dic[str(Curve.count)].name = self.curve_label.get()
-                # Update the list of curve for future modifications.
-                self.active_curve_combo['values'] = tuple(list(Curve.dic.keys()))
-                self.active_curve_combo2['values'] = tuple(list(Curve.dic.keys()))
-                self.plot_curves()
+                # The file is read on a worker thread. The curve is created by 'curve_loaded'.
+                name = self.curve_label.get()
+                self.set_status('Reading the curve file: ' + self.work_file)
+                self.load_files([self.work_file], lambda job: self.curve_loaded(job, name))
             else:
                 msg.showerror('Error', 'The name of the curve is required.')
         else:
             msg.showerror('Error', 'No CSV file were selected.')
 
+    def curve_loaded(self, job, name):
+        """ Create the Curve instance once its file is read by 'load_files'.
+
+            A file with several Y columns gives one curve per Y column named after the column title.
+        """
+        if self.load_errors(job):
+            if not job.cancelled():
+                self.choose_file()
+            return
+        self.ensure_tabs()
+        path = job.paths[0]
+        df = job.results[path]
+        if len(df.columns) < 2:
+            msg.showerror('Error', 'The CSV file must contain X data and at least one column of Y data.')
+            self.choose_file()
+            return
+        # A file with several Y columns gives one curve per Y column. They share the X array.
+        for column in range(1, len(df.columns)):
+            # Since instance is not yet created self.id does not exist. So 'count' is used.
+            Curve.dic[str(Curve.count)] = (Curve(path, data_in=df, column=column,
+                                                 color=my_colors[self.plot_fig_color][1]))
+            # Show the name of the created curve in 'curve_label'
+            if len(df.columns) > 2:
+                Curve.dic[str(Curve.count)].name = name + ' - ' + str(df.columns[column]).strip()
+            else:
+                Curve.dic[str(Curve.count)].name = name
+        # Update the list of curve for future modifications.
+        self.active_curve_combo['values'] = tuple(list(Curve.dic.keys()))
+        self.active_curve_combo2['values'] = tuple(list(Curve.dic.keys()))
+        self.update_cache_status()
+        self.request_redraw()
+
+    @profiled('update_curve')
     def update_curve(self):
         """ Update Curve instance attributes based on GUI input"""
         # Update curve name after testing is a curve was selected
@@ -819,6 +4055,8 @@ class Application(tk.Tk):
             self.active_curve_y_data.set(Curve.dic[str(self.selected_curve)].data_type['y_type'])
             # Update curve visibility
             Curve.dic[str(self.selected_curve)].visibility = self.show_state.get()
+            # Update curve render mode
+            Curve.dic[str(self.selected_curve)].render = 'density' if self.density_state.get() else 'line'
             # Update curve width
             try:
                 if float(self.curve_width.get()) != 0:
@@ -833,122 +4071,166 @@ class Application(tk.Tk):
                 if float(self.curve_x_scale.get()) != 0:
                     Curve.dic[str(self.selected_curve)].x_scale = float(self.curve_x_scale.get())
                     Curve.dic[str(self.selected_curve)].x_offset = float(self.curve_x_offset.get())
-                    Curve.dic[str(self.selected_curve)].data_out.iloc[:, 0] = Curve.dic[str(self.selected_curve)].data_in.iloc[:, 0]* Curve.dic[str(self.selected_curve)].x_scale + Curve.dic[str(self.selected_curve)].x_offset
                 else:
                     # status message will be replaced by the one from 'plot_curves'.
                     msg.showerror('Error', 'The value of X scale cannot be 0.')
                 if float(self.curve_y_scale.get()) != 0:
                     Curve.dic[str(self.selected_curve)].y_scale = float(self.curve_y_scale.get())
                     Curve.dic[str(self.selected_curve)].y_offset = float(self.curve_y_offset.get())
-                    Curve.dic[str(self.selected_curve)].data_out.iloc[:, 1] = Curve.dic[str(self.selected_curve)].data_in.iloc[:, 1]* Curve.dic[str(self.selected_curve)].y_scale + Curve.dic[str(self.selected_curve)].y_offset
                 else:
                     # status message will be replaced by the one from 'plot_curves'.
                     msg.showerror('Error', 'The value of Y scale cannot be 0.')
             except ValueError:
                 msg.showerror('Error', 'The values of X scale, X offset, Y scale and Y offset must be numbers.')
 
-            self.plot_curves()
+            self.request_redraw()
+
+    def request_redraw(self, event=None):
+        """ Ask for a plot update. The requests made until the main loop is idle give one 'plot_curves'.
+
+            With 'REDRAW_DELAY_MS' above 0, the requests made during this delay are also joined.
+            The plot is updated with the values of the widgets at the time of the update.
+        """
+        if self.redraw_pending:
+            return
+        self.redraw_pending = True
+        if self.REDRAW_DELAY_MS > 0:
+            self.after(self.REDRAW_DELAY_MS, self.redraw)
+        else:
+            self.after_idle(self.redraw)
 
+    def redraw(self):
+        """ Update the plot once for all the requests of 'request_redraw'."""
+        self.redraw_pending = False
+        self.plot_curves()
+
+    @profiled('plot_curves')
     def plot_curves(self):
         """ Plot all curves with visibility = True
 
-            Each curve attribute is scanned and used in plot function.
-            It is necessary to clear the Axes since the for loop starts from 1 for every
-            curve plot. Otherwise the first curve get duplicated for each plot to this function.
+            The plot is not cleared: each curve keeps its matplotlib line (see 'Curve.update_line').
+            Only the lines of curves whose attributes changed are updated.
+            The plot limits are computed again only if data, scale, offset or visibility changed.
             Plot annotation if required and plot its arrow if required.
             Empty main title, X title and Y titles are accepted.
         """
-        self.ax.clear()
+        # The widgets of all tabs give the plot settings.
+        self.ensure_tabs()
+        # Files of visible curves not read yet are read on worker threads. The plot is updated after.
+        self.load_curves([Curve.dic[str(i)] for i in range(1, Curve.count+1) if Curve.dic[str(i)].visibility])
+
+        # Update the lines of all curves.
+        with profiler.phase('artists'):
+            limits, handles = update_artists(self.ax, Curve.session_curves(), self.batches)
+
+        # The plot settings are applied as by the batch rendering (see 'render_session').
+        settings = self.plot_settings()
         # Set the plot windows with user-defined ranges if required.
-        if self.autoscale.get():
+        if settings['auto scale']:
             try:
-                self.ax.axis([float(self.x_min_range.get()),
-                              float(self.x_max_range.get()),
-                              float(self.y_min_range.get()),
-                              float(self.y_max_range.get())]
-                            )
+                set_user_ranges(self.ax, settings)
             except ValueError:
                 msg.showerror('Error', 'The values of X min, X max, Y min and Y max must be numbers.')
-    
-        # Update curve parameters for all curves.
-        for i in range(1, Curve.count+1):
-            # print('Visibility ', Curve.dic[str(i)].name, Curve.dic[str(i)].visibility)
-            #if Curve.dic[str(i)].data_out != None:
-            # Curve data is computed again in case the curve are plot after reading a session file.
-            Curve.dic[str(i)].data_out.iloc[:, 0] = Curve.dic[str(i)].data_in.iloc[:, 0]* Curve.dic[str(i)].x_scale + Curve.dic[str(i)].x_offset
-            Curve.dic[str(i)].data_out.iloc[:, 1] = Curve.dic[str(i)].data_in.iloc[:, 1]* Curve.dic[str(i)].y_scale + Curve.dic[str(i)].y_offset
-            if Curve.dic[str(i)].visibility:
-                self.ax.plot(Curve.dic[str(i)].data_out.iloc[:, 0],
-                             Curve.dic[str(i)].data_out.iloc[:, 1],
-                             label=Curve.dic[str(i)].name,
-                             color=Curve.dic[str(i)].color,
-                             lw=Curve.dic[str(i)].width,
-                             ls=Curve.dic[str(i)].style,
-                             )
-                # This message is not visible unless the plotting takes a long time.
-                self.set_status(Curve.dic[str(i)].name+' is plotted.')
+        elif limits or not self.ax.get_autoscale_on():
+            # Auto scale: limits are computed only from visible curves with all their points.
+            autoscale_curves(self.ax, Curve.session_curves(), self.batches)
 
+        # The previous annotation is removed before drawing the new one.
+        if self.annotation_artist is not None:
+            self.annotation_artist.remove()
+            self.annotation_artist = None
         # Draw the annotation and the arrow
         try:
-            if self.annot_state.get() & self.arrow_state.get():
-                self.ax.annotate(self.annotation.get(),
-                        xy=(float(self.arrow_head_x.get()), float(self.arrow_head_y.get())),
-                        xytext=(float(self.annotation_x.get()), float(self.annotation_y.get())),
-                        color=self.annot_color_combo.get(),
-                        fontsize=float(self.annot_size.get()),
-                        arrowprops=dict(color=self.arrow_color_combo.get(),
-                                        width=float(self.arrow_width.get()),
-                                        headwidth=float(self.arrow_head_width.get()),
-                                        headlength=float(self.arrow_head_length.get())
-                                       )
-                        )
-            # Draw the annotation only. The arrowprops is removed to avoid drawing it
-            elif self.annot_state.get() & (not self.arrow_state.get()):
-                self.ax.annotate(self.annotation.get(),
-                        xy=(float(self.arrow_head_x.get()), float(self.arrow_head_y.get())),
-                        xytext=(float(self.annotation_x.get()), float(self.annotation_y.get())),
-                        color=self.annot_color_combo.get(),
-                        fontsize=float(self.annot_size.get()),
-                        )
-            # Draw no annotation and no arrow
-            else:
-                pass
+            self.annotation_artist = draw_annotation(self.ax, settings)
         except ValueError:
             message1 = 'For the annotation, the values of X and Y positions and the value of font size must be numbers.'
             message2 = '\nFor the arrow, the values of X and Y positions, the length and width of head and the line width must be numbers.'
             msg.showerror('Error', message1 + message2)
 
-        # Set the number of bins (axis ticks). Abs() is used to handle negative integers.
+        # Set the number of bins (axis ticks).
         try:
-            self.ax.xaxis.set_major_locator(MaxNLocator(abs(int(self.x_bin.get()))+1))
-            self.ax.yaxis.set_major_locator(MaxNLocator(abs(int(self.y_bin.get()))+1))
+            set_ticks(self.ax, settings)
         except ValueError:
             message3 = 'The values of number of ticks for X and Y axis must be integers.'
             message4 = '\n.'
             msg.showerror('Error', message3 + message4)
 
-        # PLOT AREA PARAMETERS
-        # Background colors
-        self.fig.set_facecolor(my_colors[self.plot_fig_color][0])
-        self.ax.set_facecolor(my_colors[self.plot_fig_color][0])
-        # Axis and label colors
-        self.ax.tick_params(axis='both', color=my_colors[self.plot_fig_color][1], labelcolor=my_colors[self.plot_fig_color][1])
-        # Spine color
-        self.ax.spines['top'].set_color(my_colors[self.plot_fig_color][1])
-        self.ax.spines['bottom'].set_color(my_colors[self.plot_fig_color][1])
-        self.ax.spines['left'].set_color(my_colors[self.plot_fig_color][1])
-        self.ax.spines['right'].set_color(my_colors[self.plot_fig_color][1])
-
-        self.ax.legend(loc=self.legend_var[str(self.legend.get())])
-        self.ax.set_title(self.main_title.get(), color=my_colors[self.plot_fig_color][1], fontweight='bold')
-        self.ax.set_xlabel(self.x_title.get(), color=my_colors[self.plot_fig_color][1])
-        self.ax.set_ylabel(self.y_title.get(), color=my_colors[self.plot_fig_color][1])
-        self.ax.grid(self.grid_state.get())
-        self.fig.tight_layout()
+        # PLOT AREA PARAMETERS: colors, legend, titles and grid
+        style_plot(self.fig, self.ax, settings, handles, self.layout)
+        # The layout is computed again only if titles, tick labels or figure size changed.
+        with profiler.phase('tight_layout'):
+            self.layout.tight_layout(self.fig, self.ax)
+        # Large curves are reduced for the new view (points are culled and decimated).
+        with profiler.phase('level of detail'):
+            self.update_lod(draw=False)
+        # Extrema are cached by curves: only new data or scale and offset values change the table.
+        self.update_extrema(verbose=False)
         # Update the matplotlib area. canvas.draw() will be deprecated.
+        profiler.draw_requested()
         self.canvas.draw_idle()
         self.set_status('Plot is updated.')
 
+    def plot_settings(self):
+        """ Return the values of the plot and annotation widgets with the keys of session files (see 'read_session')."""
+        return {'main title': self.main_title.get(),
+                'x title': self.x_title.get(),
+                'y title': self.y_title.get(),
+                'auto scale': bool(self.autoscale.get()),
+                'x min user range': self.x_min_range.get(),
+                'x max user range': self.x_max_range.get(),
+                'y min user range': self.y_min_range.get(),
+                'y max user range': self.y_max_range.get(),
+                'x number of ticks': self.x_bin.get(),
+                'y number of ticks': self.y_bin.get(),
+                'legend position': self.legend.get(),
+                'display grid': bool(self.grid_state.get()),
+                'background color': self.fig_color_flag.get(),
+                'text': self.annotation.get(),
+                'text x pos.': self.annotation_x.get(),
+                'text y pos.': self.annotation_y.get(),
+                'text color': self.annot_color_combo.get(),
+                'text size': self.annot_size.get(),
+                'text state': bool(self.annot_state.get()),
+                'arrow head x pos.': self.arrow_head_x.get(),
+                'arrow head y pos.': self.arrow_head_y.get(),
+                'arrow head length': self.arrow_head_length.get(),
+                'arrow head width': self.arrow_head_width.get(),
+                'arrow color': self.arrow_color_combo.get(),
+                'arrow line width': self.arrow_width.get(),
+                'arrow state': bool(self.arrow_state.get()),
+               }
+
+    def view_changed(self, *args):
+        """ Reduce the large curves again for the new view after zoom, pan or resize.
+
+            Several events may come before the plot is drawn: 'update_lod' is done once.
+        """
+        if not self.lod_pending:
+            self.lod_pending = True
+            self.after_idle(self.update_lod)
+
+    @profiled('update_lod')
+    def update_lod(self, draw=True):
+        """ Give each visible curve only the points needed by the plot view (see 'Curve.update_view').
+
+            Points outside the view are not plotted. The view is divided in pixel columns:
+            curves with a lot of points per column keep the first, last, min and max points of
+            each column (level of detail). With 'lod_state' unchecked, all points of the view are plotted.
+            Curves in density mode get the image of the view. Batched curves are given to their line collections.
+        """
+        self.lod_pending = False
+        columns = int(self.ax.get_window_extent().width) if self.lod_state.get() else 0
+        changed = update_views(self.ax, Curve.session_curves(), self.batches, columns)
+        # A 'best' legend is placed again for the new view (see 'LayoutCache').
+        with profiler.phase('legend'):
+            if self.layout.place_legend(self.ax):
+                changed = True
+        if changed and draw:
+            self.canvas.draw_idle()
+        # Extrema follow the plot view (zoom and pan).
+        if draw and 'Extrema' not in self.tab_frames and self.extrema_mode.get() == 'view':
+            self.update_extrema(verbose=False)
+
     def active_curve(self, event):
         """ Update curve widgets based on curve attributes
 
@@ -961,6 +4243,8 @@ class Application(tk.Tk):
             # Update the active curve attributes.
             self.active_curve_name.set(Curve.dic[str(self.selected_curve)].name)
             self.show_state.set(Curve.dic[str(self.selected_curve)].visibility)
+            self.watch_state.set(Curve.dic[str(self.selected_curve)].tail is not None)
+            self.density_state.set(Curve.dic[str(self.selected_curve)].render == 'density')
             self.active_curve_name.set(Curve.dic[str(self.selected_curve)].name)
             self.active_curve_x_data.set(Curve.dic[str(self.selected_curve)].data_type['x_type'])
             self.active_curve_y_data.set(Curve.dic[str(self.selected_curve)].data_type['y_type'])
@@ -976,6 +4260,74 @@ class Application(tk.Tk):
             print('ERROR - Curve ID not found. Please select again a curve ID.')
             self.set_status('ERROR - Curve ID not found. Please select again a curve ID.')
 
+    def update_watch(self):
+        """ Start or stop the live tail mode of the selected curve.
+
+            Only CSV files can be watched. The polling of watched files is started if needed.
+        """
+        if self.selected_curve not in Curve.dic.keys():
+            self.watch_state.set(0)
+            self.set_status('ERROR - There is no curve selected.')
+            return
+        curve = Curve.dic[self.selected_curve]
+        if os.path.splitext(curve.path)[1].lower() in ('.npy', '.pvb', '.parquet'):
+            self.watch_state.set(0)
+            msg.showerror('Error', 'Only CSV files can be watched.')
+            return
+        curve.watch(self.watch_state.get())
+        if curve.tail is not None:
+            self.set_status('Watching file of curve: ' + curve.name)
+            if not self.watch_pending:
+                self.watch_pending = True
+                self.poll_watch()
+        else:
+            self.set_status('File of curve ' + curve.name + ' is no longer watched.')
+
+    def poll_watch(self):
+        """ Read the rows appended to the files of watched curves every WATCH_POLL_MS.
+
+            Only the lines of curves with new data are updated: the plot is not built again.
+            The polling stops when no curve is watched.
+        """
+        watched = [curve for curve in Curve.session_curves() if curve.tail is not None]
+        if not watched:
+            self.watch_pending = False
+            return
+        changed = []
+        for curve in watched:
+            try:
+                if curve.watch_file():
+                    changed.append(curve)
+            except curve_file_errors as e:
+                curve.watch(False)
+                if curve is Curve.dic.get(self.selected_curve):
+                    self.watch_state.set(0)
+                print('ERROR - The watched file cannot be read:', e)
+                self.set_status('ERROR - The file of curve ' + curve.name + ' cannot be read. It is no longer watched.')
+        if changed:
+            self.update_watched(changed)
+        self.after(self.WATCH_POLL_MS, self.poll_watch)
+
+    def update_watched(self, curves):
+        """ Give the new data of watched 'curves' to their lines and draw the plot.
+
+            With auto scale, the limits follow the new points unless the user zoomed or panned.
+        """
+        limits = self.batches.update(self.ax, Curve.session_curves())
+        for curve in curves:
+            if curve.update_line(self.ax):
+                limits = True
+        if limits and not self.autoscale.get() and self.ax.get_autoscale_on():
+            for curve in Curve.session_curves():
+                if curve.line is not None:
+                    curve.reset_view()
+            self.ax.relim(visible_only=True)
+            self.batches.extend_limits(self.ax)
+            self.ax.autoscale_view()
+        self.update_lod(draw=False)
+        self.update_extrema(verbose=False)
+        self.canvas.draw_idle()
+
     def show_check_update(self):
         """ Process the 'show' check toggle for curve visibility."""
         try:
@@ -1157,12 +4509,7 @@ class Application(tk.Tk):
                       ).grid(row=2, column=1)
         ttk.Radiobutton(self.legend_frame, text='Best', variable=self.legend, value=4
                       ).grid(row=1, column=2)
-        self.legend_var ={'0': 'upper left',
-                          '1': 'upper right',
-                          '2': 'lower left',
-                          '3': 'lower right',
-                          '4': 'best'
-                         }
+        self.legend_var = legend_locations
 
         # CUSTOMIZE PANEL
         self.custom_frame = ttk.LabelFrame(self.plot_tab, text='Customize plot')
@@ -1190,7 +4537,7 @@ class Application(tk.Tk):
 
         # APPLY BUTTON
         # Padding for apply needs to be the same for containers for layout consistency
-        ttk.Button(self.plot_tab, text='Apply plot properties', command=self.plot_curves
+        ttk.Button(self.plot_tab, text='Apply plot properties', command=self.request_redraw
                  ).grid(row=4, column=0)
 
         # APPLY PADDING AND STICKINESS ON WIDGETS CHILDREN AFTER THEY ARE CREATED
@@ -1206,6 +4553,10 @@ class Application(tk.Tk):
                       set(self.legend_frame.winfo_children()) |
                       set(self.custom_frame.winfo_children())
                      )
+        # The Return key in an entry updates the plot. Several keys give one update (see 'request_redraw').
+        for widget in union_list:
+            if isinstance(widget, ttk.Entry) and not isinstance(widget, ttk.Combobox):
+                widget.bind('<Return>', self.request_redraw)
         for widget in union_list:
             widget.grid_configure(sticky=tk.E+tk.W+tk.N+tk.S, 
                                   padx=self.WIDGET_PADX, 
@@ -1378,7 +4729,7 @@ class Application(tk.Tk):
         # APPLY BUTTON
         # Padding for apply needs to be the same for containers for layout consistency
         ttk.Button(self.annot_tab, text='Apply annotation and arrow properties',
-                  command=self.plot_curves, style='w6.TButton').grid(row=4, column=0)
+                  command=self.request_redraw, style='w6.TButton').grid(row=4, column=0)
 
         # APPLY PADDING AND STICKINESS ON WIDGETS CHILDREN AFTER THEY ARE CREATED
         # For self.annot_tab
@@ -1391,6 +4742,10 @@ class Application(tk.Tk):
         union_list = (set(self.text_frame.winfo_children()) |
                       set(self.arrow_frame.winfo_children())
                      )
+        # The Return key in an entry updates the plot. Several keys give one update (see 'request_redraw').
+        for widget in union_list:
+            if isinstance(widget, ttk.Entry) and not isinstance(widget, ttk.Combobox):
+                widget.bind('<Return>', self.request_redraw)
         for widget in union_list:
             widget.grid_configure(sticky=tk.E+tk.W+tk.N+tk.S, 
                                   padx=self.WIDGET_PADX, 
@@ -1435,6 +4790,38 @@ class Application(tk.Tk):
         self.selected_curve_name.set(' ')
         ttk.Entry(self.extrema_tab, textvariable=self.selected_curve_name, width=20,
                  justify=tk.CENTER).grid(row=1, column=3)
+        # X range of the extrema: whole curve, X window or plot view (updated with zoom and pan)
+        self.extrema_frame = ttk.LabelFrame(self.extrema_tab, text='X range')
+        self.extrema_frame.grid(row=2, column=0, columnspan=4)
+        for i in range(0, 4):
+            self.extrema_frame.columnconfigure(index=i, weight=1)
+        self.extrema_mode = tk.StringVar()
+        self.extrema_mode.set('curve')
+        ttk.Radiobutton(self.extrema_frame, text='Whole curve', variable=self.extrema_mode,
+                       value='curve', command=self.update_extrema_mode).grid(row=0, column=0)
+        ttk.Radiobutton(self.extrema_frame, text='X window', variable=self.extrema_mode,
+                       value='window', command=self.update_extrema_mode).grid(row=0, column=1)
+        ttk.Radiobutton(self.extrema_frame, text='Plot view', variable=self.extrema_mode,
+                       value='view', command=self.update_extrema_mode).grid(row=0, column=2, columnspan=2)
+        ttk.Label(self.extrema_frame, text='X from').grid(row=1, column=0)
+        self.extrema_x_from = tk.StringVar()
+        self.extrema_x_from.set('0')
+        extrema_x_from_entry = ttk.Entry(self.extrema_frame, textvariable=self.extrema_x_from, width=8,
+                                         justify=tk.CENTER)
+        extrema_x_from_entry.grid(row=1, column=1)
+        ttk.Label(self.extrema_frame, text='X to').grid(row=1, column=2)
+        self.extrema_x_to = tk.StringVar()
+        self.extrema_x_to.set('100')
+        extrema_x_to_entry = ttk.Entry(self.extrema_frame, textvariable=self.extrema_x_to, width=8,
+                                       justify=tk.CENTER)
+        extrema_x_to_entry.grid(row=1, column=3)
+        # The X window is used after the Enter key.
+        for entry in (extrema_x_from_entry, extrema_x_to_entry):
+            entry.bind('<Return>', self.update_extrema_mode)
+        # X window checked by 'update_extrema_mode'
+        self.extrema_x_window = (0.0, 100.0)
+        for widget in self.extrema_frame.winfo_children():
+            widget.grid_configure(sticky=tk.E+tk.W, padx=self.WIDGET_PADX, pady=self.WIDGET_PADY)
         # Xmin
         self.extrema_x_min = tk.StringVar()
         self.extrema_x_min.set('X min')
@@ -1456,6 +4843,20 @@ class Application(tk.Tk):
         extrema_y_max_label = ttk.Label(self.extrema_tab, textvariable=self.extrema_y_max)
         extrema_y_max_label.grid(row=6, column=0, columnspan=4)
 
+        # Table of extrema for all curves. It is updated with the plot.
+        ttk.Label(self.extrema_tab, text='Extrema of all curves'
+                 ).grid(row=7, column=0, columnspan=2)
+        ttk.Button(self.extrema_tab, text='Read hidden curves', command=self.load_all_extrema,
+                   style='w9.TButton').grid(row=7, column=2, columnspan=2)
+        self.extrema_table = ttk.Treeview(self.extrema_tab, columns=('value', 'at'), height=16)
+        self.extrema_table.heading('#0', text='Curve')
+        self.extrema_table.heading('value', text='Value')
+        self.extrema_table.heading('at', text='At')
+        self.extrema_table.column('#0', width=150)
+        self.extrema_table.column('value', width=90, anchor=tk.E)
+        self.extrema_table.column('at', width=110, anchor=tk.E)
+        self.extrema_table.grid(row=8, column=0, columnspan=4)
+
         # For all frames
         union_list = (set(self.extrema_tab.winfo_children()) 
                      )
@@ -1475,12 +4876,79 @@ class Application(tk.Tk):
         if selected_curve2 in Curve.dic.keys():
             # show the curve name after selection of curve ID
             self.selected_curve_name.set(Curve.dic[str(selected_curve2)].name)
-            Curve.dic[str(selected_curve2)].find_extrema()
-            self.set_status('Extrema values computed for curve: ' + Curve.dic[str(selected_curve2)].name)
+            if Curve.dic[str(selected_curve2)].loaded():
+                Curve.dic[str(selected_curve2)].find_extrema(self.extrema_window())
+                self.set_status('Extrema values computed for curve: ' + Curve.dic[str(selected_curve2)].name)
+            else:
+                # The file of a hidden curve may not be read yet.
+                self.load_curves([Curve.dic[str(selected_curve2)]],
+                                 lambda: self.get_extrema(event) if Curve.dic[str(selected_curve2)].loaded() else None)
         else:
             print('ERROR - Curve ID not found. Please select again a curve ID.')
             self.set_status('ERROR - Curve ID not found. Please select again a curve ID.')
 
+    def extrema_window(self):
+        """ Return the X range (X min, X max) of the extrema or None for the whole curves."""
+        if self.extrema_mode.get() == 'window':
+            return self.extrema_x_window
+        if self.extrema_mode.get() == 'view':
+            return self.ax.get_xlim()
+        return None
+
+    def update_extrema_mode(self, *args):
+        """ Check the X window and update the extrema for the selected X range."""
+        try:
+            self.extrema_x_window = (float(self.extrema_x_from.get()), float(self.extrema_x_to.get()))
+        except ValueError:
+            msg.showerror('Error', 'The values of the X window must be numbers.')
+            return
+        self.update_extrema()
+
+    @profiled('update_extrema')
+    def update_extrema(self, verbose=True):
+        """ Update the extrema of the selected curve and the table of extrema for the X range.
+
+            In the 'Plot view' mode, this is done after each zoom or pan (see 'update_lod') with 'verbose' False.
+            The extrema of a X range are given by the index of each curve: the data are not read again.
+            Nothing is done before the Extrema tab is built.
+        """
+        if 'Extrema' in self.tab_frames:
+            return
+        selected_curve2 = self.active_curve_combo2.get()
+        if selected_curve2 in Curve.dic.keys() and Curve.dic[selected_curve2].loaded():
+            Curve.dic[selected_curve2].find_extrema(self.extrema_window(), verbose)
+        self.update_extrema_table()
+
+    def update_extrema_table(self):
+        """ Show the extrema of all curves in the table of the Extrema tab.
+
+            Extrema are cached by each curve so the table is updated without reading the data again.
+            Curves whose file is not read yet are shown as 'not read'.
+        """
+        self.extrema_table.delete(*self.extrema_table.get_children())
+        x_window = self.extrema_window()
+        for i in range(1, Curve.count+1):
+            curve = Curve.dic[str(i)]
+            extrema = curve.get_extrema(x_window) if curve.loaded() else None
+            if extrema is None:
+                status = 'not read' if not curve.loaded() else 'no value'
+                self.extrema_table.insert('', tk.END, text=str(i) + ' - ' + curve.name, values=(status, ''))
+                continue
+            parent = self.extrema_table.insert('', tk.END, text=str(i) + ' - ' + curve.name, open=True)
+            for text, value, at in (('X min', extrema['x_min'], 'Y ' + str(round(extrema['x_min_y'], self.ROUND))),
+                                    ('X max', extrema['x_max'], 'Y ' + str(round(extrema['x_max_y'], self.ROUND))),
+                                    ('Y min', extrema['y_min'], 'X ' + str(round(extrema['y_min_x'], self.ROUND))),
+                                    ('Y max', extrema['y_max'], 'X ' + str(round(extrema['y_max_x'], self.ROUND)))):
+                self.extrema_table.insert(parent, tk.END, text=text, values=(round(value, self.ROUND), '@ ' + at))
+
+    def load_all_extrema(self):
+        """ Read the files of hidden curves not read yet, then update the table of extrema."""
+        curves = [Curve.dic[str(i)] for i in range(1, Curve.count+1) if not Curve.dic[str(i)].loaded()]
+        if curves:
+            self.load_curves(curves, self.update_extrema_table)
+        else:
+            self.update_extrema_table()
+
     def update_plot_bg_color(self):
     	if self.fig_color_flag.get() == 0:
     		self.plot_fig_color = 'white_bg'
@@ -1489,6 +4957,12 @@ class Application(tk.Tk):
 
 
 if __name__ == '__main__':
+    # Batch rendering of session files without GUI.
+    if '--render' in sys.argv[1:]:
+        sys.exit(batch_render(sys.argv[1:]))
+    # Local server rendering session files.
+    if '--serve' in sys.argv[1:]:
+        sys.exit(serve(sys.argv[1:]))
     app = Application()
     # Show the screen dimensions at start-up.
     """
@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+""" benchmark measures the time of the main PlotView operations on synthetic curves.
+
+    It runs without GUI: plots are drawn on a matplotlib Agg canvas. Results are written as JSON
+    and compared with a baseline file. The exit status is 1 if an operation is slower than the baseline
+    by more than the threshold.
+    Usage:
+        python tools/benchmark.py [--sizes 1e3 1e4 1e5 1e6] [--curves 1 10 100 1000] [--repeat 3]
+                                  [--output results.json] [--baseline baseline.json] [--threshold 0.25]
+
+    Code hosted at: https://github.com/fa201/PlotView
+    Licence: GN GPL-3.0
+"""
+
+
+try:
+    import argparse
+    import contextlib
+    import datetime
+    import json
+    import os
+    import platform
+    import sys
+    import tempfile
+    import time
+    import warnings
+    # No display is needed: matplotlib uses the Agg backend.
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    import matplotlib
+    import numpy as np
+    import pandas as pd
+    # PlotView and curve_toolbox are imported from the repository.
+    TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(TOOLS_DIR))
+    sys.path.insert(0, TOOLS_DIR)
+    import curve_toolbox
+    import plotview
+    from plotview import Curve
+except ModuleNotFoundError as e:
+    print('The necessary Python packages are not installed.\n' + str(e))
+    print('Please check the required packages at https://github.com/fa201/PlotView.')
+    sys.exit(1)
+
+# Version of script
+VERSION = 1.0
+# Curve shapes: monotonic X (binary search index) and looping X like 'test/extrema.csv' (chunk index).
+SHAPES = ('monotonic', 'looping')
+# CSV files bigger than this number of points are not written: only the PVB files are read.
+CSV_MAX_POINTS = 1e6
+# Number of points of the curves of the session benchmarks.
+SESSION_POINTS = 1000
+# Width (pixels) of the plot for the level of detail, as a 8 in figure at 100 dpi.
+PLOT_COLUMNS = 620
+# Operations faster than this time (s) are not compared with the baseline: the difference is noise.
+MIN_TIME = 0.001
+
+
+def monotonic_curve(n):
+    """ Return X and Y arrays of a curve with increasing X values (x.sin(x) as 'test/xsinx.csv')."""
+    x = np.linspace(0.0, 100.0, int(n))
+    return x, x * np.sin(x)
+
+
+def looping_curve(n, loops=10):
+    """ Return X and Y arrays of a curve going back and forth in X (circles as 'test/extrema.csv').
+
+        The radius decreases at each loop so that the circles do not overlap exactly.
+    """
+    t = np.linspace(0.0, 2.0 * np.pi * loops, int(n))
+    radius = 20.0 * (1.0 - 0.5 * t / t[-1])
+    return radius * np.cos(t), radius * np.sin(t)
+
+
+def curve_frame(x, y, columns=1):
+    """ Return the dataframe of a CSV file: X in the first column and 'columns' Y columns."""
+    data = {'x': x}
+    for i in range(columns):
+        data['y' + str(i+1)] = y + i
+    return pd.DataFrame(data)
+
+
+def write_curve(directory, shape, n):
+    """ Write the synthetic curve as CSV file (up to 'CSV_MAX_POINTS') and PVB file. Return their paths.
+
+        The CSV path is None if the curve is too big.
+    """
+    x, y = monotonic_curve(n) if shape == 'monotonic' else looping_curve(n)
+    name = os.path.join(directory, shape + '_' + str(int(n)))
+    csv_path = None
+    if n <= CSV_MAX_POINTS:
+        csv_path = name + '.csv'
+        curve_frame(x, y).to_csv(csv_path, index=False)
+    pvb_path = name + '.pvb'
+    plotview.write_pvb(pvb_path, x, y)
+    return csv_path, pvb_path
+
+
+def session_settings(directory):
+    """ Return the plot settings of a session file (see 'plotview.read_session')."""
+    return {'main title': 'Benchmark', 'x title': 'X', 'y title': 'Y', 'auto scale': False,
+            'x min user range': '0', 'x max user range': '100', 'y min user range': '0', 'y max user range': '100',
+            'x number of ticks': '10', 'y number of ticks': '10', 'legend position': 0,
+            'display grid': True, 'background color': 0,
+            'text': 'Benchmark', 'text x pos.': '5.0', 'text y pos.': '5.0', 'text color': 'black',
+            'text size': '12', 'text state': True, 'arrow head x pos.': '10.0', 'arrow head y pos.': '10.0',
+            'arrow head length': '10', 'arrow head width': '4', 'arrow color': 'black',
+            'arrow line width': '0.5', 'arrow state': True, 'working directory': directory}
+
+
+def measure(function, repeat):
+    """ Return the times (s) of 'repeat' calls of 'function'.
+
+        Messages printed by PlotView and matplotlib warnings (layout of large legends) are hidden.
+    """
+    times = []
+    with open(os.devnull, 'w') as null, contextlib.redirect_stdout(null), warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+    return times
+
+
+class Benchmark:
+    """ Run the benchmarks and keep their results.
+
+        Attributes:
+            - directory: string -> folder of the synthetic files
+            - repeat: integer -> number of runs of each operation. The best time is compared.
+            - results: dictionary -> key: operation name, value: dictionary with the best time,
+                                     the times of all runs and the number of points or curves
+        Methods:
+            - add: time an operation and keep its result
+            - curve: benchmarks of one curve file
+            - toolbox: benchmarks of the curve_toolbox operations
+            - session: benchmarks of a session file
+    """
+    def __init__(self, directory, repeat):
+        self.directory = directory
+        self.repeat = repeat
+        self.results = {}
+
+    def add(self, name, size, function):
+        """ Time an operation and print its best time."""
+        times = measure(function, self.repeat)
+        self.results[name] = {'seconds': min(times), 'runs': times, 'size': int(size)}
+        print('{:<45} {:>12.6f} s'.format(name, min(times)))
+
+    def curve(self, shape, n):
+        """ Benchmarks of one curve: read the file, create the curve, update its line, plot it, show it in
+            density mode and find its extrema.
+
+            'update_curve' and 'plot_curves' call the functions used by the application
+            ('plotview.update_artists', 'plotview.autoscale_curves' and 'plotview.update_views') on an Agg canvas.
+        """
+        csv_path, pvb_path = write_curve(self.directory, shape, n)
+        suffix = '.' + shape + '.' + str(int(n))
+        # CSV files are parsed each time: the cache of the application is not used.
+        Curve.cache = None
+        if csv_path:
+            self.add('read_file.csv' + suffix, n, lambda: Curve.load_file(csv_path))
+        self.add('read_file.pvb' + suffix, n, lambda: Curve.load_file(pvb_path))
+        with open(os.devnull, 'w') as null, contextlib.redirect_stdout(null):
+            df = Curve.load_file(pvb_path)
+            curve = Curve(pvb_path, data_in=df)
+        # 'set_data' builds the X index of the curve.
+        self.add('set_data' + suffix, n, lambda: Curve(pvb_path, data_in=df))
+        fig = plotview.mpl_figure.Figure(figsize=(8, 6))
+        plotview.backend_agg.FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        # A single curve is not batched (see 'plotview.CurveBatches').
+        batches = plotview.CurveBatches()
+        plotview.update_artists(ax, [curve], batches)
+
+        def update_curve():
+            # New scale and offset values as given by the curve tab, then the plot update of the application.
+            curve.x_scale = 2.0 if curve.x_scale == 1.0 else 1.0
+            curve.y_offset = 1.0 if curve.y_offset == 0.0 else 0.0
+            if plotview.update_artists(ax, [curve], batches)[0]:
+                plotview.autoscale_curves(ax, [curve], batches)
+        self.add('update_curve' + suffix, n, update_curve)
+
+        def plot_curves():
+            # The line gets the points of the view (level of detail) before the plot is drawn.
+            curve.reset_view()
+            plotview.update_views(ax, [curve], batches, PLOT_COLUMNS)
+            fig.canvas.draw()
+        self.add('plot_curves' + suffix, n, plot_curves)
+
+        def density_pyramid():
+            # The pyramid is built again from all the points.
+            curve.density = None
+            curve.get_density()
+        self.add('density_pyramid' + suffix, n, density_pyramid)
+
+        def density_view():
+            # Zoom on the middle of the curve: the image is given by the pyramid (see 'Curve.update_density').
+            curve.render = 'density'
+            plotview.update_artists(ax, [curve], batches)
+            plotview.autoscale_curves(ax, [curve], batches)
+            x_min, x_max = ax.get_xlim()
+            ax.set_xlim(x_min + 0.25 * (x_max - x_min), x_max - 0.25 * (x_max - x_min))
+            plotview.update_views(ax, [curve], batches, PLOT_COLUMNS)
+            fig.canvas.draw()
+            curve.render = 'line'
+            plotview.update_artists(ax, [curve], batches)
+            plotview.update_views(ax, [curve], batches, PLOT_COLUMNS)
+        self.add('density_view' + suffix, n, density_view)
+
+        def find_extrema():
+            # The cached extrema are cleared to find them again.
+            curve.extrema_index = None
+            curve.get_extrema()
+        self.add('find_extrema' + suffix, n, find_extrema)
+        # Extrema in the middle half of the X range (see 'SortedIndex.extrema' and 'ChunkIndex.extrema').
+        x_min, x_max = float(np.nanmin(curve.x_in)), float(np.nanmax(curve.x_in))
+        window = (x_min + 0.25 * (x_max - x_min), x_max - 0.25 * (x_max - x_min))
+        self.add('find_extrema_window' + suffix, n, lambda: curve.get_extrema(window))
+
+    def toolbox(self, shape, n):
+        """ Benchmarks of the curve_toolbox operations on the CSV file of a curve."""
+        x, y = monotonic_curve(n) if shape == 'monotonic' else looping_curve(n)
+        suffix = '.' + shape + '.' + str(int(n))
+        df = curve_frame(x, y)
+        middle = float(np.median(x))
+        self.add('toolbox.trim' + suffix, n, lambda: curve_toolbox.trim_curve(df, 0, float(x.min()), middle))
+        self.add('toolbox.operation' + suffix, n, lambda: curve_toolbox.scale_offset_curve(df, 2.0, 0.5, 1.0, -1.0))
+        wide = curve_frame(x, y, columns=4)
+        self.add('toolbox.split' + suffix, n, lambda: curve_toolbox.split_curves(wide, 0))
+        csv_path = os.path.join(self.directory, shape + '_' + str(int(n)) + '.csv')
+        if os.path.exists(csv_path):
+            self.add('toolbox.convert' + suffix, n, lambda: curve_toolbox.sniff_csv(csv_path))
+
+    def session(self, count):
+        """ Benchmarks of a session file with 'count' curves: save, load with curve data and plot.
+
+            The curves use a monotonic file and a looping file of 'SESSION_POINTS' points.
+        """
+        paths = [write_curve(self.directory, shape, SESSION_POINTS)[0] for shape in SHAPES]
+        with open(os.devnull, 'w') as null, contextlib.redirect_stdout(null):
+            frames = [Curve.load_file(path) for path in paths]
+            curves = []
+            for i in range(count):
+                curve = Curve(paths[i % 2], data_in=frames[i % 2], color=plotview.my_colors['white_bg'][i % 10 + 1])
+                curve.name = 'Curve ' + str(i+1)
+                curve.y_offset = float(i)
+                curves.append(curve)
+        session_file = os.path.join(self.directory, 'session_' + str(count) + '.pv')
+        settings = session_settings(self.directory)
+        suffix = '.' + str(count)
+        self.add('save_session' + suffix, count, lambda: plotview.write_session(session_file, settings, curves))
+
+        def load_session():
+            # The session is read and the data of the visible curves are set as by the application.
+            settings, entries = plotview.read_session(session_file)
+            data = {}
+            for entry in entries:
+                curve = Curve.from_session(entry)
+                if curve.path not in data:
+                    data[curve.path] = Curve.load_file(curve.path)
+                curve.set_data(data[curve.path])
+        self.add('load_session' + suffix, count, load_session)
+        self.add('plot_session' + suffix, count, lambda: plotview.render_figure(session_file).canvas.draw())
+        # One line per curve: without the line collections of the batched mode (see 'plotview.CurveBatches').
+        self.add('plot_session_lines' + suffix, count,
+                 lambda: plotview.render_figure(session_file, batch='never').canvas.draw())
+
+
+def environment():
+    """ Return the versions of Python and of the packages which change the results."""
+    return {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'matplotlib': matplotlib.__version__,
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+           }
+
+
+def compare(results, baseline, threshold, min_time=MIN_TIME):
+    """ Return the operations slower than the baseline as a list of (name, baseline time, time, ratio).
+
+        An operation is slower if its best time is bigger than the baseline time by more than
+        'threshold' (0.25 = 25 %) and by more than 'min_time' (s).
+        Operations which are not in both results are not compared.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        old = baseline[name]['seconds']
+        new = result['seconds']
+        if new > old * (1.0 + threshold) and new - old > min_time:
+            regressions.append((name, old, new, new / old if old else float('inf')))
+    return regressions
+
+
+def main(argv):
+    """ Run the benchmarks, write the JSON file, compare with the baseline and return the exit status."""
+    parser = argparse.ArgumentParser(description='Benchmark of PlotView operations on synthetic curves.')
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1e3, 1e4, 1e5, 1e6],
+                        help='numbers of points of the curves (up to 1e8, CSV files up to 1e6)')
+    parser.add_argument('--shapes', nargs='+', choices=SHAPES, default=list(SHAPES), help='shapes of the curves')
+    parser.add_argument('--curves', type=int, nargs='+', default=[1, 10, 100, 1000],
+                        help='numbers of curves of the session files')
+    parser.add_argument('--repeat', type=int, default=3, help='number of runs of each operation (best time is kept)')
+    parser.add_argument('--output', help='JSON file of the results')
+    parser.add_argument('--baseline', help='JSON file of previous results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slow down compared to the baseline (0.25 = 25 %%)')
+    parser.add_argument('--min-time', type=float, default=MIN_TIME,
+                        help='smallest slow down (s) reported as a regression')
+    parser.add_argument('--work-dir', help='folder of the synthetic files (temporary folder by default)')
+    args = parser.parse_args(argv)
+
+    print('PlotView benchmark ' + str(VERSION) + ' - Python ' + platform.python_version())
+    with tempfile.TemporaryDirectory() as temp_dir:
+        directory = args.work_dir or temp_dir
+        os.makedirs(directory, exist_ok=True)
+        benchmark = Benchmark(directory, args.repeat)
+        for shape in args.shapes:
+            for n in args.sizes:
+                benchmark.curve(shape, n)
+                if n <= CSV_MAX_POINTS:
+                    benchmark.toolbox(shape, n)
+        for count in args.curves:
+            benchmark.session(count)
+
+    report = {'version': VERSION, 'environment': environment(), 'results': benchmark.results}
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print('Results are saved at: ' + args.output)
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)['results']
+        regressions = compare(benchmark.results, baseline, args.threshold, args.min_time)
+        for name, old, new, ratio in regressions:
+            print('REGRESSION {:<45} {:.6f} s -> {:.6f} s (x{:.2f})'.format(name, old, new, ratio))
+        print(str(len(regressions)) + ' regression(s) compared to ' + args.baseline +
+              ' with a threshold of ' + str(round(args.threshold * 100)) + ' %.')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -19,8 +19,6 @@ except ModuleNotFoundError as e:
 
 # Version of script
 VERSION = 1.0
-# Move to the working directory for reading and writing CSV
-os.chdir('CSV_files')
 
 # GLOBAL VARIABLES
 # Choice of command for the main menu
@@ -33,6 +31,54 @@ file_dic = OrderedDict()  # Allows to keep the order given by glob for files
 status =' '
 
 
+def list_csv_files():
+    """Return the CSV files of the working directory as a dictionary
+
+        Keys are integers starting at 1 and values are the file names sorted by name.
+    """
+    # Add all CSV files in working directory into a list regardless of case for CSV extension
+    temp_list_files = glob.glob('*.csv') + glob.glob('*.CSV')
+    # Sort files by name
+    temp_list_files = sorted(temp_list_files)
+    return OrderedDict((index, name) for index, name in enumerate(temp_list_files, 1))
+
+def trim_curve(df, col, start, end):
+    """Return the points of the curve with values of column 'col' between 'start' and 'end'
+
+        'col' is the dataframe column integer index (starting at 0).
+    """
+    df = df[df.iloc[:, col] >= start]
+    return df[df.iloc[:, col] <= end]
+
+def split_curves(df, col_x):
+    """Return a list of 2-column dataframes: column 'col_x' as X data and each other column as Y data
+
+        'col_x' is the dataframe column integer index (starting at 0).
+    """
+    curves = []
+    for index in df.columns:
+        if index != df.columns[col_x]:
+            curves.append(pd.concat([df.iloc[:, col_x], df[index]], axis=1, join='outer'))
+    return curves
+
+def scale_offset_curve(df, scale_x, scale_y, offset_x, offset_y):
+    """Return a copy of the curve with scale and offset applied to the first 2 columns
+
+        The scale is applied first, then the offset.
+    """
+    df = df.copy()
+    df.iloc[:, 0] = df.iloc[:, 0] * scale_x + offset_x
+    df.iloc[:, 1] = df.iloc[:, 1] * scale_y + offset_y
+    return df
+
+def sniff_csv(path):
+    """Return the CSV dialect of the file determined by the Python CSV sniffer and the dataframe read with it"""
+    with open(path, 'r') as file_in:
+        # Read 2000 characters to determine dialect attributes
+        sample = file_in.read(2000)
+        dial = csv.Sniffer().sniff(sample)
+    return dial, pd.read_csv(path, dialect=dial)
+
 def show_title_files():
     """Clear the console, print application title and list of file
         https://www.geeksforgeeks.org/clear-screen-python/
@@ -56,17 +102,8 @@ def show_title_files():
     print(title)
     print(separator)
 
-    # Add all CSV files in working directory into a list regardless of case for CSV extension
-    temp_list_files = glob.glob('*.csv') + glob.glob('*.CSV')
-    # Sort files by name
-    temp_list_files = sorted(temp_list_files)
-
     # Reset file_dic in case the files changed while the script is running
-    file_dic = {}
-    # Update 'file_dic': key is a number starting at 1
-    for name in temp_list_files:
-        index = temp_list_files.index(name) + 1  # Get index of current list item
-        file_dic[index] = name
+    file_dic = list_csv_files()
 
     # Show the content of 'file_dic'
     print('')
@@ -178,8 +215,7 @@ def trim_commands():
                     end = float(input('Enter the value for the end of the trimmed curve: '))
                     # Check proper order otherwise the complete points are deleted.
                     if start <= end:
-                        df_in = df_in[df_in.iloc[:, col] >= start]
-                        df_in = df_in[df_in.iloc[:, col] <= end]
+                        df_in = trim_curve(df_in, col, start, end)
                         # Export trimmed curve with a prefix on the file name with index column.
                         file_output = 'trimmed_' + file_dic[int(file_input)]
                         df_in.to_csv(file_output, index=False, encoding='utf-8')
@@ -257,19 +293,10 @@ def split_commands():
                         # Display trim menu to remove the error from display.
                         show_main_menu('split')
                     else:
-                        i = 0
-                        for index in df_in.columns:
-                            #print('[df_in.iloc[:, col_x]]: ', [df_in.iloc[:, col_x]])
-                            #print('df_in[index]: ', df_in[index])
-                            if index != df_in.columns[col_x]:
-                                df_temp = pd.concat([df_in.iloc[:, col_x], df_in[index]], axis=1, join='outer')
-                                i += 1
-                                # Remove CSV extension on file name, add file number and add back CSV extension name
-                                file_output = file_dic[int(file_input)][:-4] + '_' + str(i) + '.csv'
-                                df_temp.to_csv(file_output, index=False, encoding='utf-8')
-                            else:
-                                # This dataframe is not interesting
-                                pass
+                        for i, df_temp in enumerate(split_curves(df_in, col_x), 1):
+                            # Remove CSV extension on file name, add file number and add back CSV extension name
+                            file_output = file_dic[int(file_input)][:-4] + '_' + str(i) + '.csv'
+                            df_temp.to_csv(file_output, index=False, encoding='utf-8')
                         # Update the status with trimmed curve filename
                         status = 'curves split and saved, check the list of files.'
                         # Display the main menu since the splitting is done.
@@ -339,8 +366,7 @@ def operation_commands():
                 _ = input('Press [ENTER] to continue.')
                 show_main_menu('operation')
             else:
-                df_in.iloc[:, 0] = df_in.iloc[:, 0] * scale_x + offset_x
-                df_in.iloc[:, 1] = df_in.iloc[:, 1] * scale_y + offset_y
+                df_in = scale_offset_curve(df_in, scale_x, scale_y, offset_x, offset_y)
                 file_output = 'operation_' + file_dic[int(file_input)]
                 df_in.to_csv(file_output, index=False, encoding='utf-8')
                 # Update the status with trimmed curve filename
@@ -383,10 +409,8 @@ def convert_commands():
         # CSV file reading based on 'file_dic' key.
         print('\nPython CSV sniffer attempts to determine the CSV dialect.')
         try:
-            with open(file_dic[int(file_input)], 'r') as file_in:
-                # Read 1024 characters to determine dialect attributes
-                sample = file_in.read(2000)
-                dial = csv.Sniffer().sniff(sample)
+            # The dataframe is read with the dialect attributes.
+            dial, df_in = sniff_csv(file_dic[int(file_input)])
             print("CSV Dialect parameters are written between '>' and '<':")
             print('Separator: >', dial.delimiter, '<', sep='')
             print('Doublequote: >', dial.doublequote, '<', sep='')
@@ -395,8 +419,6 @@ def convert_commands():
             print('Quotechar: >', dial.quotechar, '<', sep='')
             print('Skipinitialspace after separator: >', dial.skipinitialspace, '<', sep='')
             _ = input('Press [ENTER] to continue.')
-            # Use dialect attributes as input for read_csv.
-            df_in = pd.read_csv(file_dic[int(file_input)], dialect=dial)
             # Show the begining of datatrame.
             file_head(file_dic[int(file_input)], df_in)
             _ = input('Press [ENTER] to continue.')
@@ -417,36 +439,39 @@ def convert_commands():
             show_main_menu('main')
 
 
-# Main program
-show_main_menu('main')
-while choice != 'Q':
-    if choice == 'M':
-        # Display main menu
-        status = ''
-        show_main_menu('main')
+# Main program: the functions above can be imported without running the menus (see tools/benchmark.py).
+if __name__ == '__main__':
+    # Move to the working directory for reading and writing CSV
+    os.chdir('CSV_files')
+    show_main_menu('main')
+    while choice != 'Q':
+        if choice == 'M':
+            # Display main menu
+            status = ''
+            show_main_menu('main')
 
-    elif choice == 'C':
-        # Display convert menu
-        show_main_menu('convert')
+        elif choice == 'C':
+            # Display convert menu
+            show_main_menu('convert')
 
-    elif choice == 'S':
-        # Display split menu
-        show_main_menu('split')
+        elif choice == 'S':
+            # Display split menu
+            show_main_menu('split')
 
-    elif choice == 'O':
-        # Display operation menu
-        show_main_menu('operation')
+        elif choice == 'O':
+            # Display operation menu
+            show_main_menu('operation')
 
-    elif choice == 'T':
-        # Display trim menu
-        show_main_menu('trim')
+        elif choice == 'T':
+            # Display trim menu
+            show_main_menu('trim')
 
-    elif choice == 'L':
-        status = 'the list of files was updated.'
-        # No need to display list menu since the list is updated for all menus.
-        show_main_menu('main')
+        elif choice == 'L':
+            status = 'the list of files was updated.'
+            # No need to display list menu since the list is updated for all menus.
+            show_main_menu('main')
 
-    else:
-        status = 'unknown command. The list of command is shown above.'
-        show_main_menu('main')
-print('\nExiting the program.')
+        else:
+            status = 'unknown command. The list of command is shown above.'
+            show_main_menu('main')
+    print('\nExiting the program.')